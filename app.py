@@ -3,21 +3,69 @@ Attendance Request & Approval System
 Flask Application - Main Entry Point
 """
 
-from flask import Flask, render_template, request, redirect, url_for, session, flash, send_file
+from flask import (Flask, render_template, request, redirect, url_for, session, flash, send_file, g,
+                   stream_with_context)
+from datetime import datetime
+import hmac
+import mimetypes
 from werkzeug.utils import secure_filename
 import os
-from datetime import datetime
-from db_config import db
+import time
+from db_config import db, decode_page_cursor, decode_sync_token, DatabaseUnavailableError, REQUEST_STATUSES
+from events import broker as event_broker, format_sse, queue_topics, RESET_EVENT
+from export import EXPORT_FORMATS, EXPORT_MIMETYPES, iter_export, parse_date
+from metrics import registry as metrics, database_collector, events_collector
+from passwords import HasherBusyError
+from storage import AttachmentStore
+from thumbnails import ThumbnailWorker, RENDITIONS, PREVIEW_EXTENSIONS, rendition_path
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key_here_change_in_production'  # Change this in production
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Offload attachment bytes to the front proxy after the authorization check:
+# USE_X_SENDFILE for Apache/lighttpd, ATTACHMENT_ACCEL_PREFIX (an nginx
+# internal location aliased to UPLOAD_FOLDER, e.g. '/protected-uploads/')
+# for X-Accel-Redirect
+app.config['USE_X_SENDFILE'] = False
+app.config['ATTACHMENT_ACCEL_PREFIX'] = None
+app.config['ATTACHMENT_MAX_AGE'] = 24 * 3600  # Browser cache for content-addressed files
+# /metrics requires "Authorization: Bearer <token>" and is refused to
+# everyone while no token is set. (Client addresses cannot be trusted:
+# behind a same-host proxy every request comes from 127.0.0.1.)
+app.config['METRICS_TOKEN'] = os.environ.get('ATTENDANCE_METRICS_TOKEN')
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'doc', 'docx'}
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+BULK_ACTION_LIMIT = 500
+BUSY_MESSAGE = 'The server is busy signing people in, please try again in a moment'
+DATABASE_RETRY_AFTER = 5  # Seconds clients are told to wait when the database is unreachable
+# Review queue shown on each approver's dashboard, and the card template
+# used to insert a request into it in place
+QUEUE_STATUSES = {'coordinator': 'pending', 'hod': 'approved_by_coordinator'}
+QUEUE_CARDS = {'pending': 'coordinator_card.html', 'approved_by_coordinator': 'hod_card.html'}
+# Live dashboard updates (/events/queue) hold a connection per open
+# dashboard and only reach dashboards on the process that made the
+# change, so they are off unless enabled here or by asgi.py (see README)
+app.config['LIVE_QUEUE_UPDATES'] = os.environ.get('ATTENDANCE_LIVE_UPDATES') == '1'
+SSE_KEEPALIVE = 15  # Seconds between keepalive comments on idle event streams
+SSE_RETRY_MS = 3000  # Browser reconnect delay after a dropped event stream
+SYNC_BATCH_SIZE = 100  # Default and largest number of changes per /api/requests call
+MAX_SYNC_BATCH_SIZE = 500
 
 # Ensure upload folder exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# Uploads are stored once per distinct content under uploads/objects/
+attachment_store = AttachmentStore(os.path.join(app.config['UPLOAD_FOLDER'], 'objects'))
+
+# Thumbnails and first-page previews are rendered off the request thread
+thumbnail_worker = ThumbnailWorker(max_workers=2)
+
+# Pool, cache and event stream statistics are read at scrape time
+metrics.add_collector(database_collector(db))
+metrics.add_collector(events_collector(event_broker))
+
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -30,7 +78,7 @@ def login_required(role=None):
         def wrapper(*args, **kwargs):
             if 'user_id' not in session:
                 flash('Please login first', 'error')
-                return redirect(url_for('login'))
+                return redirect(url_for('index'))
             if role and session.get('role') != role:
                 flash('Unauthorized access', 'error')
                 return redirect(url_for('index'))
@@ -40,6 +88,150 @@ def login_required(role=None):
     return decorator
 
 
+def flash_transition_result(applied, message):
+    """Flash the outcome of a single approve/reject action"""
+    if applied:
+        flash(message, 'success')
+    elif applied is False:
+        flash('Request was already processed by someone else', 'error')
+    else:
+        flash('Failed to update request', 'error')
+
+
+def queue_events_since():
+    """
+    Event ID a dashboard's live update stream resumes from
+    
+    Taken before the dashboard's query so no change in between is lost.
+    None when live updates are disabled, and the page then has no stream.
+    """
+    if not app.config['LIVE_QUEUE_UPDATES']:
+        return None
+    return event_broker.last_event_id()
+
+
+def publish_queue_changes(request_ids, from_status, to_status):
+    """
+    Tell open coordinator/HOD dashboards that requests moved between queues
+    
+    Args:
+        request_ids: Requests whose status changed
+        from_status: Status they left (None for new requests)
+        to_status: Status they have now
+    """
+    if not app.config['LIVE_QUEUE_UPDATES']:
+        return
+    if from_status not in QUEUE_CARDS and to_status not in QUEUE_CARDS:
+        return
+    rows = db.get_request_details_batch(request_ids) or {}
+    for request_id in request_ids:
+        row = rows.get(request_id)
+        department = row['department'] if row else None
+        if from_status in QUEUE_CARDS:
+            event_broker.publish(queue_topics(from_status, department), 'remove',
+                                 {'request_id': request_id})
+        if to_status in QUEUE_CARDS and row:
+            event_broker.publish(queue_topics(to_status, department), 'insert', {
+                'request_id': request_id,
+                'created_at': row['created_at'].isoformat(),
+                'html': render_template(QUEUE_CARDS[to_status], req=row)
+            })
+
+
+def apply_bulk_action(role, from_status, approve_status):
+    """
+    Apply one approve/reject decision to every selected request
+    
+    Args:
+        role: Approver role recorded on the approval rows
+        from_status: Status the selected requests must currently have
+        approve_status: Status an approved request moves to
+    """
+    action = request.form.get('action')  # 'approve' or 'reject'
+    remarks = request.form.get('remarks', '')
+    request_ids = request.form.getlist('request_ids', type=int)
+    
+    if action not in ('approve', 'reject'):
+        flash('Invalid action', 'error')
+        return
+    if not request_ids:
+        flash('Select at least one request', 'error')
+        return
+    if len(request_ids) > BULK_ACTION_LIMIT:
+        flash(f'You can process at most {BULK_ACTION_LIMIT} requests at once', 'error')
+        return
+    
+    decision = 'approved' if action == 'approve' else 'rejected'
+    to_status = approve_status if action == 'approve' else 'rejected'
+    results = db.bulk_transition_requests(
+        request_ids, from_status, to_status, 
+        role, session.get('name'), decision, remarks
+    )
+    
+    if results is None:
+        flash('Bulk action failed, no requests were changed', 'error')
+        return
+    
+    done_ids = [rid for rid, error in results.items() if error is None]
+    done = [f'#{rid}' for rid in done_ids]
+    skipped = [f'#{rid} ({error})' for rid, error in results.items() if error]
+    if done_ids:
+        publish_queue_changes(done_ids, from_status, to_status)
+    if done:
+        flash(f'{len(done)} request(s) {decision}: {", ".join(done)}', 'success')
+    if skipped:
+        flash(f'{len(skipped)} request(s) skipped: {", ".join(skipped)}', 'error')
+
+
+@app.before_request
+def start_request_timer():
+    """Start timing the request and its database queries"""
+    g.request_started = time.perf_counter()
+    metrics.begin_request()
+
+
+@app.before_request
+def route_database_reads():
+    """Pin reads to the primary database for a while after the session wrote"""
+    db.begin_request(session.get('db_last_write'))
+
+
+@app.after_request
+def remember_database_write(response):
+    """Record in the session when this request wrote, for read-your-writes"""
+    wrote = db.end_request()
+    if wrote is not None:
+        session['db_last_write'] = wrote
+    return response
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Record route latency and the share of it spent in the database"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        metrics.observe_route(
+            request.endpoint or 'unmatched',
+            request.method,
+            response.status_code,
+            time.perf_counter() - started,
+            metrics.end_request()
+        )
+    return response
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Expose query, route, pool and cache metrics in Prometheus text format"""
+    token = app.config['METRICS_TOKEN']
+    if not token:
+        return 'Forbidden', 403
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+        return 'Unauthorized', 401, {'WWW-Authenticate': 'Bearer'}
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
 @app.route('/')
 def index():
     """Home page"""
@@ -64,7 +256,11 @@ def student_register():
             return redirect(url_for('student_register'))
         
         # Create student account
-        result = db.create_student(name, department, contact, email, password)
+        try:
+            result = db.create_student(name, department, contact, email, password)
+        except HasherBusyError:
+            flash(BUSY_MESSAGE, 'error')
+            return redirect(url_for('student_register'))
         if result:
             flash('Registration successful! Please login.', 'success')
             return redirect(url_for('student_login'))
@@ -81,7 +277,11 @@ def student_login():
         email = request.form.get('email')
         password = request.form.get('password')
         
-        student = db.verify_student_login(email, password)
+        try:
+            student = db.verify_student_login(email, password)
+        except HasherBusyError:
+            flash(BUSY_MESSAGE, 'error')
+            return render_template('student_login.html')
         if student:
             session['user_id'] = student['student_id']
             session['name'] = student['name']
@@ -115,29 +315,30 @@ def student_request():
         end_time = request.form.get('end_time')
         contact = request.form.get('contact')
         
-        # Handle file upload
+        # Handle file upload (deduplicated by content hash)
         attachment_path = None
+        attachment_name = None
         if 'attachment' in request.files:
             file = request.files['attachment']
             if file and file.filename and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"{timestamp}_{filename}"
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                attachment_path = filepath
+                attachment_name = secure_filename(file.filename)
+                attachment_path, _ = attachment_store.save(file, attachment_name)
+                thumbnail_worker.submit(attachment_path)
         
         # Create request
         student_id = session.get('user_id')
         result = db.create_request(
             student_id, subject, description, 
-            start_time, end_time, contact, attachment_path
+            start_time, end_time, contact, attachment_path, attachment_name
         )
         
         if result:
+            publish_queue_changes([result], None, 'pending')
             flash('Request submitted successfully!', 'success')
             return redirect(url_for('student_dashboard'))
         else:
+            # An uploaded blob is left for `python storage.py` to collect:
+            # a concurrent upload of the same file may already be using it
             flash('Failed to submit request', 'error')
     
     return render_template('student_form.html')
@@ -152,7 +353,11 @@ def coordinator_login():
         email = request.form.get('email')
         password = request.form.get('password')
         
-        user = db.verify_user_login(email, password, 'coordinator')
+        try:
+            user = db.verify_user_login(email, password, 'coordinator')
+        except HasherBusyError:
+            flash(BUSY_MESSAGE, 'error')
+            return render_template('coordinator_login.html')
         if user:
             session['user_id'] = user['user_id']
             session['name'] = user['name']
@@ -170,8 +375,10 @@ def coordinator_login():
 @login_required('coordinator')
 def coordinator_dashboard():
     """Coordinator dashboard - view pending requests"""
+    events_since = queue_events_since()
     pending_requests = db.get_requests_by_status('pending')
-    return render_template('coordinator.html', requests=pending_requests)
+    return render_template('coordinator.html', requests=pending_requests,
+                           events_since=events_since)
 
 
 @app.route('/coordinator/action/<int:request_id>', methods=['POST'])
@@ -182,20 +389,35 @@ def coordinator_action(request_id):
     remarks = request.form.get('remarks', '')
     
     if action == 'approve':
-        db.update_request_status(request_id, 'approved_by_coordinator')
-        db.create_approval(
-            request_id, 'coordinator', session.get('name'), 
-            'approved', remarks
+        to_status = 'approved_by_coordinator'
+        applied = db.transition_request(
+            request_id, 'pending', to_status,
+            {'approver_role': 'coordinator', 'approver_name': session.get('name'),
+             'decision': 'approved', 'remarks': remarks}
         )
-        flash('Request approved and forwarded to HOD', 'success')
+        message = 'Request approved and forwarded to HOD'
     elif action == 'reject':
-        db.update_request_status(request_id, 'rejected')
-        db.create_approval(
-            request_id, 'coordinator', session.get('name'), 
-            'rejected', remarks
+        to_status = 'rejected'
+        applied = db.transition_request(
+            request_id, 'pending', to_status,
+            {'approver_role': 'coordinator', 'approver_name': session.get('name'),
+             'decision': 'rejected', 'remarks': remarks}
         )
-        flash('Request rejected', 'success')
+        message = 'Request rejected'
+    else:
+        return redirect(url_for('coordinator_dashboard'))
     
+    if applied:
+        publish_queue_changes([request_id], 'pending', to_status)
+    flash_transition_result(applied, message)
+    return redirect(url_for('coordinator_dashboard'))
+
+
+@app.route('/coordinator/bulk-action', methods=['POST'])
+@login_required('coordinator')
+def coordinator_bulk_action():
+    """Coordinator approves or rejects several pending requests at once"""
+    apply_bulk_action('coordinator', 'pending', 'approved_by_coordinator')
     return redirect(url_for('coordinator_dashboard'))
 
 
@@ -208,7 +430,11 @@ def hod_login():
         email = request.form.get('email')
         password = request.form.get('password')
         
-        user = db.verify_user_login(email, password, 'hod')
+        try:
+            user = db.verify_user_login(email, password, 'hod')
+        except HasherBusyError:
+            flash(BUSY_MESSAGE, 'error')
+            return render_template('hod_login.html')
         if user:
             session['user_id'] = user['user_id']
             session['name'] = user['name']
@@ -226,8 +452,10 @@ def hod_login():
 @login_required('hod')
 def hod_dashboard():
     """HOD dashboard - view coordinator-approved requests"""
+    events_since = queue_events_since()
     approved_requests = db.get_requests_by_status('approved_by_coordinator')
-    return render_template('hod.html', requests=approved_requests)
+    return render_template('hod.html', requests=approved_requests,
+                           events_since=events_since)
 
 
 @app.route('/hod/action/<int:request_id>', methods=['POST'])
@@ -238,30 +466,85 @@ def hod_action(request_id):
     remarks = request.form.get('remarks', '')
     
     if action == 'approve':
-        db.update_request_status(request_id, 'approved')
-        db.create_approval(
-            request_id, 'hod', session.get('name'), 
-            'approved', remarks
+        to_status = 'approved'
+        applied = db.transition_request(
+            request_id, 'approved_by_coordinator', to_status,
+            {'approver_role': 'hod', 'approver_name': session.get('name'),
+             'decision': 'approved', 'remarks': remarks}
         )
-        flash('Request finally approved', 'success')
+        message = 'Request finally approved'
     elif action == 'reject':
-        db.update_request_status(request_id, 'rejected')
-        db.create_approval(
-            request_id, 'hod', session.get('name'), 
-            'rejected', remarks
+        to_status = 'rejected'
+        applied = db.transition_request(
+            request_id, 'approved_by_coordinator', to_status,
+            {'approver_role': 'hod', 'approver_name': session.get('name'),
+             'decision': 'rejected', 'remarks': remarks}
         )
-        flash('Request rejected', 'success')
+        message = 'Request rejected'
+    else:
+        return redirect(url_for('hod_dashboard'))
     
+    if applied:
+        publish_queue_changes([request_id], 'approved_by_coordinator', to_status)
+    flash_transition_result(applied, message)
     return redirect(url_for('hod_dashboard'))
 
 
+@app.route('/hod/bulk-action', methods=['POST'])
+@login_required('hod')
+def hod_bulk_action():
+    """HOD gives a final decision on several requests at once"""
+    apply_bulk_action('hod', 'approved_by_coordinator', 'approved')
+    return redirect(url_for('hod_dashboard'))
+
+
+@app.route('/events/queue')
+@login_required()
+def queue_events():
+    """
+    Stream changes to the user's review queue as Server-Sent Events
+    
+    Sends 'insert' (with the rendered card) and 'remove' events for the
+    coordinator's pending queue or the HOD's approval queue, optionally
+    limited to one ?department=. Each open stream holds a worker thread
+    here, so it is only served when LIVE_QUEUE_UPDATES is enabled; the
+    asyncio mode (asgi.py) serves it without one.
+    """
+    if not app.config['LIVE_QUEUE_UPDATES']:
+        return 'Live updates are disabled', 404
+    status = QUEUE_STATUSES.get(session.get('role'))
+    if status is None:
+        return 'Forbidden', 403
+    topic = queue_topics(status, request.args.get('department'))[-1]
+    subscription = event_broker.subscribe(
+        topic, request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    )
+    
+    def stream():
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                event = subscription.get(timeout=SSE_KEEPALIVE)
+                if event is None:
+                    # Also how a closed connection is noticed
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+                if event[1] == RESET_EVENT:
+                    return
+        finally:
+            subscription.close()
+    
+    return app.response_class(stream(), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 # ==================== Common Routes ====================
 
 @app.route('/request/view/<int:request_id>')
 def view_request(request_id):
     """View detailed request information"""
-    request_data = db.get_request_by_id(request_id)
-    approvals = db.get_request_approvals(request_id)
+    request_data = db.get_request_details(request_id)
     
     if not request_data:
         flash('Request not found', 'error')
@@ -269,40 +552,135 @@ def view_request(request_id):
     
     return render_template('view_request.html', 
                          request=request_data, 
-                         approvals=approvals)
+                         approvals=request_data['approvals'])
 
 
-@app.route('/attachment/<int:request_id>')
-def view_attachment(request_id):
-    """View or download attachment for a request"""
-    request_data = db.get_request_by_id(request_id)
+def cache_privately(response, max_age=None):
+    """
+    Let browsers cache an attachment response but keep shared caches out
+    
+    Attachments are per-user data, so every response for one (200, 304,
+    or an nginx X-Accel-Redirect) must be marked private.
+    
+    Args:
+        response: Response to mark
+        max_age: Seconds the browser may reuse it without revalidating
+        
+    Returns:
+        The same response
+    """
+    response.cache_control.public = False
+    response.cache_control.private = True
+    if max_age is not None:
+        response.cache_control.max_age = max_age
+    return response
+
+
+def load_attachment_request(request_id):
+    """
+    Fetch a request for attachment access and check the viewer may see it
+    
+    Returns:
+        (request_data, None) if allowed, otherwise (None, redirect response)
+    """
+    request_data = db.get_request_attachment(request_id)
     
     if not request_data or not request_data.get('attachment_path'):
         flash('Attachment not found', 'error')
-        return redirect(url_for('index'))
+        return None, redirect(url_for('index'))
     
     # Check if user is authorized
     if 'user_id' not in session:
         flash('Please login to view attachments', 'error')
-        return redirect(url_for('index'))
+        return None, redirect(url_for('index'))
     
     # Students can only view their own attachments
     if session.get('role') == 'student' and request_data['student_id'] != session.get('user_id'):
         flash('Unauthorized access', 'error')
-        return redirect(url_for('student_dashboard'))
+        return None, redirect(url_for('student_dashboard'))
+    
+    return request_data, None
+
+
+@app.route('/attachment/<int:request_id>')
+def view_attachment(request_id):
+    """View or download attachment for a request"""
+    request_data, denied = load_attachment_request(request_id)
+    if denied:
+        return denied
     
     file_path = request_data['attachment_path']
     
-    if not os.path.exists(file_path):
+    # Get filename and check if download is requested
+    filename = format_attachment_name(request_data)
+    download = request.args.get('download', 'false').lower() == 'true'
+    
+    # Content-addressed files never change, so their digest is a strong
+    # ETag and revalidation needs no filesystem access at all
+    etag = attachment_store.digest_of(file_path)
+    max_age = app.config['ATTACHMENT_MAX_AGE'] if etag else None
+    if etag and request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return cache_privately(response, max_age)
+    
+    accel_prefix = app.config['ATTACHMENT_ACCEL_PREFIX']
+    if accel_prefix:
+        # nginx serves the bytes (including Range and conditional requests)
+        relative = os.path.relpath(file_path, app.config['UPLOAD_FOLDER']).replace(os.sep, '/')
+        response = app.response_class(
+            mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        )
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + relative
+        response.headers.set('Content-Disposition', 
+                             'attachment' if download else 'inline', 
+                             filename=filename)
+        if etag:
+            response.set_etag(etag)
+        return cache_privately(response, max_age)
+    
+    # Send file for viewing in browser or download; conditional=True
+    # answers If-None-Match/If-Modified-Since with 304 and Range with 206
+    try:
+        response = send_file(
+            file_path, 
+            as_attachment=download, 
+            download_name=filename,
+            conditional=True,
+            etag=etag or True,
+            max_age=max_age
+        )
+    except FileNotFoundError:
         flash('Attachment file not found on server', 'error')
         return redirect(url_for('view_request', request_id=request_id))
     
-    # Get filename and check if download is requested
-    filename = os.path.basename(file_path)
-    download = request.args.get('download', 'false').lower() == 'true'
+    return cache_privately(response)
+
+
+@app.route('/attachment/<int:request_id>/<rendition>')
+def view_attachment_rendition(request_id, rendition):
+    """Serve a cached thumbnail or first-page preview of an attachment"""
+    if rendition not in RENDITIONS:
+        return page_not_found(None)
     
-    # Send file for viewing in browser or download
-    return send_file(file_path, as_attachment=download, download_name=filename)
+    request_data, denied = load_attachment_request(request_id)
+    if denied:
+        return denied
+    
+    file_path = request_data['attachment_path']
+    try:
+        response = send_file(
+            rendition_path(file_path, rendition),
+            mimetype='image/jpeg',
+            conditional=True,
+            max_age=app.config['ATTACHMENT_MAX_AGE']
+        )
+    except FileNotFoundError:
+        # Not rendered yet (or dropped under load): queue it for next time
+        thumbnail_worker.submit(file_path)
+        return page_not_found(None)
+    
+    return cache_privately(response)
 
 
 @app.route('/all-requests')
@@ -315,76 +693,76 @@ def all_requests():
     # Get filter parameters
     status_filter = request.args.get('status', 'all')
     search_query = request.args.get('search', '')
+    per_page = request.args.get('per_page', DEFAULT_PAGE_SIZE, type=int)
+    per_page = max(1, min(per_page, MAX_PAGE_SIZE))
     
-    if role == 'student':
-        # Students see only their requests
-        if status_filter == 'all':
-            requests = db.execute_query(
-                """SELECT * FROM requests 
-                   WHERE student_id = %s 
-                   ORDER BY created_at DESC""",
-                (user_id,),
-                fetch=True
-            )
-        else:
-            requests = db.execute_query(
-                """SELECT * FROM requests 
-                   WHERE student_id = %s AND status = %s 
-                   ORDER BY created_at DESC""",
-                (user_id, status_filter),
-                fetch=True
-            )
-    else:
-        # Coordinators and HODs see all requests
-        if status_filter == 'all':
-            requests = db.execute_query(
-                """SELECT r.*, s.name as student_name, s.department, s.email 
-                   FROM requests r
-                   JOIN students s ON r.student_id = s.student_id
-                   ORDER BY r.created_at DESC""",
-                fetch=True
-            )
-        else:
-            requests = db.execute_query(
-                """SELECT r.*, s.name as student_name, s.department, s.email 
-                   FROM requests r
-                   JOIN students s ON r.student_id = s.student_id
-                   WHERE r.status = %s
-                   ORDER BY r.created_at DESC""",
-                (status_filter,),
-                fetch=True
-            )
-    
-    # Apply search filter if provided
-    if search_query and requests:
-        search_lower = search_query.lower()
-        requests = [
-            r for r in requests 
-            if search_lower in r.get('subject', '').lower() 
-            or search_lower in r.get('description', '').lower()
-            or (r.get('student_name') and search_lower in r.get('student_name', '').lower())
-        ]
-    
-    # Calculate statistics
-    stats = {
-        'total': len(requests) if requests else 0,
-        'pending': 0,
-        'approved_by_coordinator': 0,
-        'approved': 0,
-        'rejected': 0
-    }
+    # Keyset pagination: 'after' moves to older requests, 'before' to newer ones
+    before = decode_page_cursor(request.args.get('before'))
+    after = decode_page_cursor(request.args.get('after'))
     
-    if requests:
-        for r in requests:
-            stats[r['status']] = stats.get(r['status'], 0) + 1
+    # Students see only their requests; coordinators and HODs see all
+    student_id = user_id if role == 'student' else None
+    status = status_filter if status_filter != 'all' else None
+    
+    page = db.get_requests_page(
+        student_id=student_id,
+        status=status,
+        search=search_query or None,
+        cursor=before or after,
+        backwards=before is not None,
+        page_size=per_page
+    ) or {'requests': [], 'next_cursor': None, 'prev_cursor': None}
+    
+    # Statistics come from the materialized counters, not the visible page
+    if student_id is not None:
+        stats = db.get_status_counters('student', student_id)
+    else:
+        stats = db.get_status_counters()
     
     return render_template('all_requests.html', 
-                         requests=requests,
+                         requests=page['requests'],
+                         next_cursor=page['next_cursor'],
+                         prev_cursor=page['prev_cursor'],
+                         per_page=per_page,
                          stats=stats,
                          current_filter=status_filter,
                          search_query=search_query)
 
 
+@app.route('/export/requests')
+@login_required()
+def export_requests():
+    """
+    Download requests with their approval history as CSV or XLSX
+    
+    Query parameters: format (csv/xlsx), status, department, from, to
+    (submission dates, YYYY-MM-DD). Rows are streamed from the database
+    as the file is sent, so exports of any size use constant memory.
+    """
+    if session.get('role') not in ('coordinator', 'hod'):
+        flash('Unauthorized access', 'error')
+        return redirect(url_for('index'))
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        fmt = 'csv'
+    status = request.args.get('status')
+    filters = {
+        'status': status if status in REQUEST_STATUSES else None,
+        'department': request.args.get('department') or None,
+        'date_from': parse_date(request.args.get('from')),
+        'date_to': parse_date(request.args.get('to')),
+    }
+    
+    response = app.response_class(
+        stream_with_context(iter_export(db, fmt, **filters)),
+        mimetype=EXPORT_MIMETYPES[fmt]
+    )
+    response.headers.set('Content-Disposition', 'attachment',
+                         filename=f'requests.{fmt}')
+    return response
+
+
 @app.route('/logout')
 def logout():
     """Logout user"""
@@ -393,6 +771,75 @@ def logout():
     return redirect(url_for('index'))
 
 
+# ==================== API Routes ====================
+
+def _json_value(value):
+    """Render datetimes as ISO 8601 for JSON responses"""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def sync_response(changes):
+    """
+    Build the /api/requests JSON body from a get_request_changes() batch
+    
+    Attachment storage paths are left out; clients fetch attachments
+    through /attachment/<request_id>.
+    """
+    requests_json = []
+    for row in changes['requests']:
+        item = {key: _json_value(value) for key, value in row.items()
+                if key not in ('attachment_path', 'approvals')}
+        item['approvals'] = [{key: _json_value(value) for key, value in approval.items()}
+                             for approval in row['approvals']]
+        requests_json.append(item)
+    return {'requests': requests_json, 'since': changes['since'], 'has_more': changes['has_more']}
+
+
+def sync_params(args):
+    """
+    Read the since and limit parameters of /api/requests
+    
+    Args:
+        args: Query string (request.args of either app)
+        
+    Returns:
+        (since, limit), since being None for a full sync, or None if the
+        since token is invalid
+    """
+    token = args.get('since')
+    since = decode_sync_token(token)
+    if token and since is None:
+        return None
+    limit = args.get('limit', SYNC_BATCH_SIZE, type=int)
+    return since, max(1, min(limit, MAX_SYNC_BATCH_SIZE))
+
+
+@app.route('/api/requests')
+def api_requests():
+    """
+    Delta-sync feed of requests as JSON
+    
+    Returns the requests (with their approvals) changed after the
+    ?since= token, oldest change first, plus the token for the next
+    call. Without a token it starts from the beginning. Keep calling
+    with the returned token while has_more is true. Scoped like
+    /all-requests: students get their own requests, coordinators and
+    HODs get all of them.
+    """
+    if 'user_id' not in session:
+        return {'error': 'Login required'}, 401
+    params = sync_params(request.args)
+    if params is None:
+        return {'error': 'Invalid since token'}, 400
+    since, limit = params
+    
+    student_id = session['user_id'] if session.get('role') == 'student' else None
+    changes = db.get_request_changes(student_id, since, limit)
+    if changes is None:
+        return {'error': 'Could not read request changes'}, 500
+    return sync_response(changes), 200, {'Cache-Control': 'no-store'}
+
+
 # ==================== Error Handlers ====================
 
 @app.errorhandler(404)
@@ -405,6 +852,13 @@ def internal_error(e):
     return render_template('500.html'), 500
 
 
+@app.errorhandler(DatabaseUnavailableError)
+def database_unavailable(e):
+    # Also covers ConnectionLostError and PoolTimeoutError
+    print(f"Database unavailable: {e}")
+    return render_template('503.html'), 503, {'Retry-After': str(DATABASE_RETRY_AFTER)}
+
+
 # ==================== Template Filters ====================
 
 @app.template_filter('datetime')
@@ -415,6 +869,22 @@ def format_datetime(value):
     return ''
 
 
+@app.template_filter('attachment_name')
+def format_attachment_name(req):
+    """Original filename of a request's attachment"""
+    if req.get('attachment_name'):
+        return req['attachment_name']
+    # Legacy uploads stored the name in the path
+    return os.path.basename(req['attachment_path'].replace('\\', '/'))
+
+
+@app.template_filter('has_preview')
+def has_preview(req):
+    """Whether an attachment type gets thumbnail/preview renditions"""
+    path = req.get('attachment_path') or ''
+    return os.path.splitext(path)[1].lower() in PREVIEW_EXTENSIONS
+
+
 @app.template_filter('date')
 def format_date(value):
     """Format date for display"""
@@ -0,0 +1,315 @@
+"""
+Attendance Request & Approval System
+ASGI Entry Point - asyncio serving mode
+
+The read-heavy pages (the three dashboards, the request detail page,
+the all-requests list and the /api/requests sync feed) are served by a Quart app on the event loop, with
+their queries running on aiomysql (aiosqlite for the SQLite backend)
+through AsyncDatabase. A slow query then parks a coroutine instead of a
+worker thread, so one process can hold thousands of in-flight dashboard
+requests. Every other route (logins, forms, approvals, attachments,
+exports, /metrics) is handed to the Flask app from app.py, which runs
+unchanged in a thread pool. Both apps share the session cookie, the
+templates, the query cache, the metrics registry and the event broker,
+so the dashboards' live event streams are also held here as coroutines
+rather than one worker thread each.
+
+Usage:
+    hypercorn asgi:application --bind 0.0.0.0:5000
+    python asgi.py
+"""
+
+import asyncio
+import os
+import time
+
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from quart import Quart, flash, g, make_response, redirect, render_template, request, session, url_for
+from werkzeug.exceptions import HTTPException
+
+from app import (app as flask_app, DATABASE_RETRY_AFTER, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE,
+                 QUEUE_STATUSES, SSE_KEEPALIVE, SSE_RETRY_MS,
+                 format_attachment_name, format_date, format_datetime, has_preview,
+                 queue_events_since, sync_params, sync_response)
+from async_db import AsyncDatabase
+from db_config import db, decode_page_cursor, DatabaseUnavailableError
+from events import broker as event_broker, format_sse, queue_topics, RESET_EVENT
+from metrics import registry as metrics, async_database_collector
+
+# Endpoints served on the event loop; everything else goes to Flask
+ASYNC_ENDPOINTS = {'student_dashboard', 'coordinator_dashboard', 'hod_dashboard',
+                   'view_request', 'all_requests', 'queue_events', 'api_requests'}
+ASYNC_POOL_SIZE = 20  # Concurrent async queries; waiting requests hold no thread
+
+# Event streams hold no thread here, so live dashboard updates are on by
+# default. Events stay within one process: set ATTENDANCE_LIVE_UPDATES=0
+# when running several workers (hypercorn --workers N).
+flask_app.config['LIVE_QUEUE_UPDATES'] = os.environ.get('ATTENDANCE_LIVE_UPDATES', '1') == '1'
+
+async_app = Quart(__name__)
+# Same key and cookie settings, so a session started in either app is valid in both
+async_app.config.update({key: value for key, value in flask_app.config.items()
+                         if key == 'SECRET_KEY' or key.startswith(('SESSION_', 'PERMANENT_'))})
+
+for name, view_filter in (('datetime', format_datetime), ('attachment_name', format_attachment_name),
+                          ('has_preview', has_preview), ('date', format_date)):
+    async_app.add_template_filter(view_filter, name)
+
+# Register the Flask routes without views so url_for() in the shared
+# templates can build links to them
+for rule in flask_app.url_map.iter_rules():
+    if rule.endpoint not in ASYNC_ENDPOINTS and rule.endpoint != 'static':
+        async_app.add_url_rule(rule.rule, rule.endpoint, methods=rule.methods)
+
+adb = AsyncDatabase(db, pool_max_size=ASYNC_POOL_SIZE)
+metrics.add_collector(async_database_collector(adb))
+
+
+def login_required(role=None):
+    """Decorator to check if user is logged in"""
+    def decorator(f):
+        async def wrapper(*args, **kwargs):
+            if 'user_id' not in session:
+                await flash('Please login first', 'error')
+                return redirect(url_for('index'))
+            if role and session.get('role') != role:
+                await flash('Unauthorized access', 'error')
+                return redirect(url_for('index'))
+            return await f(*args, **kwargs)
+        wrapper.__name__ = f.__name__
+        return wrapper
+    return decorator
+
+
+@async_app.before_serving
+async def open_database():
+    """Connect the synchronous pool (and migrate SQLite) and the asyncio pool"""
+    if not db.connect():
+        print("Failed to connect to database. Please check your configuration.")
+    if await adb.connect():
+        print("Database connected successfully!")
+
+
+@async_app.after_serving
+async def close_database():
+    """Close both connection pools"""
+    await adb.disconnect()
+    db.disconnect()
+
+
+@async_app.before_request
+async def start_request():
+    """Start timing the request and set up its read routing"""
+    g.request_started = time.perf_counter()
+    metrics.begin_request()
+    adb.begin_request(session.get('db_last_write'))
+
+
+@async_app.after_request
+async def record_request_metrics(response):
+    """Record route latency and the share of it spent in the database"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        metrics.observe_route(
+            request.endpoint or 'unmatched',
+            request.method,
+            response.status_code,
+            time.perf_counter() - started,
+            metrics.end_request()
+        )
+    return response
+
+
+# ==================== Dashboards ====================
+
+@async_app.route('/student/dashboard')
+@login_required('student')
+async def student_dashboard():
+    """Student dashboard - view requests"""
+    student_id = session.get('user_id')
+    requests = await adb.get_student_requests(student_id)
+    return await render_template('student_dashboard.html', requests=requests)
+
+
+@async_app.route('/coordinator/dashboard')
+@login_required('coordinator')
+async def coordinator_dashboard():
+    """Coordinator dashboard - view pending requests"""
+    events_since = queue_events_since()
+    pending_requests = await adb.get_requests_by_status('pending')
+    return await render_template('coordinator.html', requests=pending_requests,
+                                 events_since=events_since)
+
+
+@async_app.route('/hod/dashboard')
+@login_required('hod')
+async def hod_dashboard():
+    """HOD dashboard - view coordinator-approved requests"""
+    events_since = queue_events_since()
+    approved_requests = await adb.get_requests_by_status('approved_by_coordinator')
+    return await render_template('hod.html', requests=approved_requests,
+                                 events_since=events_since)
+
+
+@async_app.route('/events/queue')
+@login_required()
+async def queue_events():
+    """Stream changes to the user's review queue (see queue_events in app.py)"""
+    if not flask_app.config['LIVE_QUEUE_UPDATES']:
+        return 'Live updates are disabled', 404
+    status = QUEUE_STATUSES.get(session.get('role'))
+    if status is None:
+        return 'Forbidden', 403
+    topic = queue_topics(status, request.args.get('department'))[-1]
+    subscription = event_broker.subscribe_async(
+        topic, request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    )
+
+    async def stream():
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                event = await subscription.get(timeout=SSE_KEEPALIVE)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+                if event[1] == RESET_EVENT:
+                    return
+        finally:
+            subscription.close()
+
+    response = await make_response(stream(), {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.mimetype = 'text/event-stream'
+    response.timeout = None  # Open for as long as the dashboard is
+    return response
+
+
+# ==================== Common Routes ====================
+
+@async_app.route('/request/view/<int:request_id>')
+async def view_request(request_id):
+    """View detailed request information"""
+    request_data = await adb.get_request_details(request_id)
+
+    if not request_data:
+        await flash('Request not found', 'error')
+        return redirect(url_for('index'))
+
+    return await render_template('view_request.html',
+                                 request=request_data,
+                                 approvals=request_data['approvals'])
+
+
+@async_app.route('/all-requests')
+@login_required()
+async def all_requests():
+    """View all requests with filters - accessible by all logged-in users"""
+    role = session.get('role')
+    user_id = session.get('user_id')
+
+    status_filter = request.args.get('status', 'all')
+    search_query = request.args.get('search', '')
+    per_page = request.args.get('per_page', DEFAULT_PAGE_SIZE, type=int)
+    per_page = max(1, min(per_page, MAX_PAGE_SIZE))
+
+    before = decode_page_cursor(request.args.get('before'))
+    after = decode_page_cursor(request.args.get('after'))
+
+    student_id = user_id if role == 'student' else None
+    status = status_filter if status_filter != 'all' else None
+
+    # The page and the counters are independent, so they are read concurrently
+    page, stats = await asyncio.gather(
+        adb.get_requests_page(
+            student_id=student_id,
+            status=status,
+            search=search_query or None,
+            cursor=before or after,
+            backwards=before is not None,
+            page_size=per_page
+        ),
+        adb.get_status_counters('student', student_id) if student_id is not None
+        else adb.get_status_counters()
+    )
+    page = page or {'requests': [], 'next_cursor': None, 'prev_cursor': None}
+
+    return await render_template('all_requests.html',
+                                 requests=page['requests'],
+                                 next_cursor=page['next_cursor'],
+                                 prev_cursor=page['prev_cursor'],
+                                 per_page=per_page,
+                                 stats=stats,
+                                 current_filter=status_filter,
+                                 search_query=search_query)
+
+
+# ==================== API Routes ====================
+
+@async_app.route('/api/requests')
+async def api_requests():
+    """Delta-sync feed of requests as JSON (see api_requests in app.py)"""
+    if 'user_id' not in session:
+        return {'error': 'Login required'}, 401
+    params = sync_params(request.args)
+    if params is None:
+        return {'error': 'Invalid since token'}, 400
+    since, limit = params
+
+    student_id = session['user_id'] if session.get('role') == 'student' else None
+    changes = await adb.get_request_changes(student_id, since, limit)
+    if changes is None:
+        return {'error': 'Could not read request changes'}, 500
+    return sync_response(changes), 200, {'Cache-Control': 'no-store'}
+
+
+# ==================== Error Handlers ====================
+
+@async_app.errorhandler(404)
+async def page_not_found(e):
+    return await render_template('404.html'), 404
+
+
+@async_app.errorhandler(500)
+async def internal_error(e):
+    return await render_template('500.html'), 500
+
+
+@async_app.errorhandler(DatabaseUnavailableError)
+async def database_unavailable(e):
+    # Also covers ConnectionLostError and PoolTimeoutError
+    print(f"Database unavailable: {e}")
+    return await render_template('503.html'), 503, {'Retry-After': str(DATABASE_RETRY_AFTER)}
+
+
+# ==================== Dispatch ====================
+
+# Uploads reach Flask through this wrapper, which buffers the request body
+wsgi_app = AsyncioWSGIMiddleware(flask_app, max_body_size=flask_app.config['MAX_CONTENT_LENGTH'] + 65536)
+_flask_routes = flask_app.url_map.bind('')
+
+
+def is_async_route(path, method):
+    """Whether a request is handled by the asyncio app"""
+    try:
+        endpoint, _ = _flask_routes.match(path, method)
+    except HTTPException:
+        return False
+    return endpoint in ASYNC_ENDPOINTS
+
+
+async def application(scope, receive, send):
+    """ASGI application routing each request to the Quart or the Flask app"""
+    if scope['type'] == 'lifespan' or (
+            scope['type'] == 'http' and is_async_route(scope['path'], scope['method'])):
+        await async_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
+
+
+if __name__ == '__main__':
+    config = Config()
+    config.bind = ['0.0.0.0:5000']
+    asyncio.run(serve(application, config))
@@ -0,0 +1,440 @@
+"""
+Asyncio Database Module
+Non-blocking versions of the dashboard read helpers for the ASGI app
+
+AsyncDatabase runs the same SQL as DatabaseConfig's read helpers, but on
+aiomysql (or aiosqlite) connections, so a request waiting on MySQL
+parks a coroutine instead of a worker thread. It shares the wrapped
+DatabaseConfig's dialect, query cache, metrics, retry settings and read
+replicas, so writes made through the synchronous app invalidate the
+results it caches.
+"""
+
+import asyncio
+from contextvars import ContextVar
+import time
+
+from db_config import (ConnectionLostError, DatabaseUnavailableError, PoolTimeoutError,
+                       QUEUE_CACHE_TTL, Replica, ReplicaRouter,
+                       REQUESTS_BY_STATUS_QUERY, STATUS_COUNTERS_QUERY, STUDENT_REQUESTS_QUERY,
+                       request_changes_query, request_changes_result, request_details_query,
+                       request_details_result, requests_page_query, requests_page_result,
+                       status_counts)
+from dialects import ASYNC_DATABASE_ERRORS as AsyncDatabaseError
+from metrics import query_name
+
+
+class AsyncConnectionPool:
+    """
+    Pool of asyncio database connections
+
+    The asyncio counterpart of ConnectionPool: connections are opened
+    lazily up to max_size, coroutines that find the pool exhausted wait
+    up to `timeout` seconds without blocking the event loop, and only
+    connections idle for check_after seconds are health-checked. A pool
+    belongs to the event loop it was first used on.
+    """
+
+    def __init__(self, factory, close, min_size=1, max_size=20, timeout=5.0, check=None,
+                 check_after=30.0):
+        """
+        Initialize asyncio connection pool
+
+        Args:
+            factory: Coroutine function returning a new open connection
+            close: Coroutine function closing a connection
+            min_size: Connections opened eagerly by fill()
+            max_size: Upper bound on open connections
+            timeout: Seconds to wait for a free connection before failing
+            check: Optional coroutine function run on checkout that revives
+                a dropped connection or raises
+            check_after: Seconds a connection may sit idle before check
+                runs on its next checkout (0 checks every checkout)
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size, max_size >= 1")
+        self.factory = factory
+        self._close = close
+        self.check = check
+        self.check_after = check_after
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = None  # asyncio.LifoQueue of (connection, released time), made on first use
+        self._size = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _queue(self):
+        """Idle queue, created inside the running event loop"""
+        if self._idle is None:
+            self._idle = asyncio.LifoQueue()
+        return self._idle
+
+    async def fill(self):
+        """Open connections until the pool holds at least min_size"""
+        while self._size < self.min_size:
+            self._size += 1
+            try:
+                conn = await self.factory()
+            except BaseException:
+                self._size -= 1
+                raise
+            self._queue().put_nowait((conn, time.monotonic()))
+
+    async def _grow(self):
+        """Open a new connection if the pool is below max_size"""
+        if self._size >= self.max_size:
+            return None
+        self._size += 1
+        try:
+            return await self.factory()
+        except BaseException:
+            self._size -= 1
+            raise
+
+    async def acquire(self, verify=False):
+        """
+        Check out a connection
+
+        Args:
+            verify: Health-check the connection even if it was used recently
+
+        Returns:
+            An open connection owned by the caller until release()
+
+        Raises:
+            PoolTimeoutError: No connection was freed within the timeout
+        """
+        started = time.monotonic()
+        idle = self._queue()
+        idle_since = None  # None for a brand-new connection
+        try:
+            conn, idle_since = idle.get_nowait()
+        except asyncio.QueueEmpty:
+            conn = await self._grow()
+            if conn is None:
+                try:
+                    conn, idle_since = await asyncio.wait_for(idle.get(), self.timeout)
+                except asyncio.TimeoutError:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+
+        stale = idle_since is not None and (
+            verify or time.monotonic() - idle_since >= self.check_after)
+        if self.check is not None and stale:
+            try:
+                await self.check(conn)
+            except BaseException:
+                await self._discard(conn)
+                raise
+
+        waited = time.monotonic() - started
+        self._checkouts += 1
+        if waited > 0.001:
+            self._waits += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        return conn
+
+    async def release(self, conn, discard=False):
+        """
+        Return a connection to the pool
+
+        Args:
+            conn: Connection from acquire()
+            discard: Close it instead (e.g. after a lost connection)
+        """
+        if discard:
+            await self._discard(conn)
+        else:
+            self._queue().put_nowait((conn, time.monotonic()))
+
+    async def _discard(self, conn):
+        """Close a connection and free its slot"""
+        self._size -= 1
+        try:
+            await self._close(conn)
+        except Exception:
+            pass
+
+    async def close(self):
+        """Close all idle connections"""
+        idle = self._queue()
+        while True:
+            try:
+                conn, _ = idle.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await self._discard(conn)
+
+    def stats(self):
+        """Return pool statistics (same keys as ConnectionPool.stats())"""
+        idle = self._idle.qsize() if self._idle is not None else 0
+        return {
+            'size': self._size,
+            'idle': idle,
+            'in_use': self._size - idle,
+            'min_size': self.min_size,
+            'max_size': self.max_size,
+            'checkouts': self._checkouts,
+            'waits': self._waits,
+            'timeouts': self._timeouts,
+            'total_wait': self._total_wait,
+            'max_wait': self._max_wait,
+            'avg_wait': self._total_wait / self._checkouts if self._checkouts else 0.0,
+        }
+
+
+class AsyncDatabase:
+    """Asyncio read helpers over a DatabaseConfig's database"""
+
+    def __init__(self, db, pool_min_size=1, pool_max_size=20):
+        """
+        Initialize asyncio database access
+
+        Args:
+            db: DatabaseConfig whose database, replicas, cache, metrics
+                and retry settings are used
+            pool_min_size: Connections opened by connect()
+            pool_max_size: Maximum concurrent queries; further requests
+                wait for a connection without holding a thread
+        """
+        self.db = db
+        self.dialect = db.dialect
+        self.pool = self._pool(db.dialect, pool_min_size, pool_max_size)
+        self.replicas = None
+        if db.replicas is not None:
+            self.replicas = ReplicaRouter([
+                Replica(r.name, self._pool(r.dialect, pool_min_size, pool_max_size),
+                        r.weight, r.dialect)
+                for r in db.replicas.replicas
+            ])
+        self._pinned = ContextVar('pinned', default=False)
+        self._skip_cache = ContextVar('skip_cache', default=False)
+
+    def _pool(self, dialect, min_size, max_size):
+        """Build an asyncio pool for one server"""
+        return AsyncConnectionPool(
+            dialect.connect_async,
+            dialect.close_async,
+            min_size=min_size,
+            max_size=max_size,
+            timeout=self.db.pool.timeout,
+            check=dialect.check_async,
+            check_after=self.db.pool.check_after
+        )
+
+    async def connect(self):
+        """
+        Open the asyncio connections (call from inside the event loop)
+
+        Returns:
+            True on success, False if the primary cannot be reached
+        """
+        try:
+            await self.pool.fill()
+        except (AsyncDatabaseError, OSError) as e:
+            print(f"Error connecting to database: {e}")
+            return False
+        if self.replicas is not None:
+            for replica in self.replicas.replicas:
+                try:
+                    await replica.pool.fill()
+                except (AsyncDatabaseError, OSError) as e:
+                    print(f"Replica {replica.name} unavailable: {e}")
+                    self.replicas.mark_down(replica)
+        return True
+
+    async def disconnect(self):
+        """Close all pooled asyncio connections"""
+        await self.pool.close()
+        if self.replicas is not None:
+            for replica in self.replicas.replicas:
+                await replica.pool.close()
+
+    def pool_stats(self):
+        """Return asyncio connection pool statistics"""
+        return self.pool.stats()
+
+    def begin_request(self, last_write=None):
+        """
+        Set up read routing for one web request (see DatabaseConfig.begin_request)
+
+        The flags are context variables, so concurrent requests on the
+        event loop are routed independently.
+        """
+        since_write = time.time() - last_write if last_write is not None else None
+        self._pinned.set(since_write is not None and self.db.replicas is not None and
+                         since_write < self.db.replica_pin_seconds)
+        self._skip_cache.set(since_write is not None and self.db.cache is not None and
+                             since_write < self.db.cache.ttl)
+
+    async def _acquire(self, pool, verify=False):
+        """
+        Check out a connection, reporting connection failures as unavailability
+
+        Raises:
+            DatabaseUnavailableError: No connection could be opened or revived
+        """
+        try:
+            return await pool.acquire(verify)
+        except DatabaseUnavailableError:
+            raise
+        except (AsyncDatabaseError, OSError) as e:
+            raise DatabaseUnavailableError(f"Cannot connect to database: {e}") from e
+
+    async def _acquire_read(self, verify=False):
+        """
+        Check out a connection, preferring a replica unless the request is pinned
+
+        Returns:
+            (pool, conn)
+        """
+        if self.replicas is not None and not self._pinned.get():
+            replica = self.replicas.choose()
+            if replica is not None:
+                try:
+                    return replica.pool, await self._acquire(replica.pool, verify)
+                except PoolTimeoutError as e:
+                    # Busy, not down: leave it in rotation
+                    print(f"Replica {replica.name} busy, reading from primary: {e}")
+                except DatabaseUnavailableError as e:
+                    print(f"Replica {replica.name} unavailable, reading from primary: {e}")
+                    self.replicas.mark_down(replica)
+        return self.pool, await self._acquire(self.pool, verify)
+
+    async def fetch(self, query, params=None, statement=None):
+        """
+        Run a SELECT
+
+        Like DatabaseConfig.execute_query(fetch=True): a read that loses
+        its connection is retried with backoff on a verified connection.
+        A connection whose query was cancelled mid-flight (the client went
+        away) is closed rather than reused.
+
+        Args:
+            query: SQL query string
+            params: Query parameters (tuple)
+            statement: Name the query is recorded under in the metrics
+
+        Returns:
+            List of row dicts, or None if the query failed
+
+        Raises:
+            DatabaseUnavailableError: The database could not be reached
+            ConnectionLostError: The connection kept dropping
+        """
+        attempts = 1 + self.db.read_retries
+        for attempt in range(attempts):
+            pool, conn = await self._acquire_read(verify=attempt > 0)
+            broken = True
+            started = time.perf_counter()
+            rows, failed = 0, True
+            try:
+                result = await self.dialect.fetch_async(conn, self.dialect.translate(query), params)
+                broken = False
+                rows, failed = len(result), False
+                return result
+            except AsyncDatabaseError as e:
+                if self.dialect.is_disconnect(e):
+                    if attempt + 1 < attempts:
+                        await asyncio.sleep(min(self.db.retry_backoff * 2 ** attempt, 1.0))
+                        continue
+                    raise ConnectionLostError(f"Lost database connection: {e}") from e
+                broken = False
+                print(f"Error executing query: {e}")
+                return None
+            finally:
+                self.db.record_query(statement or query_name(query), query,
+                                     time.perf_counter() - started, rows, failed)
+                await pool.release(conn, discard=broken)
+
+    async def cached_fetch(self, query, params, tables, statement=None, ttl=None):
+        """
+        Run a SELECT through the shared query cache (see DatabaseConfig.cached_query)
+
+        Returns:
+            List of results, or None on error (errors are not cached)
+        """
+        cache = self.db.cache
+        if cache is None or self._pinned.get() or self._skip_cache.get():
+            return await self.fetch(query, params, statement)
+
+        key = (query, params)
+        hit, result = cache.get(key, tables)
+        if hit:
+            return result
+
+        versions = cache.snapshot(tables)
+        lagging = self.db.replicas_lagging()
+        result = await self.fetch(query, params, statement)
+        if result is not None and not lagging:
+            cache.put(key, versions, result, ttl)
+        return result
+
+    async def get_requests_by_status(self, status):
+        """Get all requests with specific status"""
+        return await self.cached_fetch(REQUESTS_BY_STATUS_QUERY, (status,),
+                                       ('requests', 'students'), 'requests_by_status',
+                                       QUEUE_CACHE_TTL)
+
+    async def get_student_requests(self, student_id):
+        """Get all requests for a specific student"""
+        return await self.cached_fetch(STUDENT_REQUESTS_QUERY, (student_id,), ('requests',),
+                                       'student_requests', QUEUE_CACHE_TTL)
+
+    async def get_requests_page(self, student_id=None, status=None, search=None,
+                                cursor=None, backwards=False, page_size=25):
+        """
+        Get one page of requests, newest first (see DatabaseConfig.get_requests_page)
+
+        Returns:
+            Dict with 'requests', 'next_cursor' and 'prev_cursor', or None on error
+        """
+        query, params, cursor = requests_page_query(
+            self.dialect, student_id, status, search, cursor, backwards, page_size
+        )
+        rows = await self.fetch(query, params)
+        if rows is None:
+            return None
+        return requests_page_result(rows, page_size, backwards, cursor)
+
+    async def get_status_counters(self, scope='global', key=''):
+        """
+        Read materialized request counts per status
+
+        Returns:
+            Dict with 'total' and one key per status
+        """
+        rows = await self.cached_fetch(STATUS_COUNTERS_QUERY, (scope, str(key)),
+                                       ('request_counters',), ttl=QUEUE_CACHE_TTL)
+        return status_counts(rows or [])
+
+    async def get_request_details(self, request_id):
+        """Get request details with its approval history, or None if it does not exist"""
+        rows = await self.cached_fetch(request_details_query(self.dialect, 1), (request_id,),
+                                       ('requests', 'students', 'approvals'), 'request_details',
+                                       QUEUE_CACHE_TTL)
+        if not rows:
+            return None
+        return request_details_result(rows).get(request_id)
+
+    async def get_request_changes(self, student_id=None, since=None, limit=100):
+        """
+        Get the requests changed after a delta-sync token (see DatabaseConfig.get_request_changes)
+
+        Returns:
+            Dict with 'requests', 'since' and 'has_more', or None on error
+        """
+        query, params = request_changes_query(self.dialect, student_id, since, limit)
+        rows = await self.fetch(query, params)
+        if rows is None:
+            return None
+        return request_changes_result(rows, limit, since, self.db.sync_overlap())
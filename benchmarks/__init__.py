@@ -0,0 +1,4 @@
+"""
+Benchmarks for the Attendance Request & Approval System
+Run modules with: python -m benchmarks.<name>
+"""
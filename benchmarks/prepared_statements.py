@@ -0,0 +1,128 @@
+"""
+Prepared Statement Benchmark
+Compares per-query latency of text-protocol queries and cached prepared
+statements on the login and dashboard paths.
+
+Usage:
+    python -m benchmarks.prepared_statements --iterations 2000
+"""
+
+import argparse
+import statistics
+import time
+
+from db_config import DatabaseConfig, STUDENT_LOGIN_QUERY, USER_LOGIN_QUERY
+
+
+def sample_params(db):
+    """Pick existing rows so every benchmarked query returns data"""
+    student = db.execute_query("SELECT email FROM students LIMIT 1", fetch=True)
+    user = db.execute_query("SELECT email, role FROM users LIMIT 1", fetch=True)
+    request = db.execute_query(
+        "SELECT request_id, student_id, status FROM requests ORDER BY request_id DESC LIMIT 1",
+        fetch=True
+    )
+    if not (student and user and request):
+        return None
+    return {
+        'student_email': student[0]['email'],
+        'user_email': user[0]['email'],
+        'user_role': user[0]['role'],
+        'request_id': request[0]['request_id'],
+        'student_id': request[0]['student_id'],
+        'status': request[0]['status'],
+    }
+
+
+def workloads(db, params):
+    """Map each benchmarked path to a zero-argument callable"""
+    return {
+        'student_login': lambda: db.execute_query(
+            STUDENT_LOGIN_QUERY, (params['student_email'],),
+            fetch=True, statement='student_login'),
+        'user_login': lambda: db.execute_query(
+            USER_LOGIN_QUERY, (params['user_email'], params['user_role']),
+            fetch=True, statement='user_login'),
+        'requests_by_status': lambda: db.get_requests_by_status(params['status']),
+        'student_requests': lambda: db.get_student_requests(params['student_id']),
+        'request_by_id': lambda: db.get_request_by_id(params['request_id']),
+        'request_approvals': lambda: db.get_request_approvals(params['request_id']),
+    }
+
+
+def measure(fn, iterations, warmup):
+    """Return per-call latencies in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def summarize(latencies):
+    """Mean, p50 and p95 of a latency sample"""
+    ordered = sorted(latencies)
+    return {
+        'mean': statistics.fmean(ordered),
+        'p50': ordered[len(ordered) // 2],
+        'p95': ordered[int(len(ordered) * 0.95) - 1],
+    }
+
+
+def run(config, iterations, warmup):
+    """Benchmark every workload with prepared statements off and on"""
+    results = {}
+    for prepared in (False, True):
+        # Query cache off so every call reaches MySQL
+        db = DatabaseConfig(**config, pool_max_size=1, cache_size=0,
+                            prepared_statements=prepared)
+        if not db.connect():
+            return None
+        params = sample_params(db)
+        if params is None:
+            print("❌ Benchmark needs at least one student, user and request")
+            return None
+        for name, fn in workloads(db, params).items():
+            results.setdefault(name, {})[prepared] = summarize(
+                measure(fn, iterations, warmup)
+            )
+        db.disconnect()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--database', default='attendance_system')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='root')
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=50)
+    args = parser.parse_args()
+
+    config = {'host': args.host, 'database': args.database,
+              'user': args.user, 'password': args.password}
+    results = run(config, args.iterations, args.warmup)
+    if results is None:
+        print("❌ Failed to connect to database!")
+        return
+
+    print("=" * 78)
+    print(f"PREPARED STATEMENT BENCHMARK ({args.iterations} iterations, ms per query)")
+    print("=" * 78)
+    print(f"{'Query':<22}{'text p50':>10}{'prep p50':>10}{'text p95':>10}"
+          f"{'prep p95':>10}{'mean change':>14}")
+    print("-" * 78)
+    for name, by_mode in results.items():
+        text, prep = by_mode[False], by_mode[True]
+        change = (prep['mean'] - text['mean']) / text['mean'] * 100
+        print(f"{name:<22}{text['p50']:>10.3f}{prep['p50']:>10.3f}"
+              f"{text['p95']:>10.3f}{prep['p95']:>10.3f}{change:>13.1f}%")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
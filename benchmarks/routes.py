@@ -0,0 +1,375 @@
+"""
+Route Benchmark and Load Test
+Drives the real app.py routes against seeded benchmark data and reports
+throughput and p50/p95/p99 latency per route. Results can be saved as a
+baseline and later runs compared against it.
+
+Usage:
+    python -m benchmarks.seed --students 200 --requests 5000
+    python -m benchmarks.routes --mode client --iterations 200 --save before
+    python -m benchmarks.routes --mode http --threads 8 --compare before
+"""
+
+import argparse
+import http.cookiejar
+import itertools
+import json
+import os
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app import app
+from db_config import db
+from benchmarks.seed import load_context
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+ROUTES = ('login', 'student_dashboard', 'coordinator_dashboard',
+          'all_requests_search', 'coordinator_action', 'view_attachment')
+
+
+class ClientDriver:
+    """Sends requests through the Flask test client (no network stack)"""
+
+    def __init__(self, base_url=None):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        """Send one request and return its status code"""
+        response = self.client.open(path, method=method, data=data)
+        response.close()
+        return response.status_code
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report redirects as responses instead of following them"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class HttpDriver:
+    """Sends real HTTP requests with a per-driver cookie jar"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+            _NoRedirect()
+        )
+
+    def request(self, method, path, data=None):
+        """Send one request and return its status code"""
+        body = urllib.parse.urlencode(data).encode() if data else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(req, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+
+def login(driver, role, context):
+    """Log a driver in as the benchmark student or coordinator"""
+    if role == 'student':
+        path, email = '/student/login', context['student_email']
+    else:
+        path, email = '/coordinator/login', context['coordinator_email']
+    status = driver.request('POST', path, {'email': email, 'password': context['password']})
+    if status != 302:
+        raise RuntimeError(f"{role} login failed with HTTP {status}")
+
+
+class Scenario:
+    """One benchmarked route: who calls it, how, and which statuses count as success"""
+
+    def __init__(self, name, role, build, expect):
+        """
+        Args:
+            name: Route label used in reports and baselines
+            role: Session the driver logs in as first ('student',
+                'coordinator' or None)
+            build: Callable(iteration) -> (method, path, data), or None
+                when the scenario has run out of work
+            expect: Status codes counted as success
+        """
+        self.name = name
+        self.role = role
+        self.build = build
+        self.expect = expect
+
+
+def build_scenarios(context):
+    """Create the route scenarios from seeded benchmark data"""
+    pending = iter(context['pending_ids'])
+    pending_lock = threading.Lock()
+    words = context['search_words']
+
+    def next_action(i):
+        # Each approval needs a request nobody has approved yet
+        with pending_lock:
+            request_id = next(pending, None)
+        if request_id is None:
+            return None
+        return 'POST', f'/coordinator/action/{request_id}', {'action': 'approve', 'remarks': 'bench'}
+
+    scenarios = [
+        Scenario('login', None,
+                 lambda i: ('POST', '/student/login',
+                            {'email': context['student_email'], 'password': context['password']}),
+                 {302}),
+        Scenario('student_dashboard', 'student',
+                 lambda i: ('GET', '/student/dashboard', None), {200}),
+        Scenario('coordinator_dashboard', 'coordinator',
+                 lambda i: ('GET', '/coordinator/dashboard', None), {200}),
+        Scenario('all_requests_search', 'coordinator',
+                 lambda i: ('GET', f'/all-requests?search={words[i % len(words)]}', None), {200}),
+        Scenario('coordinator_action', 'coordinator', next_action, {302}),
+    ]
+    if context['attachment_id']:
+        scenarios.append(Scenario(
+            'view_attachment', 'coordinator',
+            lambda i: ('GET', f"/attachment/{context['attachment_id']}", None), {200}))
+    return scenarios
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def run_scenario(scenario, driver_class, base_url, context, iterations, threads):
+    """
+    Run one scenario across worker threads
+
+    Returns:
+        Dict of request count, errors, throughput and latency percentiles (ms)
+    """
+    counter = itertools.count()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    # Workers log in first; the clock starts once every one of them is ready
+    ready = threading.Barrier(threads + 1)
+
+    def worker():
+        driver = driver_class(base_url)
+        try:
+            if scenario.role:
+                login(driver, scenario.role, context)
+        except Exception:
+            ready.abort()
+            raise
+        try:
+            ready.wait()
+        except threading.BrokenBarrierError:
+            return
+        local_latencies, local_errors = [], 0
+        while True:
+            i = next(counter)
+            if i >= iterations:
+                break
+            call = scenario.build(i)
+            if call is None:
+                break
+            method, path, data = call
+            started = time.perf_counter()
+            status = driver.request(method, path, data)
+            local_latencies.append((time.perf_counter() - started) * 1000)
+            if status not in scenario.expect:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    try:
+        ready.wait()
+    except threading.BrokenBarrierError:
+        for thread in workers:
+            thread.join()
+        raise RuntimeError(f"{scenario.name}: a worker failed to log in")
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors[0],
+        'throughput': len(ordered) / elapsed if elapsed else 0.0,
+        'p50': percentile(ordered, 0.50),
+        'p95': percentile(ordered, 0.95),
+        'p99': percentile(ordered, 0.99),
+    }
+
+
+class _QuietHandler(WSGIRequestHandler):
+    """Skip per-request access logging, which would dominate the measurements"""
+
+    def log_request(self, code='-', size='-'):
+        pass
+
+
+def start_server():
+    """Serve the app on a free local port in a background thread"""
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=_QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def git_revision():
+    """Current commit hash, recorded with saved baselines"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_baseline(name, report):
+    """Write a report to benchmarks/baselines/<name>.json"""
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f'{name}.json')
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def load_baseline(name):
+    """Read a saved baseline, or None if it does not exist"""
+    path = os.path.join(BASELINE_DIR, f'{name}.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(report, baseline, tolerance):
+    """
+    Print per-route changes against a baseline
+
+    A route regresses when its p95 grows, or its throughput drops, by
+    more than tolerance (a fraction).
+
+    Returns:
+        List of regressed route names
+    """
+    regressions = []
+    print(f"\nComparison with baseline ({baseline['revision'] or 'unknown revision'}, "
+          f"{baseline['created_at']}):")
+    print(f"{'Route':<24}{'p95 before':>12}{'p95 now':>10}{'rps before':>12}{'rps now':>10}  ")
+    for name, now in report['routes'].items():
+        before = baseline['routes'].get(name)
+        if before is None or not before['requests'] or not now['requests']:
+            continue
+        slower = now['p95'] > before['p95'] * (1 + tolerance)
+        fewer = now['throughput'] < before['throughput'] * (1 - tolerance)
+        flag = '❌ regression' if slower or fewer else '✅'
+        if slower or fewer:
+            regressions.append(name)
+        print(f"{name:<24}{before['p95']:>12.2f}{now['p95']:>10.2f}"
+              f"{before['throughput']:>12.1f}{now['throughput']:>10.1f}  {flag}")
+    return regressions
+
+
+def print_report(report):
+    """Print a per-route results table"""
+    print("=" * 80)
+    print(f"ROUTE BENCHMARK ({report['mode']} mode, {report['threads']} threads, "
+          f"{report['iterations']} requests per route, latency in ms)")
+    print("=" * 80)
+    print(f"{'Route':<24}{'requests':>9}{'errors':>8}{'req/s':>10}"
+          f"{'p50':>9}{'p95':>9}{'p99':>9}")
+    print("-" * 80)
+    for name, stats in report['routes'].items():
+        print(f"{name:<24}{stats['requests']:>9}{stats['errors']:>8}"
+              f"{stats['throughput']:>10.1f}{stats['p50']:>9.2f}"
+              f"{stats['p95']:>9.2f}{stats['p99']:>9.2f}")
+    print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark app routes')
+    parser.add_argument('--mode', choices=('client', 'http'), default='client',
+                        help='Flask test client, or HTTP against a local server')
+    parser.add_argument('--url', help='Benchmark an already running server (http mode)')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--iterations', type=int, default=200,
+                        help='Requests per route')
+    parser.add_argument('--routes', nargs='+', choices=ROUTES, default=list(ROUTES))
+    parser.add_argument('--save', metavar='NAME', help='Save results as a baseline')
+    parser.add_argument('--compare', metavar='NAME', help='Compare with a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Allowed p95/throughput change before flagging (fraction)')
+    args = parser.parse_args()
+
+    if not db.connect():
+        print("❌ Failed to connect to database!")
+        return 1
+    context = load_context()
+    if context is None:
+        print("❌ No benchmark data found. Run: python -m benchmarks.seed")
+        return 1
+    if 'coordinator_action' in args.routes and len(context['pending_ids']) < args.iterations:
+        print(f"⚠️  Only {len(context['pending_ids'])} pending benchmark requests left; "
+              f"coordinator_action will stop early (reseed to refill)")
+
+    server = None
+    base_url = args.url
+    driver_class = ClientDriver
+    if args.mode == 'http':
+        driver_class = HttpDriver
+        if base_url is None:
+            server, base_url = start_server()
+
+    report = {
+        'mode': args.mode,
+        'threads': args.threads,
+        'iterations': args.iterations,
+        'revision': git_revision(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'routes': {},
+    }
+    try:
+        for scenario in build_scenarios(context):
+            if scenario.name in args.routes:
+                report['routes'][scenario.name] = run_scenario(
+                    scenario, driver_class, base_url, context, args.iterations, args.threads
+                )
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if server is not None:
+            server.shutdown()
+        db.disconnect()
+
+    print_report(report)
+    if args.save:
+        print(f"💾 Baseline saved to {save_baseline(args.save, report)}")
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        if baseline is None:
+            print(f"❌ No baseline named {args.compare}")
+            return 1
+        if compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
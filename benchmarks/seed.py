@@ -0,0 +1,215 @@
+"""
+Benchmark Data Seeder
+Fills the database with synthetic students and requests for load tests.
+Benchmark rows use @bench.local emails so they can be removed again
+without touching real data.
+
+Usage:
+    python -m benchmarks.seed --students 500 --requests 20000
+    python -m benchmarks.seed --clear
+"""
+
+import argparse
+import io
+import os
+import random
+from datetime import datetime, timedelta
+
+from db_config import db, REQUEST_STATUSES
+from storage import AttachmentStore
+
+BENCH_DOMAIN = 'bench.local'
+BENCH_PASSWORD = 'bench-password'
+COORDINATOR_EMAIL = f'coordinator@{BENCH_DOMAIN}'
+HOD_EMAIL = f'hod@{BENCH_DOMAIN}'
+DEPARTMENTS = ['Computer Science', 'Information Technology', 'Electronics', 'Mechanical']
+SEARCH_WORDS = ['workshop', 'hackathon', 'seminar', 'conference', 'internship',
+                'competition', 'medical', 'sports', 'symposium', 'training']
+BATCH_SIZE = 1000  # Rows per multi-row INSERT
+
+# Smallest valid PNG (1x1 transparent pixel) used as the shared attachment
+SAMPLE_PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000100e527de3f000000'
+    '0049454e44ae426082'
+)
+
+
+class _Upload:
+    """Minimal stand-in for a Werkzeug FileStorage"""
+
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+
+def clear(database=db):
+    """
+    Remove every benchmark student, user and request
+
+    Returns:
+        Number of students removed, or None on error
+    """
+    removed = database.execute_query(
+        "DELETE FROM students WHERE email LIKE %s", (f'%@{BENCH_DOMAIN}',)
+    )
+    database.execute_query("DELETE FROM users WHERE email LIKE %s", (f'%@{BENCH_DOMAIN}',))
+    database.rebuild_status_counters()
+    return removed
+
+
+def _batches(rows):
+    """Split rows into BATCH_SIZE chunks"""
+    for start in range(0, len(rows), BATCH_SIZE):
+        yield rows[start:start + BATCH_SIZE]
+
+
+def seed(students, requests, attachment_ratio=0.1, database=db, rng=None,
+         upload_folder='uploads'):
+    """
+    Insert synthetic benchmark data
+
+    Every benchmark account shares one password hash (computed once) so
+    seeding does not spend minutes in the password KDF.
+
+    Args:
+        students: Number of students to create
+        requests: Number of requests spread across them
+        attachment_ratio: Fraction of requests carrying the sample attachment
+        database: DatabaseConfig to seed
+        rng: random.Random for reproducible data
+        upload_folder: Folder attachments are stored under
+
+    Returns:
+        True on success
+    """
+    rng = rng or random.Random(42)
+    password_hash = database.hash_password(BENCH_PASSWORD)
+    now = datetime.now().replace(microsecond=0)
+
+    student_rows = [
+        (f'Bench Student {i}', DEPARTMENTS[i % len(DEPARTMENTS)],
+         f'9{i:09d}'[-10:], f'student{i}@{BENCH_DOMAIN}', password_hash)
+        for i in range(students)
+    ]
+    for batch in _batches(student_rows):
+        if database.execute_many(
+            "INSERT INTO students (name, department, contact, email, password) "
+            "VALUES (%s, %s, %s, %s, %s)", batch
+        ) is None:
+            return False
+
+    database.execute_many(
+        "INSERT INTO users (name, role, department, email, password) VALUES (%s, %s, %s, %s, %s)",
+        [('Bench Coordinator', 'coordinator', DEPARTMENTS[0], COORDINATOR_EMAIL, password_hash),
+         ('Bench HOD', 'hod', DEPARTMENTS[0], HOD_EMAIL, password_hash)]
+    )
+
+    ids = database.execute_query(
+        "SELECT student_id FROM students WHERE email LIKE %s", (f'%@{BENCH_DOMAIN}',), fetch=True
+    )
+    if not ids:
+        return False
+    student_ids = [row['student_id'] for row in ids]
+
+    store = AttachmentStore(os.path.join(upload_folder, 'objects'))
+    attachment_path, _ = store.save(_Upload(SAMPLE_PNG), 'sample.png')
+
+    request_rows = []
+    for i in range(requests):
+        word = rng.choice(SEARCH_WORDS)
+        start = now + timedelta(days=rng.randint(-90, 60), hours=rng.randint(8, 12))
+        created = now - timedelta(seconds=rng.randint(0, 180 * 24 * 3600))
+        with_attachment = rng.random() < attachment_ratio
+        request_rows.append((
+            rng.choice(student_ids),
+            f'{word.title()} request {i}',
+            f'Permission to attend the {word} event number {i} '
+            f'organised by department {rng.choice(DEPARTMENTS)}',
+            start,
+            start + timedelta(hours=rng.randint(2, 48)),
+            '9876543210',
+            attachment_path if with_attachment else None,
+            'sample.png' if with_attachment else None,
+            # Half stay pending so the approval routes always have work
+            'pending' if rng.random() < 0.5 else rng.choice(REQUEST_STATUSES),
+            created,
+        ))
+    for batch in _batches(request_rows):
+        if database.execute_many(
+            "INSERT INTO requests (student_id, subject, description, start_time, end_time, "
+            "contact, attachment_path, attachment_name, status, created_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)", batch
+        ) is None:
+            return False
+
+    database.rebuild_status_counters()
+    database.invalidate('students', 'users', 'requests', 'approvals', 'request_counters')
+    return True
+
+
+def load_context(database=db):
+    """
+    Look up the seeded rows a benchmark run needs
+
+    Returns:
+        Dict with student_email, pending_ids, attachment_id and
+        search_words, or None if no benchmark data exists
+    """
+    student = database.execute_query(
+        "SELECT s.email FROM students s JOIN requests r ON r.student_id = s.student_id "
+        "WHERE s.email LIKE %s GROUP BY s.student_id, s.email "
+        "ORDER BY COUNT(*) DESC LIMIT 1",
+        (f'%@{BENCH_DOMAIN}',), fetch=True
+    )
+    if not student:
+        return None
+    pending = database.execute_query(
+        "SELECT r.request_id FROM requests r JOIN students s ON r.student_id = s.student_id "
+        "WHERE s.email LIKE %s AND r.status = 'pending' ORDER BY r.request_id",
+        (f'%@{BENCH_DOMAIN}',), fetch=True
+    ) or []
+    attachment = database.execute_query(
+        "SELECT r.request_id FROM requests r JOIN students s ON r.student_id = s.student_id "
+        "WHERE s.email LIKE %s AND r.attachment_path IS NOT NULL LIMIT 1",
+        (f'%@{BENCH_DOMAIN}',), fetch=True
+    )
+    return {
+        'student_email': student[0]['email'],
+        'coordinator_email': COORDINATOR_EMAIL,
+        'password': BENCH_PASSWORD,
+        'pending_ids': [row['request_id'] for row in pending],
+        'attachment_id': attachment[0]['request_id'] if attachment else None,
+        'search_words': SEARCH_WORDS,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed synthetic benchmark data')
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--attachment-ratio', type=float, default=0.1)
+    parser.add_argument('--clear', action='store_true',
+                        help='Only remove existing benchmark data')
+    args = parser.parse_args()
+
+    if not db.connect():
+        print("❌ Failed to connect to database!")
+        return
+
+    try:
+        print("🗑️  Removing previous benchmark data...")
+        clear()
+        if args.clear:
+            print("✅ Benchmark data removed")
+            return
+        print(f"📝 Seeding {args.students} students and {args.requests} requests...")
+        if seed(args.students, args.requests, args.attachment_ratio):
+            print("✅ Benchmark data seeded")
+        else:
+            print("❌ Seeding failed")
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,6 @@ Allows you to change passwords for any user in the system
 """
 
 from db_config import db
-import hashlib
-
-def hash_password(password):
-    """Hash password using MD5"""
-    return hashlib.md5(password.encode()).hexdigest()
 
 def change_student_password():
     """Change password for a student"""
@@ -42,7 +37,7 @@ def change_student_password():
         return
     
     # Update password
-    hashed = hash_password(new_password)
+    hashed = db.hash_password(new_password)
     result = db.execute_query(
         "UPDATE students SET password = %s WHERE email = %s",
         (hashed, email)
@@ -85,7 +80,7 @@ def change_user_password():
         return
     
     # Update password
-    hashed = hash_password(new_password)
+    hashed = db.hash_password(new_password)
     result = db.execute_query(
         "UPDATE users SET password = %s WHERE email = %s",
         (hashed, email)
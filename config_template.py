@@ -8,7 +8,20 @@ DATABASE_CONFIG = {
     'host': 'localhost',
     'database': 'attendance_system',
     'user': 'root',
-    'password': 'your_mysql_password_here'
+    'password': 'your_mysql_password_here',
+    'pool_min_size': 2,     # Connections opened at startup
+    'pool_max_size': 10,    # Maximum concurrent connections
+    'pool_timeout': 5.0,    # Seconds to wait for a free connection
+    'cache_size': 256,      # Cached read results (0 disables the query cache)
+    'cache_ttl': 30.0,      # Seconds a cached read result stays valid
+    'prepared_statements': False,  # Reuse server-side prepared hot queries
+    'slow_query_threshold': 0.5,   # Seconds before a query is logged as slow
+    'backend': 'mysql',            # 'sqlite' uses 'database' as a file path
+    'replicas': [],                # Read replicas, e.g. [{'host': 'db-replica-1', 'weight': 2}]
+    'replica_pin_seconds': 5.0,    # Reads stay on the primary this long after a user writes
+    'idle_check_seconds': 30.0,    # Ping pooled connections idle at least this long
+    'read_retries': 2,             # Retries for a read whose connection was lost
+    'retry_backoff': 0.05          # Seconds before the first read retry (doubles each time)
 }
 
 # Flask Configuration
@@ -37,6 +50,10 @@ SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
 PERMANENT_SESSION_LIFETIME = 3600  # 1 hour in seconds
 
+# Monitoring: bearer token Prometheus sends to /metrics (the endpoint is
+# refused while unset). Read from the ATTENDANCE_METRICS_TOKEN environment variable.
+METRICS_TOKEN = 'generate_with_secrets.token_hex(32)'
+
 # Security Configuration (for production)
 # SECURITY_PASSWORD_SALT = 'your_password_salt_here'
 # WTF_CSRF_ENABLED = True
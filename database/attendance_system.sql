@@ -1,5 +1,7 @@
 -- Database: attendance_system
 -- MySQL Schema for Attendance Request & Approval System
+-- Baseline schema (migration version 2). After importing, run
+-- `python migrate.py` to apply the later migrations in migrations/.
 
 -- Create Database
 CREATE DATABASE IF NOT EXISTS attendance_system;
@@ -37,6 +39,7 @@ CREATE TABLE IF NOT EXISTS requests (
     end_time DATETIME NOT NULL,
     contact VARCHAR(15) NOT NULL,
     attachment_path VARCHAR(255),
+    attachment_name VARCHAR(255),
     status ENUM('pending', 'approved_by_coordinator', 'approved', 'rejected') DEFAULT 'pending',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
@@ -55,6 +58,16 @@ CREATE TABLE IF NOT EXISTS approvals (
     FOREIGN KEY (request_id) REFERENCES requests(request_id) ON DELETE CASCADE
 );
 
+-- Table: request_counters (materialized per-status counts for the statistics cards)
+-- scope is 'global' (scope_key ''), 'department' (department name) or 'student' (student_id)
+CREATE TABLE IF NOT EXISTS request_counters (
+    scope ENUM('global', 'department', 'student') NOT NULL,
+    scope_key VARCHAR(100) NOT NULL,
+    status ENUM('pending', 'approved_by_coordinator', 'approved', 'rejected') NOT NULL,
+    request_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, scope_key, status)
+);
+
 -- Insert sample data
 
 -- Sample Students
@@ -73,10 +86,26 @@ INSERT INTO requests (student_id, subject, description, start_time, end_time, co
 (1, 'Workshop Attendance', 'Need permission to attend Python Workshop at Tech Hub', '2025-10-15 09:00:00', '2025-10-15 17:00:00', '9876543210', 'pending'),
 (2, 'Hackathon Participation', 'Participating in National Level Hackathon', '2025-10-20 08:00:00', '2025-10-22 18:00:00', '9876543211', 'pending');
 
+-- Seed status counters from the sample requests
+INSERT INTO request_counters (scope, scope_key, status, request_count)
+SELECT 'global', '', status, COUNT(*) FROM requests GROUP BY status
+UNION ALL
+SELECT 'department', s.department, r.status, COUNT(*)
+FROM requests r JOIN students s ON r.student_id = s.student_id
+GROUP BY s.department, r.status
+UNION ALL
+SELECT 'student', CAST(student_id AS CHAR), status, COUNT(*) FROM requests GROUP BY student_id, status;
+
 -- Create indexes for better performance
 CREATE INDEX idx_requests_status ON requests(status);
 CREATE INDEX idx_requests_student ON requests(student_id);
+CREATE INDEX idx_requests_created ON requests(created_at, request_id);
+CREATE INDEX idx_requests_attachment ON requests(attachment_path);
 CREATE INDEX idx_approvals_request ON approvals(request_id);
 
+-- Full-text indexes for the All Requests search box
+CREATE FULLTEXT INDEX ft_requests_text ON requests(subject, description);
+CREATE FULLTEXT INDEX ft_students_name ON students(name);
+
 -- Display tables
 SHOW TABLES;
@@ -1,54 +1,1002 @@
 """
 Database Configuration Module
-Handles MySQL database connections and operations
+Handles database connections and operations (MySQL or embedded SQLite)
 """
 
-import mysql.connector
-from mysql.connector import Error
-import hashlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import json
+import os
+import queue
+import threading
+import time
+
+from dialects import DATABASE_ERRORS as DatabaseError, MySQLDialect, SQLiteDialect
+from metrics import registry as default_metrics, query_name
+from migrate import apply_migrations
+from passwords import hasher as default_hasher
+from query_cache import QueryCache
+
+
+REQUEST_STATUSES = ('pending', 'approved_by_coordinator', 'approved', 'rejected')
+
+
+REBUILD_COUNTERS_SQL = """
+    INSERT INTO request_counters (scope, scope_key, status, request_count)
+    SELECT 'global', '', status, COUNT(*)
+    FROM requests
+    GROUP BY status
+    UNION ALL
+    SELECT 'department', s.department, r.status, COUNT(*)
+    FROM requests r
+    JOIN students s ON r.student_id = s.student_id
+    GROUP BY s.department, r.status
+    UNION ALL
+    SELECT 'student', CAST(student_id AS CHAR), status, COUNT(*)
+    FROM requests
+    GROUP BY student_id, status
+"""
+
+
+STUDENT_LOGIN_QUERY = """
+    SELECT student_id, name, department, email, contact, password 
+    FROM students 
+    WHERE email = %s
+"""
+
+USER_LOGIN_QUERY = """
+    SELECT user_id, name, role, department, email, password 
+    FROM users 
+    WHERE email = %s AND role = %s
+"""
+
+# Dashboard reads, shared with the asyncio helpers in async_db.py
+REQUESTS_BY_STATUS_QUERY = """
+    SELECT r.*, s.name as student_name, s.department, s.email 
+    FROM requests r
+    JOIN students s ON r.student_id = s.student_id
+    WHERE r.status = %s
+    ORDER BY r.created_at DESC
+"""
+
+STUDENT_REQUESTS_QUERY = """
+    SELECT * FROM requests 
+    WHERE student_id = %s
+    ORDER BY created_at DESC
+"""
+
+# Seconds request reads (queues, dashboards, request details) stay
+# cached. Invalidation only reaches the process that wrote, so this bounds
+# how long other worker processes can show a request's old status.
+QUEUE_CACHE_TTL = 1.0
+
+# Seconds a delta-sync token is rewound behind the database clock, so
+# rows committed after a sync but stamped before it are not skipped
+SYNC_OVERLAP_SECONDS = 5
+
+STATUS_COUNTERS_QUERY = """
+    SELECT status, request_count FROM request_counters 
+    WHERE scope = %s AND scope_key = %s
+"""
+
+
+def encode_page_cursor(row):
+    """
+    Build an opaque pagination cursor from a request row
+    
+    Args:
+        row: Request dict with created_at and request_id, plus relevance
+             when the page came from a full-text search
+        
+    Returns:
+        Cursor string of the form [<relevance>@]<created_at ISO>_<request_id>
+    """
+    token = f"{row['created_at'].isoformat()}_{row['request_id']}"
+    if row.get('relevance') is not None:
+        token = f"{float(row['relevance'])!r}@{token}"
+    return token
+
+
+def decode_page_cursor(token):
+    """
+    Parse a cursor produced by encode_page_cursor
+    
+    Args:
+        token: Cursor string from a query parameter
+        
+    Returns:
+        (created_at, request_id, relevance) tuple, relevance being None for
+        non-search cursors, or None if the token is invalid
+    """
+    if not token:
+        return None
+    try:
+        relevance = None
+        if '@' in token:
+            score, token = token.split('@', 1)
+            relevance = float(score)
+        created_at, request_id = token.rsplit('_', 1)
+        return datetime.fromisoformat(created_at), int(request_id), relevance
+    except ValueError:
+        return None
+
+
+def _request_filters(student_id=None, status=None):
+    """Build WHERE conditions shared by the request list queries"""
+    conditions = []
+    params = []
+    if student_id is not None:
+        conditions.append("r.student_id = %s")
+        params.append(student_id)
+    if status:
+        conditions.append("r.status = %s")
+        params.append(status)
+    return conditions, params
+
+
+def requests_page_query(dialect, student_id=None, status=None, search=None,
+                        cursor=None, backwards=False, page_size=25):
+    """
+    Build the keyset-paginated request list query (see get_requests_page)
+    
+    Returns:
+        (query, params, cursor) where cursor is None if the given one does
+        not apply to this listing; pass it on to requests_page_result()
+    """
+    conditions, filter_params = _request_filters(student_id, status)
+    join, params = dialect.search_join(search)
+    searching = bool(join)
+    params.extend(filter_params)
+    
+    if cursor and searching and cursor[2] is None:
+        # Cursor from an unranked listing does not apply to search results
+        cursor = None
+    
+    op = '>' if backwards else '<'
+    if cursor:
+        created_at, request_id, relevance = cursor
+        keyset = f"(r.created_at {op} %s OR (r.created_at = %s AND r.request_id {op} %s))"
+        keyset_params = [created_at, created_at, request_id]
+        if searching:
+            keyset = f"(m.relevance {op} %s OR (m.relevance = %s AND {keyset}))"
+            keyset_params = [relevance, relevance] + keyset_params
+        conditions.append(keyset)
+        params.extend(keyset_params)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    order = 'ASC' if backwards else 'DESC'
+    order_by = f"r.created_at {order}, r.request_id {order}"
+    columns = "r.*, s.name as student_name, s.department, s.email"
+    if searching:
+        order_by = f"m.relevance {order}, {order_by}"
+        columns += ", m.relevance"
+    query = f"""
+        SELECT {columns}
+        FROM requests r
+        JOIN students s ON r.student_id = s.student_id
+        {join}
+        {where}
+        ORDER BY {order_by}
+        LIMIT %s
+    """
+    params.append(page_size + 1)
+    return query, tuple(params), cursor
+
+
+def requests_page_result(rows, page_size, backwards, cursor):
+    """
+    Turn the rows of a requests_page_query() into a page
+    
+    Returns:
+        Dict with 'requests', 'next_cursor' and 'prev_cursor'
+    """
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+    
+    next_cursor = prev_cursor = None
+    if rows:
+        if backwards:
+            next_cursor = encode_page_cursor(rows[-1])
+            prev_cursor = encode_page_cursor(rows[0]) if has_more else None
+        else:
+            next_cursor = encode_page_cursor(rows[-1]) if has_more else None
+            prev_cursor = encode_page_cursor(rows[0]) if cursor else None
+    
+    return {
+        'requests': rows,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor
+    }
+
+
+def _request_details_columns(dialect):
+    """Request, student and approvals_json columns shared by the detail queries"""
+    return f"""r.*, s.name as student_name, s.department, s.email,
+               (SELECT {dialect.json_arrayagg}(JSON_OBJECT(
+                           'approval_id', a.approval_id,
+                           'request_id', a.request_id,
+                           'approver_role', a.approver_role,
+                           'approver_name', a.approver_name,
+                           'decision', a.decision,
+                           'remarks', a.remarks,
+                           'decision_time', a.decision_time))
+                FROM approvals a
+                WHERE a.request_id = r.request_id) as approvals_json"""
+
+
+def request_details_query(dialect, count):
+    """
+    Build the query loading `count` requests with their approvals folded in
+    
+    Approvals are aggregated into an approvals_json column with
+    JSON_ARRAYAGG (MySQL 5.7.22+; json_group_array on SQLite).
+    """
+    placeholders = ', '.join(['%s'] * count)
+    return f"""
+        SELECT {_request_details_columns(dialect)}
+        FROM requests r
+        JOIN students s ON r.student_id = s.student_id
+        WHERE r.request_id IN ({placeholders})
+    """
+
+
+def decode_approvals(raw):
+    """Parse a JSON_ARRAYAGG approvals column into approval dicts"""
+    if raw is None:
+        return []
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode('utf-8')
+    approvals = json.loads(raw) if isinstance(raw, str) else raw
+    for approval in approvals:
+        if approval.get('decision_time'):
+            approval['decision_time'] = datetime.fromisoformat(approval['decision_time'])
+    approvals.sort(key=lambda a: (a['decision_time'] or datetime.min, a['approval_id']))
+    return approvals
+
+
+def request_details_result(rows):
+    """
+    Turn the rows of a request_details_query() into request details
+    
+    Returns:
+        Dict of request_id -> request row with an 'approvals' list
+    """
+    details = {}
+    for row in rows:
+        # Copy so the cached row is left untouched
+        detail = dict(row)
+        detail['approvals'] = decode_approvals(detail.pop('approvals_json'))
+        details[detail['request_id']] = detail
+    return details
+
+
+def encode_sync_token(updated_at, request_id):
+    """
+    Build an opaque delta-sync token
+    
+    Returns:
+        Token string of the form <updated_at ISO>_<request_id>
+    """
+    return f"{updated_at.isoformat()}_{request_id}"
+
+
+def decode_sync_token(token):
+    """
+    Parse a token produced by encode_sync_token
+    
+    Args:
+        token: Token string from the since query parameter
+        
+    Returns:
+        (updated_at, request_id) tuple, or None if the token is invalid
+    """
+    if not token:
+        return None
+    try:
+        updated_at, request_id = token.rsplit('_', 1)
+        return datetime.fromisoformat(updated_at), int(request_id)
+    except ValueError:
+        return None
+
+
+def request_changes_query(dialect, student_id=None, since=None, limit=100):
+    """
+    Build the delta-sync query (see get_request_changes)
+    
+    Rows are read in (updated_at, request_id) order from the
+    idx_requests_updated / idx_requests_student_updated indexes, starting
+    after the token, so the cost follows the number of changes rather
+    than the size of the table.
+    """
+    conditions, params = _request_filters(student_id)
+    if since:
+        updated_at, request_id = since
+        conditions.append("(r.updated_at > %s OR (r.updated_at = %s AND r.request_id > %s))")
+        params.extend([updated_at, updated_at, request_id])
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT {_request_details_columns(dialect)},
+               {dialect.current_timestamp} AS synced_at
+        FROM requests r
+        JOIN students s ON r.student_id = s.student_id
+        {where}
+        ORDER BY r.updated_at, r.request_id
+        LIMIT %s
+    """
+    params.append(limit + 1)
+    return query, tuple(params)
+
+
+def request_changes_result(rows, limit, since, overlap):
+    """
+    Turn the rows of a request_changes_query() into a sync batch
+    
+    While more changes are waiting the token is the last row sent, so
+    the client can fetch the next batch straight away. Once caught up it
+    is rewound to `overlap` seconds before the database clock: a write
+    still in flight (or not yet on a read replica) when the batch was
+    read commits with an earlier updated_at, and would otherwise fall
+    behind the token for good. Rows changed in that window are sent
+    again on the next sync, so clients apply them by request_id.
+    
+    Returns:
+        Dict with 'requests', 'since' (token for the next call) and
+        'has_more'
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        # Nothing new: the token the client sent is still correct
+        token = encode_sync_token(*since) if since else None
+        return {'requests': [], 'since': token, 'has_more': False}
+    
+    last = (rows[-1]['updated_at'], rows[-1]['request_id'])
+    if not has_more:
+        synced_at = rows[0]['synced_at']
+        if isinstance(synced_at, str):  # SQLite returns expressions as text
+            synced_at = datetime.fromisoformat(synced_at)
+        last = min(last, (synced_at - timedelta(seconds=overlap), 0))
+    
+    changes = []
+    for detail in request_details_result(rows).values():
+        del detail['synced_at']
+        changes.append(detail)
+    return {'requests': changes, 'since': encode_sync_token(*last), 'has_more': has_more}
+
+
+def status_counts(rows):
+    """Turn request_counters rows into a dict with 'total' and one key per status"""
+    counts = {status_name: 0 for status_name in REQUEST_STATUSES}
+    for row in rows:
+        counts[row['status']] = row['request_count']
+    counts['total'] = sum(counts.values())
+    return counts
+
+
+class DatabaseUnavailableError(Exception):
+    """
+    Raised when the database cannot be reached
+    
+    Deliberately not a DatabaseError, so the `except DatabaseError`
+    handlers that turn query failures into None let it through: an
+    outage is reported as an outage, not as "no rows".
+    """
+
+
+class ConnectionLostError(DatabaseUnavailableError):
+    """Raised when the connection dropped mid-statement and the statement was not retried"""
+
+
+class PoolTimeoutError(DatabaseUnavailableError):
+    """Raised when no pooled connection becomes free within the checkout timeout"""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections
+    
+    Connections are created lazily up to max_size and handed out one per
+    checkout, so concurrent worker threads never share a cursor. Threads
+    that find the pool exhausted wait up to `timeout` seconds for a
+    connection to be returned. Only connections that sat idle for
+    check_after seconds are health-checked on checkout, so busy
+    connections skip the extra round trip.
+    """
+    
+    def __init__(self, factory, min_size=1, max_size=10, timeout=5.0, check=None,
+                 check_after=30.0):
+        """
+        Initialize connection pool
+        
+        Args:
+            factory: Callable returning a new open connection
+            min_size: Connections opened eagerly by fill()
+            max_size: Upper bound on open connections
+            timeout: Seconds to wait for a free connection before failing
+            check: Optional callable run on checkout that revives a
+                dropped connection or raises
+            check_after: Seconds a connection may sit idle before check
+                runs on its next checkout (0 checks every checkout)
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size, max_size >= 1")
+        self.factory = factory
+        self.check = check
+        self.check_after = check_after
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()  # (connection, monotonic time it was released)
+        self._lock = threading.Lock()
+        self._size = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+    
+    def fill(self):
+        """Open connections until the pool holds at least min_size"""
+        while True:
+            with self._lock:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self.factory()
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                raise
+            self._idle.put((conn, time.monotonic()))
+    
+    def _grow(self):
+        """Open a new connection if the pool is below max_size"""
+        with self._lock:
+            if self._size >= self.max_size:
+                return None
+            self._size += 1
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self._size -= 1
+            raise
+    
+    def acquire(self, verify=False):
+        """
+        Check out a connection
+        
+        Args:
+            verify: Health-check the connection even if it was used recently
+            
+        Returns:
+            An open connection owned by the caller until release()
+            
+        Raises:
+            PoolTimeoutError: No connection was freed within the timeout
+        """
+        started = time.monotonic()
+        idle_since = None  # None for a brand-new connection
+        try:
+            conn, idle_since = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._grow()
+            if conn is None:
+                try:
+                    conn, idle_since = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+        
+        stale = idle_since is not None and (
+            verify or time.monotonic() - idle_since >= self.check_after)
+        if self.check is not None and stale:
+            try:
+                self.check(conn)
+            except Exception:
+                self._discard(conn)
+                raise
+        
+        waited = time.monotonic() - started
+        with self._lock:
+            self._checkouts += 1
+            if waited > 0.001:
+                self._waits += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return conn
+    
+    def release(self, conn, discard=False):
+        """
+        Return a connection to the pool
+        
+        Args:
+            conn: Connection obtained from acquire()
+            discard: Close the connection instead of reusing it
+        """
+        if discard:
+            self._discard(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+    
+    def _discard(self, conn):
+        """Close a connection and free its slot"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._size -= 1
+    
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+    
+    def stats(self):
+        """Return pool usage and checkout wait-time statistics"""
+        with self._lock:
+            idle = self._idle.qsize()
+            return {
+                'size': self._size,
+                'idle': idle,
+                'in_use': self._size - idle,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'total_wait': self._total_wait,
+                'max_wait': self._max_wait,
+                'avg_wait': self._total_wait / self._checkouts if self._checkouts else 0.0,
+            }
+
+
+class Replica:
+    """A read replica's connection pool and its routing state"""
+    
+    def __init__(self, name, pool, weight=1, dialect=None):
+        self.name = name
+        self.pool = pool
+        self.weight = weight
+        self.dialect = dialect
+        self.current = 0  # Smooth weighted round-robin credit
+        self.down_until = 0.0
+        self.reads = 0
+        self.failures = 0
+
+
+class ReplicaRouter:
+    """
+    Weighted round-robin over read replicas
+    
+    Uses smooth weighted round-robin, so a replica with weight 3 next to
+    one with weight 1 gets three of every four reads, interleaved rather
+    than in bursts. A replica whose connection fails is skipped for
+    retry_after seconds.
+    """
+    
+    def __init__(self, replicas, retry_after=30.0):
+        """
+        Initialize replica router
+        
+        Args:
+            replicas: List of Replica
+            retry_after: Seconds a failed replica is left out of rotation
+        """
+        self.replicas = replicas
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+    
+    def choose(self):
+        """
+        Pick the replica for the next read
+        
+        Returns:
+            A Replica, or None if every replica is down
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy = [r for r in self.replicas if r.down_until <= now]
+            if not healthy:
+                return None
+            total = 0
+            best = None
+            for replica in healthy:
+                replica.current += replica.weight
+                total += replica.weight
+                if best is None or replica.current > best.current:
+                    best = replica
+            best.current -= total
+            best.reads += 1
+            return best
+    
+    def mark_down(self, replica):
+        """Take a replica out of rotation after a connection failure"""
+        with self._lock:
+            replica.failures += 1
+            replica.down_until = time.monotonic() + self.retry_after
+    
+    def fill(self):
+        """Warm every replica pool; one that cannot connect starts out of rotation"""
+        for replica in self.replicas:
+            try:
+                replica.pool.fill()
+            except DatabaseError as e:
+                print(f"Replica {replica.name} unavailable: {e}")
+                self.mark_down(replica)
+    
+    def close(self):
+        """Close every replica's idle connections"""
+        for replica in self.replicas:
+            replica.pool.close()
+    
+    def stats(self):
+        """Return per-replica routing and pool statistics"""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                'name': r.name,
+                'weight': r.weight,
+                'up': r.down_until <= now,
+                'reads': r.reads,
+                'failures': r.failures,
+                'pool': r.pool.stats(),
+            } for r in self.replicas]
+
 
 class DatabaseConfig:
     """Database connection and operations handler"""
     
     def __init__(self, host='localhost', database='attendance_system', 
-                 user='root', password='root'):
+                 user='root', password='root', pool_min_size=1,
+                 pool_max_size=10, pool_timeout=5.0, cache_size=256,
+                 cache_ttl=30.0, password_hasher=None,
+                 prepared_statements=False, metrics=None,
+                 slow_query_threshold=0.5, backend='mysql', replicas=None,
+                 replica_pin_seconds=5.0, idle_check_seconds=30.0,
+                 read_retries=2, retry_backoff=0.05):
         """
         Initialize database configuration
         
         Args:
             host: MySQL server host
-            database: Database name
+            database: Database name, or the database file for SQLite
             user: MySQL username
             password: MySQL password
+            pool_min_size: Connections opened by connect()
+            pool_max_size: Maximum concurrent connections
+            pool_timeout: Seconds a thread waits for a free connection
+            cache_size: Read results kept in the query cache (0 disables it)
+            cache_ttl: Seconds a cached read result stays valid
+            password_hasher: PasswordHasher for logins (shared default if None)
+            prepared_statements: Run hot read queries as server-side prepared
+                statements, prepared once per pooled connection
+            metrics: MetricsRegistry queries are recorded in (shared default if None)
+            slow_query_threshold: Seconds after which a query is logged as
+                slow (None disables the slow-query log)
+            backend: 'mysql', or 'sqlite' for an embedded WAL-mode database
+            replicas: MySQL read replicas, each a host name or a dict with
+                'host' and optional 'weight' (default 1), 'user',
+                'password' and 'database' (default to the primary's)
+            replica_pin_seconds: After a session writes, its reads go to the
+                primary for this long so it sees its own changes
+            idle_check_seconds: Pooled connections idle at least this long
+                are pinged before reuse (0 pings on every checkout)
+            read_retries: Times a read is retried on a fresh connection
+                after the connection is lost
+            retry_backoff: Seconds before the first read retry, doubled for
+                each further retry (at most 1 second)
         """
         self.host = host
         self.database = database
         self.user = user
         self.password = password
-        self.connection = None
+        if backend == 'mysql':
+            self.dialect = MySQLDialect(host, database, user, password)
+        elif backend == 'sqlite':
+            self.dialect = SQLiteDialect(database, busy_timeout=pool_timeout)
+        else:
+            raise ValueError(f"Unknown database backend: {backend}")
+        self.pool = ConnectionPool(
+            self.dialect.connect,
+            min_size=pool_min_size,
+            max_size=pool_max_size,
+            timeout=pool_timeout,
+            check=self.dialect.check,
+            check_after=idle_check_seconds
+        )
+        self.cache = QueryCache(cache_size, cache_ttl) if cache_size else None
+        self.hasher = password_hasher or default_hasher
+        self.prepared_statements = prepared_statements and self.dialect.supports_prepared
+        self.metrics = metrics or default_metrics
+        self.slow_query_threshold = slow_query_threshold
+        self.replica_pin_seconds = replica_pin_seconds
+        self.read_retries = read_retries
+        self.retry_backoff = retry_backoff
+        self.replicas = None
+        if replicas:
+            if backend != 'mysql':
+                raise ValueError("Read replicas need the MySQL backend")
+            self.replicas = ReplicaRouter([
+                self._replica(spec, pool_min_size, pool_max_size, pool_timeout,
+                              idle_check_seconds)
+                for spec in replicas
+            ])
+        self._last_write = float('-inf')  # monotonic time of this process's last write
+        self._local = threading.local()
+    
+    def _replica(self, spec, pool_min_size, pool_max_size, pool_timeout,
+                 idle_check_seconds):
+        """Build a Replica from a host name or settings dict"""
+        if isinstance(spec, str):
+            spec = {'host': spec}
+        dialect = MySQLDialect(spec['host'], spec.get('database', self.database),
+                               spec.get('user', self.user),
+                               spec.get('password', self.password))
+        pool = ConnectionPool(dialect.connect, min_size=pool_min_size,
+                              max_size=pool_max_size, timeout=pool_timeout,
+                              check=dialect.check, check_after=idle_check_seconds)
+        return Replica(spec['host'], pool, spec.get('weight', 1), dialect)
     
     def connect(self):
-        """Establish database connection"""
+        """
+        Establish database connections (warms the pool to its minimum size)
+        
+        An embedded SQLite database is also migrated to the latest schema;
+        MySQL databases are migrated explicitly with migrate.py.
+        """
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password
-            )
-            if self.connection.is_connected():
-                return True
-        except Error as e:
-            print(f"Error connecting to MySQL: {e}")
+            self.pool.fill()
+        except DatabaseError as e:
+            print(f"Error connecting to database: {e}")
             return False
-        return False
+        if self.replicas is not None:
+            self.replicas.fill()
+        if self.dialect.name == 'sqlite':
+            return self.migrate(verbose=False) is not None
+        return True
+    
+    def migrate(self, target=None, verbose=True):
+        """
+        Apply pending schema migrations (see migrate.py)
+        
+        Args:
+            target: Highest migration version to apply (all if None)
+            verbose: Print each migration as it runs
+            
+        Returns:
+            List of applied versions, or None on error
+        """
+        return apply_migrations(self, target, verbose)
     
     def disconnect(self):
-        """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """Close all pooled database connections"""
+        self.pool.close()
+        if self.replicas is not None:
+            self.replicas.close()
+    
+    def pool_stats(self):
+        """Return connection pool statistics"""
+        return self.pool.stats()
+    
+    def replica_stats(self):
+        """Return per-replica statistics, or None if no replicas are configured"""
+        return self.replicas.stats() if self.replicas is not None else None
     
-    def execute_query(self, query, params=None, fetch=False):
+    def begin_request(self, last_write=None):
+        """
+        Set up read routing for one web request
+        
+        Args:
+            last_write: When the user's session last wrote (time.time()
+                value from end_request()), or None
+        """
+        self._local.last_write = None
+        since_write = time.time() - last_write if last_write is not None else None
+        self._local.pinned = (since_write is not None and self.replicas is not None and
+                              since_write < self.replica_pin_seconds)
+        # Other worker processes never saw this session's invalidations, so
+        # its reads skip the cache until entries from before the write expire
+        self._local.skip_cache = (since_write is not None and self.cache is not None and
+                                  since_write < self.cache.ttl)
+    
+    def end_request(self):
+        """
+        Finish a web request
+        
+        Returns:
+            time.time() of the request's last write, to be stored in the
+            session and passed to the next begin_request(); None if it did
+            not write or neither replicas nor the query cache are in use
+        """
+        if self.replicas is None and self.cache is None:
+            return None
+        return getattr(self._local, 'last_write', None)
+    
+    @contextmanager
+    def use_primary(self):
+        """Send this thread's reads to the primary inside the block"""
+        pinned = getattr(self._local, 'pinned', False)
+        self._local.pinned = True
+        try:
+            yield
+        finally:
+            self._local.pinned = pinned
+    
+    def _mark_write(self):
+        """Record a committed write so the writer's next reads use the primary"""
+        self._local.last_write = time.time()
+        self._local.pinned = True
+        self._last_write = time.monotonic()
+    
+    def replicas_lagging(self):
+        """Whether replicas may not have caught up with this process's last write yet"""
+        return (self.replicas is not None and
+                time.monotonic() - self._last_write < self.replica_pin_seconds)
+    
+    def _read_replica(self):
+        """
+        Choose where a read outside a transaction goes
+        
+        Returns:
+            A Replica, or None to read from the primary
+        """
+        if self.replicas is None or getattr(self._local, 'pinned', False):
+            return None
+        return self.replicas.choose()
+    
+    def _acquire_read(self, verify=False):
+        """
+        Check out a connection for a read, preferring a replica
+        
+        A replica that cannot be connected to is taken out of rotation
+        and the read falls back to the primary. A replica whose pool is
+        merely exhausted stays in rotation; only this read moves to the
+        primary.
+        
+        Args:
+            verify: Health-check the connection before handing it out
+            
+        Returns:
+            (pool, conn)
+            
+        Raises:
+            DatabaseUnavailableError: The primary cannot be reached either
+        """
+        replica = self._read_replica()
+        if replica is not None:
+            try:
+                return replica.pool, replica.pool.acquire(verify)
+            except PoolTimeoutError as e:
+                print(f"Replica {replica.name} busy, reading from primary: {e}")
+            except DatabaseError as e:
+                # Connecting or reviving a dropped connection failed
+                print(f"Replica {replica.name} unavailable, reading from primary: {e}")
+                self.replicas.mark_down(replica)
+        return self.pool, self._acquire(self.pool, verify)
+    
+    @staticmethod
+    def _acquire(pool, verify=False):
+        """
+        Check out a connection, reporting connection failures as unavailability
+        
+        Raises:
+            DatabaseUnavailableError: No connection could be opened or
+                revived (PoolTimeoutError when the pool stayed exhausted)
+        """
+        try:
+            return pool.acquire(verify)
+        except DatabaseUnavailableError:
+            raise
+        except DatabaseError as e:
+            raise DatabaseUnavailableError(f"Cannot connect to database: {e}") from e
+    
+    def cache_stats(self):
+        """Return query cache hit/miss statistics, or None if caching is off"""
+        return self.cache.stats() if self.cache else None
+    
+    def invalidate(self, *tables):
+        """Discard cached reads of the given tables after a write"""
+        if self.cache:
+            self.cache.invalidate(*tables)
+    
+    def cached_query(self, query, params, tables, statement=None, ttl=None):
+        """
+        Run a SELECT through the query cache
+        
+        Args:
+            query: SQL query string
+            params: Query parameters (tuple)
+            tables: Tables the query reads, used for invalidation
+            statement: Prepared statement name passed to execute_query
+            ttl: Seconds to keep the result (the cache's TTL if None)
+            
+        Returns:
+            List of results, or None on error (errors are not cached)
+        """
+        if (self.cache is None or getattr(self._local, 'connection', None) is not None
+                or getattr(self._local, 'pinned', False)
+                or getattr(self._local, 'skip_cache', False)):
+            # Reads inside a transaction must see its own uncommitted writes,
+            # and a session that recently wrote must not get an older cached copy
+            return self.execute_query(query, params, fetch=True, statement=statement)
+        
+        key = (query, params)
+        hit, result = self.cache.get(key, tables)
+        if hit:
+            return result
+        
+        versions = self.cache.snapshot(tables)
+        # Right after a write a replica may still return the old rows;
+        # those must not be cached as current
+        lagging = self.replicas_lagging()
+        result = self.execute_query(query, params, fetch=True, statement=statement)
+        if result is not None and not lagging:
+            self.cache.put(key, versions, result, ttl)
+        return result
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Run several statements on one connection and commit them together
+        
+        Queries issued through execute_query() inside the block reuse the
+        same pooled connection and are committed once on exit, or rolled
+        back if the block raises.
+        
+        Yields:
+            The checked-out connection
+            
+        Raises:
+            DatabaseUnavailableError: No connection could be checked out
+            ConnectionLostError: The connection dropped mid-transaction; it
+                is never retried, since a COMMIT may have been lost
+        """
+        if getattr(self._local, 'connection', None) is not None:
+            # Nested block: join the outer transaction
+            yield self._local.connection
+            return
+        
+        conn = self._acquire(self.pool)
+        self._local.connection = conn
+        broken = False
+        try:
+            self.dialect.begin(conn)
+            yield conn
+            conn.commit()
+            self._mark_write()
+        except DatabaseError as e:
+            if self.dialect.is_disconnect(e):
+                broken = True
+                raise ConnectionLostError(f"Lost database connection: {e}") from e
+            try:
+                conn.rollback()
+            except DatabaseError:
+                broken = True
+            raise
+        except BaseException:
+            try:
+                conn.rollback()
+            except DatabaseError:
+                broken = True
+            raise
+        finally:
+            self._local.connection = None
+            self.pool.release(conn, discard=broken)
+    
+    def execute_query(self, query, params=None, fetch=False, statement=None):
         """
         Execute a SQL query
         
@@ -56,48 +1004,272 @@ class DatabaseConfig:
             query: SQL query string
             params: Query parameters (tuple)
             fetch: Whether to fetch results (for SELECT queries)
+            statement: Name of a hot SELECT; with prepared_statements enabled
+                it is prepared once per connection and reused by this name
             
         Returns:
-            For SELECT: List of results
+            For SELECT: List of results (read from a replica when
+                replicas are configured and the session is not pinned)
             For INSERT: Last inserted ID
             For UPDATE/DELETE: Number of affected rows
-        """
-        try:
-            if not self.connection or not self.connection.is_connected():
-                self.connect()
-            
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute(query, params or ())
+            None if the query failed. Inside transaction() errors are
+            raised instead so the whole block rolls back.
             
+        Raises:
+            DatabaseUnavailableError: The database could not be reached
+            ConnectionLostError: The connection dropped and the statement
+                could not be retried (a write, whose outcome is unknown, or a
+                read that kept failing)
+        """
+        in_transaction = getattr(self._local, 'connection', None) is not None
+        if in_transaction:
+            return self._run(self._local.connection, query, params, fetch,
+                             commit=False, statement=statement)
+        
+        # Reads are idempotent, so a read that loses its connection is
+        # retried on a verified one; writes are tried once
+        attempts = 1 + (self.read_retries if fetch else 0)
+        for attempt in range(attempts):
+            verify = attempt > 0
             if fetch:
-                result = cursor.fetchall()
-                cursor.close()
-                return result
+                pool, conn = self._acquire_read(verify)
             else:
-                self.connection.commit()
-                last_id = cursor.lastrowid
-                affected = cursor.rowcount
-                cursor.close()
-                return last_id if last_id else affected
-                
-        except Error as e:
+                pool, conn = self.pool, self._acquire(self.pool, verify)
+            
+            broken = False
+            try:
+                result = self._run(conn, query, params, fetch, commit=True,
+                                   statement=statement)
+                if not fetch:
+                    self._mark_write()
+                return result
+            except DatabaseError as e:
+                if self.dialect.is_disconnect(e):
+                    broken = True
+                    if attempt + 1 < attempts:
+                        time.sleep(min(self.retry_backoff * 2 ** attempt, 1.0))
+                        continue
+                    raise ConnectionLostError(f"Lost database connection: {e}") from e
+                print(f"Error executing query: {e}")
+                try:
+                    conn.rollback()
+                except DatabaseError:
+                    broken = True
+                return None
+            finally:
+                pool.release(conn, discard=broken)
+    
+    def stream_query(self, query, params=None, batch_size=1000):
+        """
+        Iterate over a large SELECT without loading it into memory
+        
+        Rows are read from a server-side (unbuffered) cursor in batches
+        of batch_size, so memory stays constant however many rows match.
+        Like other reads it goes to a replica when one is configured.
+        The pooled connection is held until the generator is exhausted or
+        closed; a connection abandoned mid-result is discarded.
+        
+        Args:
+            query: SQL query string
+            params: Query parameters (tuple)
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Row dicts
+            
+        Raises:
+            Database errors (there is no caller to return None to mid-stream);
+            DatabaseUnavailableError or ConnectionLostError if the database
+            cannot be reached or the connection drops. Rows may already have
+            been yielded, so a stream is never retried.
+        """
+        pool, conn = self._acquire_read()
+        started = time.perf_counter()
+        rows, failed, complete = 0, True, False
+        try:
+            cursor = self.dialect.stream_cursor(conn)
+            try:
+                cursor.execute(self.dialect.translate(query), params or ())
+                failed = False
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    rows += len(batch)
+                    yield from batch
+                complete = True
+            except DatabaseError as e:
+                failed = True
+                if self.dialect.is_disconnect(e):
+                    raise ConnectionLostError(f"Lost database connection: {e}") from e
+                raise
+            finally:
+                try:
+                    cursor.close()
+                except DatabaseError:
+                    complete = False
+        finally:
+            self.record_query(query_name(query), query,
+                               time.perf_counter() - started, rows, failed)
+            pool.release(conn, discard=not complete)
+    
+    def execute_many(self, query, seq_params):
+        """
+        Execute one statement for each parameter tuple
+        
+        Multi-row INSERTs are sent as a single batched statement by the
+        connector. Outside transaction() the batch is committed once.
+        
+        Args:
+            query: SQL query string
+            seq_params: Sequence of parameter tuples
+            
+        Returns:
+            Number of affected rows, or None on error (raised inside
+            transaction())
+        """
+        if getattr(self._local, 'connection', None) is not None:
+            return self._run_many(self._local.connection, query, seq_params)
+        
+        try:
+            with self.transaction() as conn:
+                return self._run_many(conn, query, seq_params)
+        except DatabaseError as e:
             print(f"Error executing query: {e}")
-            if self.connection:
-                self.connection.rollback()
             return None
     
-    @staticmethod
-    def hash_password(password):
+    def _run_many(self, conn, query, seq_params):
+        """Execute a batched statement on a checked-out connection"""
+        started = time.perf_counter()
+        rows, failed = 0, True
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(self.dialect.translate(query), seq_params)
+                rows = cursor.rowcount
+                failed = False
+                return rows
+            finally:
+                cursor.close()
+        finally:
+            self.record_query(query_name(query), query,
+                               time.perf_counter() - started, rows, failed)
+    
+    def _prepared_cursor(self, conn, statement, query):
         """
-        Hash password using MD5
+        Get the prepared cursor for a named statement on this connection
+        
+        Cursors are cached on the connection object and tagged with its
+        server connection ID, so a reconnect (which drops server-side
+        statements) starts a fresh cache.
+        
+        Returns:
+            (query, cursor) where query is the exact string first prepared
+        """
+        cache = getattr(conn, '_prepared_statements', None)
+        if cache is None or cache[0] != conn.connection_id:
+            cache = (conn.connection_id, {})
+            conn._prepared_statements = cache
+        entry = cache[1].get(statement)
+        if entry is None:
+            entry = (query, conn.cursor(prepared=True, dictionary=True))
+            cache[1][statement] = entry
+        return entry
+    
+    def _run_prepared(self, conn, statement, query, params):
+        """Execute a named SELECT through its cached prepared cursor"""
+        # Reusing the identical query object lets the cursor skip re-preparing
+        prepared_query, cursor = self._prepared_cursor(conn, statement, query)
+        try:
+            cursor.execute(prepared_query, params or ())
+            return cursor.fetchall()
+        except DatabaseError:
+            conn._prepared_statements[1].pop(statement, None)
+            try:
+                cursor.close()
+            except DatabaseError:
+                pass
+            raise
+    
+    def _run(self, conn, query, params, fetch, commit, statement=None):
+        """Execute one statement on a checked-out connection and record its metrics"""
+        started = time.perf_counter()
+        rows, failed = 0, True
+        try:
+            result, rows = self._execute(conn, query, params, fetch, commit, statement)
+            failed = False
+            return result
+        finally:
+            self.record_query(statement or query_name(query), query,
+                               time.perf_counter() - started, rows, failed)
+    
+    def _execute(self, conn, query, params, fetch, commit, statement):
+        """
+        Execute one statement
+        
+        Returns:
+            (result, rows) where rows is the number returned or affected
+        """
+        if fetch and statement and self.prepared_statements:
+            result = self._run_prepared(conn, statement, query, params)
+            return result, len(result)
+        
+        cursor = self.dialect.cursor(conn)
+        try:
+            cursor.execute(self.dialect.translate(query), params or ())
+            if fetch:
+                result = cursor.fetchall()
+                return result, len(result)
+            if commit:
+                conn.commit()
+            last_id = self.dialect.last_insert_id(cursor, query)
+            affected = cursor.rowcount
+            return (last_id if last_id else affected), affected
+        finally:
+            cursor.close()
+    
+    def record_query(self, name, query, elapsed, rows, failed):
+        """Record query metrics and log it if it was slow (parameters are not logged)"""
+        slow = self.slow_query_threshold is not None and elapsed >= self.slow_query_threshold
+        self.metrics.observe_query(name, elapsed, rows, failed, slow)
+        if slow:
+            print(f"Slow query {name} ({elapsed * 1000:.1f} ms, {rows} rows): "
+                  f"{' '.join(query.split())}")
+    
+    def hash_password(self, password):
+        """
+        Hash password with a salted adaptive KDF
         
         Args:
             password: Plain text password
             
         Returns:
-            Hashed password string
+            Encoded hash string
+            
+        Raises:
+            HasherBusyError: Too many hashes are already queued
         """
-        return hashlib.md5(password.encode()).hexdigest()
+        return self.hasher.hash(password)
+    
+    def _check_password(self, table, key_column, row, password):
+        """
+        Verify a password for a fetched account row, upgrading its hash
+        
+        Legacy MD5 and outdated-cost hashes are replaced after a
+        successful login. The UPDATE is conditional on the old hash so a
+        concurrent password change is never overwritten.
+        
+        Returns:
+            True if the password matches
+        """
+        stored = row['password'] if row else None
+        matches, new_hash = self.hasher.verify(password, stored)
+        if matches and new_hash:
+            self.execute_query(
+                f"UPDATE {table} SET password = %s WHERE {key_column} = %s AND password = %s",
+                (new_hash, row[key_column], stored)
+            )
+        return matches
     
     def verify_student_login(self, email, password):
         """
@@ -109,15 +1281,17 @@ class DatabaseConfig:
             
         Returns:
             Student details dict if successful, None otherwise
+            
+        Raises:
+            HasherBusyError: Too many logins are being verified right now
         """
-        hashed_pwd = self.hash_password(password)
-        query = """
-            SELECT student_id, name, department, email, contact 
-            FROM students 
-            WHERE email = %s AND password = %s
-        """
-        result = self.execute_query(query, (email, hashed_pwd), fetch=True)
-        return result[0] if result else None
+        result = self.execute_query(STUDENT_LOGIN_QUERY, (email,), fetch=True,
+                                    statement='student_login')
+        student = result[0] if result else None
+        if not self._check_password('students', 'student_id', student, password):
+            return None
+        del student['password']
+        return student
     
     def verify_user_login(self, email, password, role):
         """
@@ -130,15 +1304,17 @@ class DatabaseConfig:
             
         Returns:
             User details dict if successful, None otherwise
+            
+        Raises:
+            HasherBusyError: Too many logins are being verified right now
         """
-        hashed_pwd = self.hash_password(password)
-        query = """
-            SELECT user_id, name, role, department, email 
-            FROM users 
-            WHERE email = %s AND password = %s AND role = %s
-        """
-        result = self.execute_query(query, (email, hashed_pwd, role), fetch=True)
-        return result[0] if result else None
+        result = self.execute_query(USER_LOGIN_QUERY, (email, role), fetch=True,
+                                    statement='user_login')
+        user = result[0] if result else None
+        if not self._check_password('users', 'user_id', user, password):
+            return None
+        del user['password']
+        return user
     
     def create_student(self, name, department, contact, email, password):
         """Create new student account"""
@@ -147,44 +1323,224 @@ class DatabaseConfig:
             INSERT INTO students (name, department, contact, email, password)
             VALUES (%s, %s, %s, %s, %s)
         """
-        return self.execute_query(query, (name, department, contact, email, hashed_pwd))
+        result = self.execute_query(query, (name, department, contact, email, hashed_pwd))
+        if result:
+            self.invalidate('students')
+        return result
     
     def create_request(self, student_id, subject, description, start_time, 
-                      end_time, contact, attachment_path=None):
-        """Create new attendance request"""
+                      end_time, contact, attachment_path=None,
+                      attachment_name=None):
+        """Create new attendance request and count it as pending"""
         query = """
             INSERT INTO requests (student_id, subject, description, start_time, 
-                                end_time, contact, attachment_path)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+                                end_time, contact, attachment_path, attachment_name)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """
         params = (student_id, subject, description, start_time, end_time, 
-                 contact, attachment_path)
-        return self.execute_query(query, params)
+                 contact, attachment_path, attachment_name)
+        try:
+            with self.transaction():
+                request_id = self.execute_query(query, params)
+                student = self.execute_query(
+                    "SELECT department FROM students WHERE student_id = %s",
+                    (student_id,), fetch=True
+                )
+                self._bump_status_counters(
+                    [(student_id, student[0]['department'], None, 'pending')]
+                )
+            self.invalidate('requests', 'request_counters')
+            return request_id
+        except DatabaseError as e:
+            print(f"Error creating request: {e}")
+            return None
+    
+    def count_attachment_references(self, attachment_path):
+        """
+        Count requests that point at a stored attachment
+        
+        Returns:
+            Number of referencing requests, or None on error
+        """
+        result = self.execute_query(
+            "SELECT COUNT(*) AS refs FROM requests WHERE attachment_path = %s",
+            (attachment_path,), fetch=True
+        )
+        return result[0]['refs'] if result else None
     
     def get_requests_by_status(self, status):
         """Get all requests with specific status"""
-        query = """
-            SELECT r.*, s.name as student_name, s.department, s.email 
-            FROM requests r
-            JOIN students s ON r.student_id = s.student_id
-            WHERE r.status = %s
-            ORDER BY r.created_at DESC
+        return self.cached_query(REQUESTS_BY_STATUS_QUERY, (status,), ('requests', 'students'),
+                                 statement='requests_by_status', ttl=QUEUE_CACHE_TTL)
+    
+    def get_requests_page(self, student_id=None, status=None, search=None,
+                          cursor=None, backwards=False, page_size=25):
+        """
+        Get one page of requests, newest first, using keyset pagination
+        
+        Pages are addressed by the (created_at, request_id) of a boundary
+        row rather than an OFFSET, so each page costs the same no matter
+        how deep into the table it is. With a search term the results come
+        from the FULLTEXT indexes and are ranked by relevance first.
+        
+        Args:
+            student_id: Restrict to one student's requests
+            status: Restrict to one status
+            search: Words to find in subject, description or student name
+            cursor: Boundary tuple from decode_page_cursor
+            backwards: Fetch the page before the cursor instead of after it
+            page_size: Maximum rows per page
+            
+        Returns:
+            Dict with 'requests', 'next_cursor' and 'prev_cursor' (cursors
+            are None when there is no such page), or None on error
+        """
+        query, params, cursor = requests_page_query(
+            self.dialect, student_id, status, search, cursor, backwards, page_size
+        )
+        rows = self.execute_query(query, params, fetch=True)
+        if rows is None:
+            return None
+        return requests_page_result(rows, page_size, backwards, cursor)
+    
+    def get_request_changes(self, student_id=None, since=None, limit=100):
+        """
+        Get the requests changed after a delta-sync token, oldest change first
+        
+        A request's updated_at moves on every status change, and approval
+        rows are only ever written in the same transaction as one, so new
+        approvals are covered too. Each changed request is returned whole,
+        with its approvals, and bypasses the query cache so a client never
+        stores a stale copy under a newer token.
+        
+        Args:
+            student_id: Restrict to one student's requests
+            since: (updated_at, request_id) from decode_sync_token, or
+                   None for a full sync
+            limit: Maximum requests per batch
+            
+        Returns:
+            Dict with 'requests', 'since' and 'has_more' (see
+            request_changes_result), or None on error
+        """
+        query, params = request_changes_query(self.dialect, student_id, since, limit)
+        rows = self.execute_query(query, params, fetch=True)
+        if rows is None:
+            return None
+        return request_changes_result(rows, limit, since, self.sync_overlap())
+    
+    def sync_overlap(self):
+        """Seconds delta-sync tokens are rewound by, covering replica lag when reads use replicas"""
+        if self.replicas is None:
+            return SYNC_OVERLAP_SECONDS
+        return max(SYNC_OVERLAP_SECONDS, self.replica_pin_seconds)
+    
+    def _bump_status_counters(self, moves):
+        """
+        Move requests between status counters
+        
+        Adjusts the global, department and student rows of
+        request_counters in a single statement. Must run inside
+        transaction() together with the writes it accounts for.
+        
+        Args:
+            moves: Iterable of (student_id, department, old_status,
+                   new_status) tuples; old_status is None for new requests
+        """
+        deltas = {}
+        for student_id, department, old_status, new_status in moves:
+            for scope, key in (('global', ''), ('department', department),
+                               ('student', str(student_id))):
+                if old_status:
+                    deltas[(scope, key, old_status)] = deltas.get((scope, key, old_status), 0) - 1
+                deltas[(scope, key, new_status)] = deltas.get((scope, key, new_status), 0) + 1
+        
+        # Sorted so concurrent transactions lock counter rows in the same
+        # order and cannot deadlock on each other
+        params = []
+        for (scope, key, status), delta in sorted(deltas.items()):
+            if delta:
+                params.extend([scope, key, status, delta])
+        if not params:
+            return
+        rows = ', '.join(["(%s, %s, %s, %s)"] * (len(params) // 4))
+        query = f"""
+            INSERT INTO request_counters (scope, scope_key, status, request_count)
+            VALUES {rows}
+            {self.dialect.upsert_increment(('scope', 'scope_key', 'status'), 'request_count')}
+        """
+        self.execute_query(query, tuple(params))
+    
+    def get_status_counters(self, scope='global', key=''):
+        """
+        Read materialized request counts per status
+        
+        Args:
+            scope: 'global', 'department' or 'student'
+            key: Department name or student ID for non-global scopes
+            
+        Returns:
+            Dict with 'total' and one key per status
+        """
+        rows = self.cached_query(STATUS_COUNTERS_QUERY, (scope, str(key)),
+                                 ('request_counters',), ttl=QUEUE_CACHE_TTL)
+        return status_counts(rows or [])
+    
+    def rebuild_status_counters(self):
+        """
+        Recompute request_counters from the requests table
+        
+        Used to seed the counters on an existing database or to repair
+        them after data was changed outside create_request and
+        update_request_status.
+        
+        Returns:
+            True on success, False on error
         """
-        return self.execute_query(query, (status,), fetch=True)
+        try:
+            with self.transaction():
+                self.execute_query("DELETE FROM request_counters")
+                self.execute_query(REBUILD_COUNTERS_SQL)
+            self.invalidate('request_counters')
+            return True
+        except DatabaseError as e:
+            print(f"Error rebuilding status counters: {e}")
+            return False
     
     def get_student_requests(self, student_id):
         """Get all requests for a specific student"""
-        query = """
-            SELECT * FROM requests 
-            WHERE student_id = %s
-            ORDER BY created_at DESC
-        """
-        return self.execute_query(query, (student_id,), fetch=True)
+        return self.cached_query(STUDENT_REQUESTS_QUERY, (student_id,), ('requests',),
+                                 statement='student_requests', ttl=QUEUE_CACHE_TTL)
     
     def update_request_status(self, request_id, status):
-        """Update request status"""
-        query = "UPDATE requests SET status = %s WHERE request_id = %s"
-        return self.execute_query(query, (status, request_id))
+        """Update request status and move it between status counters"""
+        try:
+            with self.transaction():
+                current = self.execute_query(
+                    """SELECT r.status, r.student_id, s.department 
+                       FROM requests r
+                       JOIN students s ON r.student_id = s.student_id
+                       WHERE r.request_id = %s
+                       FOR UPDATE""",
+                    (request_id,), fetch=True
+                )
+                if not current:
+                    return 0
+                current = current[0]
+                affected = self.execute_query(
+                    "UPDATE requests SET status = %s WHERE request_id = %s",
+                    (status, request_id)
+                )
+                if current['status'] != status:
+                    self._bump_status_counters([(
+                        current['student_id'], current['department'],
+                        current['status'], status
+                    )])
+            self.invalidate('requests', 'request_counters')
+            return affected
+        except DatabaseError as e:
+            print(f"Error updating request status: {e}")
+            return None
     
     def create_approval(self, request_id, approver_role, approver_name, 
                        decision, remarks):
@@ -195,7 +1551,141 @@ class DatabaseConfig:
             VALUES (%s, %s, %s, %s, %s)
         """
         params = (request_id, approver_role, approver_name, decision, remarks)
-        return self.execute_query(query, params)
+        result = self.execute_query(query, params)
+        if result:
+            self.invalidate('approvals')
+        return result
+    
+    def transition_request(self, request_id, from_status, to_status, approval=None):
+        """
+        Atomically move a request from one status to another
+        
+        The status change is a conditional UPDATE that only matches while
+        the request is still in from_status, so when two approvers act on
+        the same request only the first one applies. The approval row and
+        counter updates share its transaction and single commit.
+        
+        Args:
+            request_id: Request to transition
+            from_status: Status the request must currently have
+            to_status: New status
+            approval: Optional dict with approver_role, approver_name,
+                      decision and remarks for the approval record
+            
+        Returns:
+            True if the transition applied, False if the request was not
+            in from_status, None on error
+        """
+        try:
+            with self.transaction():
+                affected = self.execute_query(
+                    "UPDATE requests SET status = %s WHERE request_id = %s AND status = %s",
+                    (to_status, request_id, from_status)
+                )
+                if affected != 1:
+                    return False
+                
+                if approval:
+                    self.execute_query(
+                        """INSERT INTO approvals (request_id, approver_role, approver_name, 
+                                                decision, remarks)
+                           VALUES (%s, %s, %s, %s, %s)""",
+                        (request_id, approval['approver_role'], approval['approver_name'],
+                         approval['decision'], approval.get('remarks'))
+                    )
+                
+                owner = self.execute_query(
+                    """SELECT r.student_id, s.department 
+                       FROM requests r
+                       JOIN students s ON r.student_id = s.student_id
+                       WHERE r.request_id = %s""",
+                    (request_id,), fetch=True
+                )[0]
+                self._bump_status_counters(
+                    [(owner['student_id'], owner['department'], from_status, to_status)]
+                )
+            self.invalidate('requests', 'approvals', 'request_counters')
+            return True
+        except DatabaseError as e:
+            print(f"Error transitioning request: {e}")
+            return None
+    
+    def bulk_transition_requests(self, request_ids, from_status, to_status,
+                                 approver_role, approver_name, decision, remarks):
+        """
+        Move many requests to a new status with one shared decision
+        
+        Rows are locked and checked, then the status change, approval rows
+        and counter updates are applied in one transaction with a single
+        commit. Requests that do not exist or are no longer in from_status
+        are skipped and reported instead of aborting the batch.
+        
+        Args:
+            request_ids: IDs to transition
+            from_status: Status each request must currently have
+            to_status: New status
+            approver_role: 'coordinator' or 'hod'
+            approver_name: Name recorded on the approval rows
+            decision: 'approved' or 'rejected'
+            remarks: Remarks recorded on every approval row
+            
+        Returns:
+            Dict mapping each request ID to None on success or a failure
+            reason string, or None if the transaction failed
+        """
+        request_ids = list(dict.fromkeys(int(rid) for rid in request_ids))
+        if not request_ids:
+            return {}
+        
+        placeholders = ', '.join(['%s'] * len(request_ids))
+        try:
+            with self.transaction():
+                rows = self.execute_query(
+                    f"""SELECT r.request_id, r.status, r.student_id, s.department 
+                        FROM requests r
+                        JOIN students s ON r.student_id = s.student_id
+                        WHERE r.request_id IN ({placeholders})
+                        FOR UPDATE""",
+                    tuple(request_ids), fetch=True
+                )
+                current = {row['request_id']: row for row in rows}
+                
+                results = {}
+                eligible = []
+                for rid in request_ids:
+                    row = current.get(rid)
+                    if row is None:
+                        results[rid] = 'not found'
+                    elif row['status'] != from_status:
+                        results[rid] = f"already {row['status']}"
+                    else:
+                        results[rid] = None
+                        eligible.append(row)
+                
+                if eligible:
+                    ids = [row['request_id'] for row in eligible]
+                    self.execute_query(
+                        f"""UPDATE requests SET status = %s 
+                            WHERE request_id IN ({', '.join(['%s'] * len(ids))})""",
+                        (to_status, *ids)
+                    )
+                    self.execute_many(
+                        """INSERT INTO approvals (request_id, approver_role, approver_name, 
+                                                decision, remarks)
+                           VALUES (%s, %s, %s, %s, %s)""",
+                        [(rid, approver_role, approver_name, decision, remarks)
+                         for rid in ids]
+                    )
+                    self._bump_status_counters(
+                        (row['student_id'], row['department'], from_status, to_status)
+                        for row in eligible
+                    )
+            if eligible:
+                self.invalidate('requests', 'approvals', 'request_counters')
+            return results
+        except DatabaseError as e:
+            print(f"Error applying bulk transition: {e}")
+            return None
     
     def get_request_approvals(self, request_id):
         """Get all approvals for a request"""
@@ -204,7 +1694,8 @@ class DatabaseConfig:
             WHERE request_id = %s
             ORDER BY decision_time ASC
         """
-        return self.execute_query(query, (request_id,), fetch=True)
+        return self.cached_query(query, (request_id,), ('approvals',),
+                                 statement='request_approvals', ttl=QUEUE_CACHE_TTL)
     
     def get_request_by_id(self, request_id):
         """Get request details by ID"""
@@ -214,9 +1705,84 @@ class DatabaseConfig:
             JOIN students s ON r.student_id = s.student_id
             WHERE r.request_id = %s
         """
-        result = self.execute_query(query, (request_id,), fetch=True)
+        result = self.cached_query(query, (request_id,), ('requests', 'students'),
+                                   statement='request_by_id', ttl=QUEUE_CACHE_TTL)
         return result[0] if result else None
+    
+    def get_request_details_batch(self, request_ids):
+        """
+        Get requests with their student and approval history in one query
+        
+        Approvals are folded into each request row with JSON_ARRAYAGG
+        (MySQL 5.7.22+; json_group_array on SQLite), so any number of requests costs a single round
+        trip instead of one approvals query per request.
+        
+        Args:
+            request_ids: Request IDs to load
+            
+        Returns:
+            Dict of request_id -> request row with an 'approvals' list
+            (oldest first); missing IDs are absent. None on error.
+        """
+        request_ids = sorted(set(request_ids))
+        if not request_ids:
+            return {}
+        
+        query = request_details_query(self.dialect, len(request_ids))
+        # Only the single-ID shape is fixed, so only it is a named statement
+        statement = 'request_details' if len(request_ids) == 1 else None
+        rows = self.cached_query(query, tuple(request_ids),
+                                 ('requests', 'students', 'approvals'),
+                                 statement=statement, ttl=QUEUE_CACHE_TTL)
+        if rows is None:
+            return None
+        return request_details_result(rows)
+    
+    def get_request_details(self, request_id):
+        """Get request details with its approval history (see get_request_details_batch)"""
+        details = self.get_request_details_batch([request_id])
+        return details.get(request_id) if details else None
+    
+    def get_request_attachment(self, request_id):
+        """
+        Get the fields needed to authorize and serve a request's attachment
+        
+        Returns:
+            Dict with request_id, student_id, attachment_path and
+            attachment_name, or None if the request does not exist
+        """
+        query = """
+            SELECT request_id, student_id, attachment_path, attachment_name
+            FROM requests
+            WHERE request_id = %s
+        """
+        result = self.cached_query(query, (request_id,), ('requests',),
+                                   statement='request_attachment', ttl=QUEUE_CACHE_TTL)
+        return result[0] if result else None
+
+
+def parse_replicas(value):
+    """
+    Parse a replica list such as 'db-r1:3,db-r2' (host[:weight], comma separated)
+    
+    Returns:
+        List of replica dicts for DatabaseConfig, or None if value is empty
+    """
+    replicas = []
+    for item in (value or '').split(','):
+        host, _, weight = item.strip().partition(':')
+        if host:
+            replicas.append({'host': host, 'weight': int(weight) if weight else 1})
+    return replicas or None
 
 
-# Create a global database instance
-db = DatabaseConfig()
+# Create a global database instance. ATTENDANCE_DB_BACKEND=sqlite selects the
+# embedded backend, stored in ATTENDANCE_SQLITE_PATH (attendance_system.db);
+# ATTENDANCE_DB_REPLICAS lists MySQL read replicas (see parse_replicas)
+if os.environ.get('ATTENDANCE_DB_BACKEND') == 'sqlite':
+    db = DatabaseConfig(
+        backend='sqlite',
+        database=os.environ.get('ATTENDANCE_SQLITE_PATH', 'attendance_system.db')
+    )
+else:
+    db = DatabaseConfig(replicas=parse_replicas(os.environ.get('ATTENDANCE_DB_REPLICAS')))
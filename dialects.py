@@ -0,0 +1,388 @@
+"""
+SQL Dialect Module
+Backend-specific connection handling and SQL for DatabaseConfig
+"""
+
+from datetime import datetime
+from functools import lru_cache
+import re
+import sqlite3
+
+try:
+    import mysql.connector
+except ImportError:  # The embedded SQLite backend runs without mysql-connector
+    mysql = None
+
+try:
+    import aiomysql
+except ImportError:  # Only the asyncio serving mode (asgi.py) needs aiomysql
+    aiomysql = None
+
+try:
+    import aiosqlite
+except ImportError:  # ...or aiosqlite with the SQLite backend
+    aiosqlite = None
+
+# Errors raised by either backend's driver
+DATABASE_ERRORS = (sqlite3.Error,) + ((mysql.connector.Error,) if mysql else ())
+
+# Errors raised by the asyncio drivers (aiosqlite raises sqlite3 errors)
+ASYNC_DATABASE_ERRORS = (sqlite3.Error,) + ((aiomysql.Error,) if aiomysql else ())
+
+# Client errors meaning the server connection is gone:
+# CR_SERVER_GONE_ERROR, CR_SERVER_LOST, CR_SERVER_LOST_EXTENDED
+MYSQL_DISCONNECT_ERRNOS = frozenset({2006, 2013, 2055})
+
+
+def fulltext_terms(search):
+    """
+    Convert free text into a BOOLEAN MODE full-text query
+
+    Each word becomes a prefix match so partially typed words still hit,
+    and any full-text operators in the input are dropped.
+
+    Args:
+        search: Raw search box text
+
+    Returns:
+        Query string such as 'python* work*', or '' if no words remain
+    """
+    return ' '.join(f"{word}*" for word in re.findall(r'\w+', search or ''))
+
+
+class MySQLDialect:
+    """MySQL / MariaDB through mysql-connector-python"""
+
+    name = 'mysql'
+    supports_prepared = True
+    json_arrayagg = 'JSON_ARRAYAGG'
+    current_timestamp = 'CURRENT_TIMESTAMP'
+
+    def __init__(self, host, database, user, password):
+        """
+        Initialize MySQL dialect
+
+        Args:
+            host: MySQL server host
+            database: Database name
+            user: MySQL username
+            password: MySQL password
+        """
+        self.host = host
+        self.database = database
+        self.user = user
+        self.password = password
+
+    def connect(self, **options):
+        """Open a new connection (options are passed to mysql.connector.connect)"""
+        if mysql is None:
+            raise RuntimeError("The MySQL backend needs mysql-connector-python: "
+                               "pip install mysql-connector-python")
+        return mysql.connector.connect(
+            host=self.host,
+            database=self.database,
+            user=self.user,
+            password=self.password,
+            **options
+        )
+
+    @staticmethod
+    def check(conn):
+        """Reconnect a pooled connection the server has dropped"""
+        if not conn.is_connected():
+            conn.reconnect()
+
+    async def connect_async(self):
+        """Open a new asyncio connection (aiomysql)"""
+        if aiomysql is None:
+            raise RuntimeError("The asyncio serving mode needs aiomysql: pip install aiomysql")
+        return await aiomysql.connect(
+            host=self.host,
+            db=self.database,
+            user=self.user,
+            password=self.password,
+            charset='utf8mb4',
+            cursorclass=aiomysql.DictCursor,
+            # Async connections only read; without autocommit each would
+            # keep serving the REPEATABLE READ snapshot of its first query
+            autocommit=True
+        )
+
+    @staticmethod
+    async def check_async(conn):
+        """Reconnect an asyncio connection the server has dropped"""
+        await conn.ping(reconnect=True)
+
+    @staticmethod
+    async def fetch_async(conn, query, params):
+        """Run a SELECT on an asyncio connection and return its rows as dicts"""
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params or None)
+            return list(await cursor.fetchall())
+
+    @staticmethod
+    async def close_async(conn):
+        """Close an asyncio connection"""
+        conn.close()
+
+    @staticmethod
+    def is_disconnect(error):
+        """Whether an error means the connection was lost (not that the SQL failed)"""
+        if aiomysql is not None and isinstance(error, aiomysql.Error):
+            # PyMySQL errors carry the error number as their first argument
+            return (isinstance(error, aiomysql.InterfaceError) or
+                    bool(error.args) and error.args[0] in MYSQL_DISCONNECT_ERRNOS)
+        errno = getattr(error, 'errno', None)
+        if errno in MYSQL_DISCONNECT_ERRNOS:
+            return True
+        # "MySQL Connection not available" carries no error number
+        return (mysql is not None and
+                isinstance(error, mysql.connector.errors.OperationalError) and
+                errno in (None, -1))
+
+    @staticmethod
+    def translate(query):
+        """Return the query in this dialect's syntax (MySQL is the reference)"""
+        return query
+
+    @staticmethod
+    def cursor(conn):
+        """Open a cursor returning rows as dicts"""
+        return conn.cursor(dictionary=True)
+
+    @staticmethod
+    def stream_cursor(conn):
+        """Open an unbuffered cursor that fetches rows from the server as read"""
+        return conn.cursor(dictionary=True, buffered=False)
+
+    @staticmethod
+    def last_insert_id(cursor, query):
+        """ID generated by an INSERT, or 0/None for other statements"""
+        return cursor.lastrowid
+
+    @staticmethod
+    def begin(conn):
+        """Start a transaction (autocommit is off, so the first statement does)"""
+
+    @staticmethod
+    def upsert_increment(key_columns, column):
+        """Clause turning a duplicate-key INSERT into `column += inserted value`"""
+        return f"ON DUPLICATE KEY UPDATE {column} = {column} + VALUES({column})"
+
+    @staticmethod
+    def search_join(search):
+        """
+        Build a join restricting requests to full-text search hits
+
+        Subject/description hits and student name hits are looked up
+        through their own FULLTEXT indexes and unioned, so neither side
+        falls back to a table scan. The joined `m.relevance` column is
+        the summed score used for ranking.
+
+        Returns:
+            (join SQL, params), or ("", []) when the search has no words
+        """
+        terms = fulltext_terms(search)
+        if not terms:
+            return "", []
+        match_text = "MATCH(subject, description) AGAINST (%s IN BOOLEAN MODE)"
+        match_name = "MATCH(sn.name) AGAINST (%s IN BOOLEAN MODE)"
+        join = f"""
+            JOIN (
+                SELECT request_id, SUM(score) AS relevance
+                FROM (
+                    SELECT request_id, {match_text} AS score
+                    FROM requests
+                    WHERE {match_text}
+                    UNION ALL
+                    SELECT rn.request_id, {match_name} AS score
+                    FROM students sn
+                    JOIN requests rn ON rn.student_id = sn.student_id
+                    WHERE {match_name}
+                ) hits
+                GROUP BY request_id
+            ) m ON m.request_id = r.request_id
+        """
+        return join, [terms, terms, terms, terms]
+
+    @staticmethod
+    def table_exists_query():
+        """SELECT returning a row if the table named by the parameter exists"""
+        return ("SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s")
+
+
+def _dict_row(cursor, row):
+    """sqlite3 row factory producing dicts like mysql-connector's dictionary cursor"""
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+def _parse_datetime(raw):
+    """sqlite3 converter for DATETIME/TIMESTAMP columns"""
+    return datetime.fromisoformat(raw.decode())
+
+
+@lru_cache(maxsize=1024)
+def _translate_sqlite(query):
+    """Rewrite MySQL placeholders and row locks for SQLite"""
+    # Row locks are unnecessary: write transactions start with
+    # BEGIN IMMEDIATE, which already excludes other writers
+    query = re.sub(r'\s+FOR\s+UPDATE\b', '', query, flags=re.IGNORECASE)
+    return query.replace('%s', '?')
+
+
+class SQLiteDialect:
+    """
+    Embedded SQLite database in WAL mode
+
+    WAL lets readers run concurrently with the single writer, so each
+    pooled connection reads without blocking. Queries are written for
+    MySQL and translated here; the schema comes from the *.sqlite.sql
+    scripts in migrations/ and full-text search uses FTS5.
+    """
+
+    name = 'sqlite'
+    supports_prepared = False  # sqlite3 already caches compiled statements
+    json_arrayagg = 'json_group_array'
+    current_timestamp = "datetime('now', 'localtime')"  # Matches the column defaults
+
+    def __init__(self, path, busy_timeout=5.0):
+        """
+        Initialize SQLite dialect
+
+        Args:
+            path: Database file (created on first connect)
+            busy_timeout: Seconds a writer waits for the write lock
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        sqlite3.register_converter('DATETIME', _parse_datetime)
+        sqlite3.register_converter('TIMESTAMP', _parse_datetime)
+        sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+
+    def connect(self):
+        """Open a new connection with WAL and foreign keys enabled"""
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,  # Transactions are started explicitly by begin()
+            check_same_thread=False  # Pooled: used by one thread at a time
+        )
+        conn.row_factory = _dict_row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    async def connect_async(self):
+        """Open a new asyncio connection (aiosqlite runs it on its own thread)"""
+        if aiosqlite is None:
+            raise RuntimeError("The asyncio serving mode needs aiosqlite: pip install aiosqlite")
+        conn = await aiosqlite.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None
+        )
+        conn.row_factory = _dict_row
+        return conn
+
+    @staticmethod
+    async def check_async(conn):
+        """Embedded connections cannot be dropped by a server"""
+
+    @staticmethod
+    async def fetch_async(conn, query, params):
+        """Run a SELECT on an asyncio connection and return its rows as dicts"""
+        async with conn.execute(query, params or ()) as cursor:
+            return list(await cursor.fetchall())
+
+    @staticmethod
+    async def close_async(conn):
+        """Close an asyncio connection"""
+        await conn.close()
+
+    @staticmethod
+    def check(conn):
+        """Embedded connections cannot be dropped by a server"""
+
+    @staticmethod
+    def is_disconnect(error):
+        """Embedded connections are never lost"""
+        return False
+
+    @staticmethod
+    def translate(query):
+        """Rewrite a MySQL-syntax query for SQLite"""
+        return _translate_sqlite(query)
+
+    @staticmethod
+    def cursor(conn):
+        """Open a cursor (rows are dicts via the connection's row factory)"""
+        return conn.cursor()
+
+    @staticmethod
+    def stream_cursor(conn):
+        """Open a cursor (sqlite3 cursors already step through results lazily)"""
+        return conn.cursor()
+
+    @staticmethod
+    def last_insert_id(cursor, query):
+        """ID generated by an INSERT, or None for other statements"""
+        # sqlite3 reports the connection's last insert rowid after any
+        # statement, so an UPDATE would otherwise return a stale ID
+        if query.lstrip().upper().startswith(('INSERT', 'REPLACE')):
+            return cursor.lastrowid
+        return None
+
+    @staticmethod
+    def begin(conn):
+        """Take the write lock up front so read-then-write blocks are serialized"""
+        conn.execute("BEGIN IMMEDIATE")
+
+    @staticmethod
+    def upsert_increment(key_columns, column):
+        """Clause turning a duplicate-key INSERT into `column += inserted value`"""
+        return (f"ON CONFLICT({', '.join(key_columns)}) "
+                f"DO UPDATE SET {column} = {column} + excluded.{column}")
+
+    @staticmethod
+    def search_join(search):
+        """
+        Build a join restricting requests to FTS5 search hits
+
+        Mirrors the MySQL version: any word may match (prefix match) in
+        subject/description or student name, and `m.relevance` is the
+        summed BM25 score (negated so higher is better).
+
+        Returns:
+            (join SQL, params), or ("", []) when the search has no words
+        """
+        words = re.findall(r'\w+', search or '')
+        if not words:
+            return "", []
+        # Quoted so words like OR/NOT are not read as FTS5 operators
+        terms = ' OR '.join(f'"{word}"*' for word in words)
+        join = """
+            JOIN (
+                SELECT request_id, SUM(score) AS relevance
+                FROM (
+                    SELECT rowid AS request_id, -bm25(requests_fts) AS score
+                    FROM requests_fts
+                    WHERE requests_fts MATCH %s
+                    UNION ALL
+                    SELECT rn.request_id, -bm25(students_fts) AS score
+                    FROM students_fts
+                    JOIN requests rn ON rn.student_id = students_fts.rowid
+                    WHERE students_fts MATCH %s
+                ) hits
+                GROUP BY request_id
+            ) m ON m.request_id = r.request_id
+        """
+        return join, [terms, terms]
+
+    @staticmethod
+    def table_exists_query():
+        """SELECT returning a row if the table named by the parameter exists"""
+        return "SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s"
@@ -0,0 +1,251 @@
+"""
+Dashboard Events Module
+In-process publish/subscribe feeding the Server-Sent Events streams
+
+Routes that change a review queue publish an event (a request was
+inserted into or removed from a queue) to topics such as
+'queue:pending' and 'queue:pending:CSE'. Each open dashboard holds a
+subscription to one topic and receives the events as an SSE stream, so
+it updates in place instead of being refreshed.
+
+Events only reach subscribers in the same process. A short history is
+kept so a client that reconnects (sending Last-Event-ID) gets the
+events it missed; if they are no longer available, or the client fell
+too far behind, it is sent a 'reset' event and reloads the page.
+Events are idempotent (inserting a request already shown or removing
+one that is not changes nothing), so replaying too many is harmless.
+"""
+
+import asyncio
+from collections import deque
+import json
+import os
+import queue
+import threading
+
+RESET_EVENT = 'reset'
+
+
+def queue_topics(status, department=None):
+    """
+    Topics an event about a request in a review queue is published to
+
+    Args:
+        status: Queue status ('pending' or 'approved_by_coordinator')
+        department: The request's department
+
+    Returns:
+        List with the all-departments topic and, if given, the department one
+    """
+    topics = [f'queue:{status}']
+    if department:
+        topics.append(f'queue:{status}:{department}')
+    return topics
+
+
+def format_sse(event):
+    """Encode an event (id, type, data) as a Server-Sent Events message"""
+    event_id, event_type, data = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """A subscriber's queue of events, read from a worker thread"""
+
+    def __init__(self, broker, topic, max_pending):
+        self.broker = broker
+        self.topic = topic
+        self.overflowed = False
+        self._events = queue.Queue(maxsize=max_pending)
+
+    def deliver(self, event):
+        """Queue an event (called by the broker from the publishing thread)"""
+        try:
+            self._events.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout=None):
+        """
+        Wait for the next event
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            (id, type, data), a reset event if events were dropped, or
+            None on timeout
+        """
+        if self.overflowed:
+            return self.broker.reset_event()
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Stop receiving events"""
+        self.broker.unsubscribe(self)
+
+
+class AsyncSubscription(Subscription):
+    """A subscriber's queue of events, read from an asyncio event loop"""
+
+    def __init__(self, broker, topic, max_pending, loop):
+        super().__init__(broker, topic, max_pending)
+        self._loop = loop
+        self._events = asyncio.Queue(maxsize=max_pending)
+
+    def deliver(self, event):
+        """Hand an event to the event loop (safe from any thread)"""
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:  # Loop already closed
+            self.overflowed = True
+
+    def _put(self, event):
+        try:
+            self._events.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        """Wait for the next event (see Subscription.get)"""
+        if self.overflowed:
+            return self.broker.reset_event()
+        try:
+            return await asyncio.wait_for(self._events.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """
+    Thread-safe topic-based publish/subscribe with a short replay history
+
+    Event IDs are '<epoch>-<sequence>'. The epoch is random per broker,
+    so an ID from before a restart is recognised as unknown rather than
+    matched against the new sequence.
+    """
+
+    def __init__(self, history=256, max_pending=100):
+        """
+        Initialize event broker
+
+        Args:
+            history: Recent events kept for clients that reconnect
+            max_pending: Undelivered events a subscriber may fall behind
+                by before it is sent a reset
+        """
+        self.max_pending = max_pending
+        self.epoch = os.urandom(4).hex()
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._history = deque(maxlen=history)  # (sequence, topics, event)
+        self._subscribers = {}  # topic -> set of subscriptions
+        self._published = 0
+        self._replay_misses = 0
+
+    def publish(self, topics, event_type, data):
+        """
+        Send an event to every subscriber of the given topics
+
+        Args:
+            topics: Topic names (see queue_topics)
+            event_type: SSE event name, e.g. 'insert' or 'remove'
+            data: JSON-serializable payload
+
+        Returns:
+            The event ID
+        """
+        payload = json.dumps(data, separators=(',', ':'), default=str)
+        with self._lock:
+            self._sequence += 1
+            event = (f'{self.epoch}-{self._sequence}', event_type, payload)
+            self._history.append((self._sequence, frozenset(topics), event))
+            self._published += 1
+            for topic in topics:
+                for subscription in self._subscribers.get(topic, ()):
+                    subscription.deliver(event)
+        return event[0]
+
+    def subscribe(self, topic, last_event_id=None):
+        """
+        Subscribe from a worker thread
+
+        Args:
+            topic: Topic to receive
+            last_event_id: Last-Event-ID sent by a reconnecting client
+
+        Returns:
+            Subscription; close() it when the client goes away
+        """
+        return self._register(Subscription(self, topic, self.max_pending), last_event_id)
+
+    def subscribe_async(self, topic, last_event_id=None):
+        """Subscribe from a coroutine running on the current event loop (see subscribe)"""
+        subscription = AsyncSubscription(self, topic, self.max_pending,
+                                         asyncio.get_running_loop())
+        return self._register(subscription, last_event_id)
+
+    def _register(self, subscription, last_event_id):
+        """Add a subscription, first queueing the events a reconnecting client missed"""
+        with self._lock:
+            if last_event_id:
+                missed = self._missed(subscription.topic, last_event_id)
+                if missed is None:
+                    self._replay_misses += 1
+                    missed = [self.reset_event()]
+                for event in missed:
+                    subscription.deliver(event)
+            self._subscribers.setdefault(subscription.topic, set()).add(subscription)
+        return subscription
+
+    def _missed(self, topic, last_event_id):
+        """Events on a topic after last_event_id, or None if they are not all in the history"""
+        epoch, _, sequence = last_event_id.partition('-')
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        oldest = self._history[0][0] if self._history else self._sequence + 1
+        if sequence < oldest - 1 or sequence > self._sequence:
+            return None
+        return [event for seq, topics, event in self._history
+                if seq > sequence and topic in topics]
+
+    def last_event_id(self):
+        """
+        ID of the latest event
+
+        A page records it before reading the queue and its event stream
+        resumes from it, so events published in between are not lost.
+        """
+        with self._lock:
+            return f'{self.epoch}-{self._sequence}'
+
+    def reset_event(self):
+        """Event telling a client to reload instead of applying updates"""
+        return (f'{self.epoch}-{self._sequence}', RESET_EVENT, '{}')
+
+    def unsubscribe(self, subscription):
+        """Remove a subscription"""
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+
+    def stats(self):
+        """Return subscriber and event counts"""
+        with self._lock:
+            return {
+                'subscribers': sum(len(s) for s in self._subscribers.values()),
+                'topics': len(self._subscribers),
+                'published': self._published,
+                'replay_misses': self._replay_misses,
+            }
+
+
+# Shared broker for the web app
+broker = EventBroker()
@@ -0,0 +1,318 @@
+"""
+Request Export Module
+Streams requests with their approval history as CSV or XLSX
+
+Usage:
+    python export.py --format csv --status approved --from 2025-07-01 --to 2025-12-31 -o sem1.csv
+"""
+
+import argparse
+import csv
+from datetime import date, datetime, timedelta
+import io
+import re
+import sys
+import zipfile
+from xml.sax.saxutils import escape
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+EXPORT_COLUMNS = [
+    'request_id', 'student_name', 'email', 'department', 'subject', 'description',
+    'start_time', 'end_time', 'contact', 'status', 'created_at',
+    'coordinator_name', 'coordinator_decision', 'coordinator_remarks', 'coordinator_time',
+    'hod_name', 'hod_decision', 'hod_remarks', 'hod_time',
+]
+ROWS_PER_CHUNK = 500  # Rows encoded before a chunk is handed to the client
+_XML_INVALID = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')  # Not allowed in XLSX cells
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD filter value, returning None if empty or invalid"""
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def build_export_query(status=None, department=None, date_from=None, date_to=None):
+    """
+    Build the export SELECT for the given filters
+
+    Requests are LEFT JOINed to their approvals and ordered by request,
+    so each request's history arrives as consecutive rows and can be
+    folded one request at a time.
+
+    Args:
+        status: Only requests with this status
+        department: Only requests from this department
+        date_from: First submission date included (datetime.date)
+        date_to: Last submission date included (datetime.date)
+
+    Returns:
+        (query, params)
+    """
+    conditions, params = [], []
+    if status:
+        conditions.append("r.status = %s")
+        params.append(status)
+    if department:
+        conditions.append("s.department = %s")
+        params.append(department)
+    if date_from:
+        conditions.append("r.created_at >= %s")
+        params.append(datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        conditions.append("r.created_at < %s")
+        params.append(datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT r.request_id, s.name as student_name, s.email, s.department,
+               r.subject, r.description, r.start_time, r.end_time, r.contact,
+               r.status, r.created_at,
+               a.approver_role, a.approver_name, a.decision, a.remarks, a.decision_time
+        FROM requests r
+        JOIN students s ON r.student_id = s.student_id
+        LEFT JOIN approvals a ON a.request_id = r.request_id
+        {where}
+        ORDER BY r.request_id, a.approval_id
+    """
+    return query, tuple(params)
+
+
+def export_rows(db, **filters):
+    """
+    Stream export rows, one per request, with approvals folded in
+
+    Only the request currently being assembled is held in memory. When
+    a role decided more than once, its latest decision is exported.
+
+    Args:
+        db: DatabaseConfig to read from
+        **filters: status, department, date_from, date_to
+
+    Yields:
+        Dicts keyed by EXPORT_COLUMNS
+    """
+    query, params = build_export_query(**filters)
+    current = None
+    for row in db.stream_query(query, params):
+        if current is None or current['request_id'] != row['request_id']:
+            if current is not None:
+                yield current
+            current = {column: row.get(column) for column in EXPORT_COLUMNS}
+        role = row['approver_role']
+        if role:
+            current[f'{role}_name'] = row['approver_name']
+            current[f'{role}_decision'] = row['decision']
+            current[f'{role}_remarks'] = row['remarks']
+            current[f'{role}_time'] = row['decision_time']
+    if current is not None:
+        yield current
+
+
+def _cell_text(value):
+    """Text form of an exported value"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+# Leading characters that make spreadsheet apps read a cell as a formula
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value):
+    """
+    CSV form of an exported value
+
+    Text starting with a formula character (students control subjects,
+    descriptions and remarks) is prefixed with an apostrophe so Excel
+    and LibreOffice show it as text instead of evaluating it. XLSX cells
+    are inline strings, which are never evaluated.
+    """
+    text = _cell_text(value)
+    if isinstance(value, str) and text.startswith(_FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+def iter_csv(rows):
+    """
+    Encode rows as CSV in chunks
+
+    Yields:
+        UTF-8 encoded chunks (with a BOM so Excel detects the encoding)
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_COLUMNS)
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_cell(row[column]) for column in EXPORT_COLUMNS])
+        pending += 1
+        if pending >= ROWS_PER_CHUNK:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable file that collects bytes for a generator to yield"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        """Return and forget everything written so far"""
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+_XLSX_STATIC = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Requests" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_row(values):
+    """One worksheet row; numbers stay numeric, everything else is an inline string"""
+    cells = []
+    for value in values:
+        if isinstance(value, int) and not isinstance(value, bool):
+            cells.append(f'<c><v>{value}</v></c>')
+        else:
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">'
+                         f'{escape(_XML_INVALID.sub("", _cell_text(value)))}</t></is></c>')
+    return f"<row>{''.join(cells)}</row>"
+
+
+def iter_xlsx(rows):
+    """
+    Encode rows as a single-sheet XLSX workbook in chunks
+
+    The sheet is written with inline strings straight into a streaming
+    ZIP entry, so no shared-string table or temporary file is needed.
+
+    Yields:
+        Chunks of the .xlsx file
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC.items():
+            archive.writestr(name, content)
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            sheet.write(_xlsx_row(EXPORT_COLUMNS).encode('utf-8'))
+            pending = []
+            for row in rows:
+                pending.append(_xlsx_row([row[column] for column in EXPORT_COLUMNS]))
+                if len(pending) >= ROWS_PER_CHUNK:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                    pending = []
+                    yield sink.drain()
+            sheet.write(''.join(pending).encode('utf-8'))
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+def iter_export(db, fmt, **filters):
+    """
+    Stream an export file
+
+    Args:
+        db: DatabaseConfig to read from
+        fmt: 'csv' or 'xlsx'
+        **filters: status, department, date_from, date_to
+
+    Returns:
+        Generator of byte chunks of the file
+    """
+    encoder = iter_xlsx if fmt == 'xlsx' else iter_csv
+    return encoder(export_rows(db, **filters))
+
+
+def main():
+    """Write an export file from the command line"""
+    from db_config import db, REQUEST_STATUSES
+
+    parser = argparse.ArgumentParser(description='Export requests with approval history')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--status', choices=REQUEST_STATUSES)
+    parser.add_argument('--department')
+    parser.add_argument('--from', dest='date_from', type=date.fromisoformat,
+                        help='First submission date (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', type=date.fromisoformat,
+                        help='Last submission date (YYYY-MM-DD)')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    if not db.connect():
+        print("❌ Failed to connect to database!", file=sys.stderr)
+        return 1
+
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for chunk in iter_export(db, args.format, status=args.status,
+                                 department=args.department,
+                                 date_from=args.date_from, date_to=args.date_to):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+        db.disconnect()
+    if args.output:
+        print(f"✅ Export written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Bulk Student Import Script
+Creates student accounts from a CSV file
+
+The CSV needs a header row with name, department, contact, email and
+password columns. Passwords are hashed across CPU cores and students
+are inserted in batches, one commit per batch. Rows whose email already
+exists (or repeats earlier in the file) are reported and skipped
+without aborting the rest of the import.
+
+Usage:
+    python import_students.py students.csv
+    python import_students.py students.csv --batch-size 500 --workers 8 --report skipped.csv
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from functools import partial
+import os
+import sys
+import time
+
+from db_config import db, DatabaseError
+from passwords import hash_password
+
+REQUIRED_COLUMNS = ('name', 'department', 'contact', 'email', 'password')
+MIN_PASSWORD_LENGTH = 6
+INSERT_STUDENT_QUERY = """
+    INSERT INTO students (name, department, contact, email, password)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+
+def read_students(path):
+    """
+    Read and validate the CSV file
+
+    Args:
+        path: CSV file path
+
+    Returns:
+        (students, skipped) where students are dicts with a 'line' key and
+        skipped is a list of (line, email, reason)
+
+    Raises:
+        ValueError: The header is missing required columns
+    """
+    students, skipped = [], []
+    seen = set()
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+        for row in reader:
+            line = reader.line_num
+            student = {c: (row[c] or '').strip() for c in REQUIRED_COLUMNS}
+            email = student['email']
+            if not all(student.values()):
+                skipped.append((line, email, 'missing field'))
+            elif len(student['password']) < MIN_PASSWORD_LENGTH:
+                skipped.append((line, email, 'password too short'))
+            elif email.lower() in seen:
+                # MySQL's UNIQUE key on email is case-insensitive
+                skipped.append((line, email, 'duplicate email in file'))
+            else:
+                seen.add(email.lower())
+                student['line'] = line
+                students.append(student)
+    return students, skipped
+
+
+def existing_emails(emails):
+    """
+    Find which emails already belong to a student
+
+    Returns:
+        Set of lower-cased emails, or None if the lookup failed
+    """
+    placeholders = ', '.join(['%s'] * len(emails))
+    # The primary, so students inserted by the previous batch are seen
+    with db.use_primary():
+        rows = db.execute_query(
+            f"SELECT email FROM students WHERE email IN ({placeholders})",
+            tuple(emails), fetch=True
+        )
+    if rows is None:
+        return None
+    return {row['email'].lower() for row in rows}
+
+
+def insert_batch(rows):
+    """
+    Insert a batch of students in one transaction
+
+    If any row collides (a student registered since the duplicate check),
+    the batch is rolled back and retried row by row so only the
+    colliding rows are skipped.
+
+    Args:
+        rows: List of (student, password_hash)
+
+    Returns:
+        (inserted, skipped) where skipped is a list of (line, email, reason)
+    """
+    params = [(s['name'], s['department'], s['contact'], s['email'], hashed)
+              for s, hashed in rows]
+    try:
+        with db.transaction():
+            db.execute_many(INSERT_STUDENT_QUERY, params)
+        return len(rows), []
+    except DatabaseError:
+        pass
+
+    inserted, skipped = 0, []
+    for (student, _), values in zip(rows, params):
+        try:
+            with db.transaction():
+                db.execute_query(INSERT_STUDENT_QUERY, values)
+            inserted += 1
+        except DatabaseError as e:
+            skipped.append((student['line'], student['email'], f'insert failed: {e}'))
+    return inserted, skipped
+
+
+def import_students(students, batch_size=1000, workers=None):
+    """
+    Hash passwords in a process pool and insert students in batches
+
+    Each batch is checked for existing emails before any hashing, so
+    duplicates cost neither KDF time nor a failed INSERT.
+
+    Args:
+        students: Validated rows from read_students()
+        batch_size: Students per INSERT batch and commit
+        workers: Hashing processes (CPU count if None)
+
+    Returns:
+        (inserted, skipped)
+    """
+    hasher = partial(hash_password, **db.hasher.params)
+    inserted, skipped = 0, []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(students), batch_size):
+            batch = students[start:start + batch_size]
+            taken = existing_emails([s['email'] for s in batch])
+            if taken is None:
+                skipped.extend((s['line'], s['email'], 'duplicate check failed')
+                               for s in batch)
+                continue
+            fresh = []
+            for student in batch:
+                if student['email'].lower() in taken:
+                    skipped.append((student['line'], student['email'], 'email already registered'))
+                else:
+                    fresh.append(student)
+
+            chunksize = max(1, len(fresh) // ((workers or os.cpu_count() or 1) * 4))
+            hashes = pool.map(hasher, [s['password'] for s in fresh], chunksize=chunksize)
+            batch_inserted, batch_skipped = insert_batch(list(zip(fresh, hashes)))
+            inserted += batch_inserted
+            skipped.extend(batch_skipped)
+
+            done = min(start + batch_size, len(students))
+            elapsed = time.perf_counter() - started
+            print(f"  {done}/{len(students)} rows processed, {inserted} inserted "
+                  f"({done / elapsed:.1f} rows/s)")
+    if inserted:
+        db.invalidate('students')
+    return inserted, skipped
+
+
+def write_report(path, skipped):
+    """Write skipped rows to a CSV file"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['line', 'email', 'reason'])
+        writer.writerows(sorted(skipped))
+
+
+def main():
+    """Import students from the command line"""
+    parser = argparse.ArgumentParser(description='Bulk import students from a CSV file')
+    parser.add_argument('csv_file', help='CSV with name, department, contact, email, password')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='Students inserted per batch and commit')
+    parser.add_argument('--workers', type=int, help='Password hashing processes (default: CPU count)')
+    parser.add_argument('--report', help='Write skipped rows and reasons to this CSV file')
+    args = parser.parse_args()
+
+    try:
+        students, skipped = read_students(args.csv_file)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"📄 {len(students)} valid rows, {len(skipped)} rejected while reading")
+
+    if not db.connect():
+        print("❌ Failed to connect to database!")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        inserted, import_skipped = import_students(students, args.batch_size, args.workers)
+    finally:
+        db.disconnect()
+    skipped.extend(import_skipped)
+    elapsed = time.perf_counter() - started
+
+    rate = inserted / elapsed if elapsed else 0.0
+    print(f"✅ Imported {inserted} students in {elapsed:.1f}s ({rate:.1f} rows/s)")
+    if skipped:
+        print(f"⚠️  Skipped {len(skipped)} rows:")
+        for line, email, reason in sorted(skipped)[:20]:
+            print(f"  line {line}: {email or '(no email)'} - {reason}")
+        if len(skipped) > 20:
+            print(f"  ... and {len(skipped) - 20} more")
+        if args.report:
+            write_report(args.report, skipped)
+            print(f"📝 Skipped rows written to {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
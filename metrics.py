@@ -0,0 +1,333 @@
+"""
+Metrics Module
+Query and route instrumentation exported in Prometheus text format
+"""
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import lru_cache
+import re
+import threading
+
+# Upper bounds (seconds) of the latency histogram buckets
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+ROUTE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_QUERY_SHAPE = re.compile(
+    r'[\s(]*(?:(UPDATE)\s+`?(\w+)'
+    r'|(SELECT|DELETE)\b.*?\bFROM\s+`?(\w+)'
+    r'|(INSERT|REPLACE)\b.*?\bINTO\s+`?(\w+))',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+@lru_cache(maxsize=512)
+def query_name(query):
+    """
+    Derive a low-cardinality label for an unnamed query
+
+    Args:
+        query: SQL query string
+
+    Returns:
+        '<verb>_<table>', e.g. 'select_requests', or 'other'
+    """
+    match = _QUERY_SHAPE.match(query)
+    if match is None:
+        return 'other'
+    verb, table = [group for group in match.groups() if group]
+    return f"{verb.lower()}_{table.lower()}"
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed bucket bounds"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Record one observation"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield (upper bound label, cumulative count) pairs including +Inf"""
+        running = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running += count
+            yield ('+Inf' if bound == float('inf') else repr(bound)), running
+
+
+def _labels(**labels):
+    """Format a Prometheus label set"""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of query and route metrics
+
+    Every database query is recorded under its statement name (or a
+    '<verb>_<table>' label derived from the SQL) and every HTTP request
+    under its Flask endpoint. Query time is also added to a per-request
+    total so each route can report how much of its latency was spent
+    in the database. The total lives in a context variable, so it is
+    kept apart both for worker threads and for asyncio requests sharing
+    one thread, and queries run in tasks the request spawns still add
+    to it.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry"""
+        self._lock = threading.Lock()
+        self._db_time = ContextVar('db_time', default=None)
+        self._queries = {}
+        self._routes = {}
+        self._responses = {}
+        self._collectors = []
+
+    def observe_query(self, name, seconds, rows=0, failed=False, slow=False):
+        """
+        Record one database query
+
+        Args:
+            name: Query label
+            seconds: Execution time including fetch and commit
+            rows: Rows returned or affected
+            failed: Whether the query raised
+            slow: Whether it exceeded the slow-query threshold
+        """
+        with self._lock:
+            entry = self._queries.get(name)
+            if entry is None:
+                entry = self._queries[name] = {
+                    'latency': Histogram(QUERY_BUCKETS), 'rows': 0, 'errors': 0, 'slow': 0
+                }
+            entry['latency'].observe(seconds)
+            entry['rows'] += max(rows, 0)
+            entry['errors'] += failed
+            entry['slow'] += slow
+        db_time = self._db_time.get()
+        if db_time is not None:
+            # Mutated in place: child tasks get a copy of the context,
+            # but the copy refers to the same list
+            db_time[0] += seconds
+
+    def begin_request(self):
+        """Start accumulating database time for the current request"""
+        self._db_time.set([0.0])
+
+    def end_request(self):
+        """Stop accumulating and return the request's database time in seconds"""
+        db_time = self._db_time.get()
+        self._db_time.set(None)
+        return db_time[0] if db_time is not None else 0.0
+
+    def observe_route(self, endpoint, method, status, seconds, db_seconds):
+        """
+        Record one HTTP request
+
+        Args:
+            endpoint: Flask endpoint name
+            method: HTTP method
+            status: Response status code
+            seconds: Total handling time
+            db_seconds: Part of that time spent running queries
+        """
+        with self._lock:
+            entry = self._routes.get((endpoint, method))
+            if entry is None:
+                entry = self._routes[(endpoint, method)] = {
+                    'latency': Histogram(ROUTE_BUCKETS), 'db_seconds': 0.0
+                }
+            entry['latency'].observe(seconds)
+            entry['db_seconds'] += db_seconds
+            key = (endpoint, method, status)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def add_collector(self, collector):
+        """
+        Register a callable producing extra samples at scrape time
+
+        Args:
+            collector: Returns a list of (name, type, help, [(labels, value)])
+        """
+        self._collectors.append(collector)
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Returns:
+            Text body for a /metrics response
+        """
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, entries, help_text):
+            header(name, 'histogram', help_text)
+            for labels, hist in entries:
+                for bound, count in hist.cumulative():
+                    lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+                lines.append(f"{name}_sum{_labels(**labels)} {hist.total}")
+                lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+
+        with self._lock:
+            queries = sorted(self._queries.items())
+            routes = sorted(self._routes.items())
+            responses = sorted(self._responses.items())
+
+            histogram('attendance_db_query_duration_seconds',
+                      [({'query': name}, entry['latency']) for name, entry in queries],
+                      'Database query latency by query')
+            for metric, key, help_text in (
+                ('attendance_db_query_rows_total', 'rows', 'Rows returned or affected by query'),
+                ('attendance_db_query_errors_total', 'errors', 'Failed queries by query'),
+                ('attendance_db_slow_queries_total', 'slow', 'Queries over the slow-query threshold'),
+            ):
+                header(metric, 'counter', help_text)
+                for name, entry in queries:
+                    lines.append(f"{metric}{_labels(query=name)} {entry[key]}")
+
+            histogram('attendance_http_request_duration_seconds',
+                      [({'endpoint': endpoint, 'method': method}, entry['latency'])
+                       for (endpoint, method), entry in routes],
+                      'HTTP request latency by endpoint')
+            header('attendance_http_request_db_seconds_total', 'counter',
+                   'Time spent in database queries while handling requests')
+            for (endpoint, method), entry in routes:
+                lines.append(f"attendance_http_request_db_seconds_total"
+                             f"{_labels(endpoint=endpoint, method=method)} {entry['db_seconds']}")
+            header('attendance_http_responses_total', 'counter',
+                   'HTTP responses by endpoint and status')
+            for (endpoint, method, status), count in responses:
+                lines.append(f"attendance_http_responses_total"
+                             f"{_labels(endpoint=endpoint, method=method, status=status)} {count}")
+
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                header(name, kind, help_text)
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(**labels) if labels else ''} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def database_collector(db):
+    """
+    Build a collector exporting connection pool, replica and query cache statistics
+
+    Args:
+        db: DatabaseConfig instance
+
+    Returns:
+        Callable suitable for MetricsRegistry.add_collector()
+    """
+    def collect():
+        pool = db.pool_stats()
+        samples = [
+            ('attendance_db_pool_connections', 'gauge', 'Open pooled connections by state',
+             [({'state': 'idle'}, pool['idle']), ({'state': 'in_use'}, pool['in_use'])]),
+            ('attendance_db_pool_max_connections', 'gauge', 'Configured pool size limit',
+             [({}, pool['max_size'])]),
+            ('attendance_db_pool_checkouts_total', 'counter', 'Connections checked out',
+             [({}, pool['checkouts'])]),
+            ('attendance_db_pool_timeouts_total', 'counter', 'Checkouts that timed out',
+             [({}, pool['timeouts'])]),
+            ('attendance_db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a connection',
+             [({}, pool['total_wait'])]),
+        ]
+        replicas = db.replica_stats()
+        if replicas is not None:
+            samples += [
+                ('attendance_db_replica_up', 'gauge', 'Whether a read replica is in rotation',
+                 [({'replica': r['name']}, int(r['up'])) for r in replicas]),
+                ('attendance_db_replica_reads_total', 'counter', 'Reads routed to each replica',
+                 [({'replica': r['name']}, r['reads']) for r in replicas]),
+                ('attendance_db_replica_failures_total', 'counter',
+                 'Replica connection failures (reads fell back to the primary)',
+                 [({'replica': r['name']}, r['failures']) for r in replicas]),
+                ('attendance_db_replica_pool_connections', 'gauge',
+                 'Open replica connections by state',
+                 [({'replica': r['name'], 'state': state}, r['pool'][state])
+                  for r in replicas for state in ('idle', 'in_use')]),
+            ]
+        cache = db.cache_stats()
+        if cache is not None:
+            samples += [
+                ('attendance_query_cache_entries', 'gauge', 'Cached read results',
+                 [({}, cache['size'])]),
+                ('attendance_query_cache_lookups_total', 'counter', 'Query cache lookups by result',
+                 [({'result': 'hit'}, cache['hits']), ({'result': 'miss'}, cache['misses'])]),
+                ('attendance_query_cache_evictions_total', 'counter', 'LRU evictions',
+                 [({}, cache['evictions'])]),
+                ('attendance_query_cache_invalidations_total', 'counter', 'Table invalidations',
+                 [({}, cache['invalidations'])]),
+            ]
+        return samples
+    return collect
+
+
+def async_database_collector(adb):
+    """
+    Build a collector exporting the asyncio connection pool statistics
+
+    Args:
+        adb: AsyncDatabase instance (see asgi.py)
+
+    Returns:
+        Callable suitable for MetricsRegistry.add_collector()
+    """
+    def collect():
+        pool = adb.pool_stats()
+        return [
+            ('attendance_db_async_pool_connections', 'gauge',
+             'Open asyncio pool connections by state',
+             [({'state': 'idle'}, pool['idle']), ({'state': 'in_use'}, pool['in_use'])]),
+            ('attendance_db_async_pool_checkouts_total', 'counter',
+             'Asyncio connections checked out', [({}, pool['checkouts'])]),
+            ('attendance_db_async_pool_timeouts_total', 'counter',
+             'Asyncio checkouts that timed out', [({}, pool['timeouts'])]),
+            ('attendance_db_async_pool_wait_seconds_total', 'counter',
+             'Time spent waiting for an asyncio connection', [({}, pool['total_wait'])]),
+        ]
+    return collect
+
+
+def events_collector(broker):
+    """
+    Build a collector exporting dashboard event stream statistics
+
+    Args:
+        broker: EventBroker instance (see events.py)
+
+    Returns:
+        Callable suitable for MetricsRegistry.add_collector()
+    """
+    def collect():
+        stats = broker.stats()
+        return [
+            ('attendance_events_subscribers', 'gauge', 'Open dashboard event streams',
+             [({}, stats['subscribers'])]),
+            ('attendance_events_published_total', 'counter', 'Queue change events published',
+             [({}, stats['published'])]),
+            ('attendance_events_replay_misses_total', 'counter',
+             'Reconnects that could not be replayed and were told to reload',
+             [({}, stats['replay_misses'])]),
+        ]
+    return collect
+
+
+# Shared registry for the web app and database layer
+registry = MetricsRegistry()
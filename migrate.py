@@ -0,0 +1,343 @@
+"""
+Schema Migration Runner
+Applies the versioned scripts in migrations/ and records them in the
+schema_migrations table
+
+Scripts are named NNNN_description.<backend>.sql (backend is mysql or
+sqlite) and applied in version order, each exactly once. A database
+created before migrations existed (from attendance_system.sql or an
+older release) is recognised and baselined at BASELINE_VERSION, after
+adding whatever the baseline schema gained since that database was
+created (see BASELINE_ADDITIONS).
+
+Usage:
+    python migrate.py              # apply pending migrations
+    python migrate.py --status     # list applied and pending migrations
+    python migrate.py --target 2   # apply up to version 2 only
+"""
+
+import argparse
+from datetime import datetime
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+
+from dialects import DATABASE_ERRORS as DatabaseError
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+BASELINE_VERSION = 2  # Schema shipped in attendance_system.sql before migrations
+LOCK_WAIT_TIMEOUT = 10  # Seconds MySQL DDL waits for a metadata lock
+
+_FILENAME = re.compile(r'(\d+)_(\w+)\.(\w+)\.sql')
+
+# Objects added to the baseline schema after its first release, and the
+# statement adding each one to a database created before them, in order.
+# (kind, table, name, statement); kind is 'table', 'column' or 'index'.
+# MySQL only: SQLite databases have always been created with the full
+# baseline schema. Online where MySQL allows it; FULLTEXT indexes block
+# writes (not reads) while they build, one index per statement.
+BASELINE_ADDITIONS = (
+    ('table', 'request_counters', None, """
+        CREATE TABLE request_counters (
+            scope ENUM('global', 'department', 'student') NOT NULL,
+            scope_key VARCHAR(100) NOT NULL,
+            status ENUM('pending', 'approved_by_coordinator', 'approved', 'rejected') NOT NULL,
+            request_count INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (scope, scope_key, status)
+        )
+    """),
+    ('column', 'requests', 'attachment_name',
+     "ALTER TABLE requests ADD COLUMN attachment_name VARCHAR(255), "
+     "ALGORITHM=INPLACE, LOCK=NONE"),
+    ('index', 'requests', 'idx_requests_created',
+     "ALTER TABLE requests ADD INDEX idx_requests_created (created_at, request_id), "
+     "ALGORITHM=INPLACE, LOCK=NONE"),
+    ('index', 'requests', 'idx_requests_attachment',
+     "ALTER TABLE requests ADD INDEX idx_requests_attachment (attachment_path), "
+     "ALGORITHM=INPLACE, LOCK=NONE"),
+    ('index', 'requests', 'ft_requests_text',
+     "ALTER TABLE requests ADD FULLTEXT INDEX ft_requests_text (subject, description), "
+     "ALGORITHM=INPLACE, LOCK=SHARED"),
+    ('index', 'students', 'ft_students_name',
+     "ALTER TABLE students ADD FULLTEXT INDEX ft_students_name (name), "
+     "ALGORITHM=INPLACE, LOCK=SHARED"),
+)
+
+COLUMN_EXISTS_QUERY = ("SELECT column_name FROM information_schema.columns "
+                       "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s")
+INDEX_EXISTS_QUERY = ("SELECT index_name FROM information_schema.statistics "
+                      "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s "
+                      "LIMIT 1")
+
+CREATE_MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        checksum CHAR(64) NOT NULL,
+        applied_at DATETIME NOT NULL
+    )
+"""
+
+
+class Migration:
+    """One versioned migration script"""
+
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def read(self):
+        """Return the script text"""
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+    def checksum(self):
+        """SHA-256 of the script, recorded to detect later edits"""
+        return hashlib.sha256(self.read().encode('utf-8')).hexdigest()
+
+    def statements(self):
+        """
+        Split the script into statements
+
+        Statements end at a semicolon that completes them, so trigger
+        bodies (BEGIN ... END) stay whole. Comment lines are dropped.
+        """
+        statements, current = [], []
+        for line in self.read().splitlines():
+            if not current and (not line.strip() or line.lstrip().startswith('--')):
+                continue
+            current.append(line)
+            text = '\n'.join(current)
+            if sqlite3.complete_statement(text):
+                statements.append(text.strip().rstrip(';'))
+                current = []
+        if current:
+            statements.append('\n'.join(current).strip())
+        return statements
+
+
+def discover_migrations(backend, directory=MIGRATIONS_DIR):
+    """
+    Find the migration scripts for a backend
+
+    Returns:
+        List of Migration sorted by version
+    """
+    migrations = {}
+    for filename in os.listdir(directory):
+        match = _FILENAME.fullmatch(filename)
+        if not match or match.group(3) != backend:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {filename}")
+        migrations[version] = Migration(version, match.group(2),
+                                        os.path.join(directory, filename))
+    return [migrations[v] for v in sorted(migrations)]
+
+
+def missing_baseline_objects(db):
+    """
+    Find the BASELINE_ADDITIONS a pre-migration database lacks
+
+    Returns:
+        List of BASELINE_ADDITIONS entries, or None on error
+    """
+    if db.dialect.name != 'mysql':
+        return []
+    missing = []
+    for addition in BASELINE_ADDITIONS:
+        kind, table, name, _ = addition
+        if kind == 'table':
+            found = db.execute_query(db.dialect.table_exists_query(), (table,), fetch=True)
+        else:
+            query = COLUMN_EXISTS_QUERY if kind == 'column' else INDEX_EXISTS_QUERY
+            found = db.execute_query(query, (table, name), fetch=True)
+        if found is None:
+            return None
+        if not found:
+            missing.append(addition)
+    return missing
+
+
+def upgrade_baseline(db):
+    """
+    Bring a pre-migration database up to the baseline schema
+
+    Databases created from an older attendance_system.sql lack objects
+    the code now relies on (the attachment_name column, request_counters,
+    the FULLTEXT indexes). Each missing one is added, and a newly created
+    request_counters table is filled from the existing requests.
+
+    Returns:
+        True on success, False if a statement failed
+    """
+    missing = missing_baseline_objects(db)
+    if missing is None:
+        return False
+    for kind, table, name, statement in missing:
+        label = f"{table}.{name}" if name else table
+        print(f"   Adding {kind} {label} to the existing schema...")
+        try:
+            # One connection for both, so the timeout applies to the DDL
+            with db.transaction():
+                db.execute_query("SET SESSION lock_wait_timeout = %s", (LOCK_WAIT_TIMEOUT,))
+                db.execute_query(statement)
+        except DatabaseError as e:
+            print(f"❌ Could not add {kind} {label}: {e}")
+            return False
+        if kind == 'table' and not db.rebuild_status_counters():
+            return False
+    return True
+
+
+def applied_migrations(db):
+    """
+    Read the applied migrations, baselining a pre-migration database
+
+    Creates schema_migrations if needed. If it did not exist but the
+    tables do, the schema was created by hand: it is first upgraded to
+    the current baseline (upgrade_baseline), then versions up to
+    BASELINE_VERSION are recorded as applied.
+
+    Returns:
+        Dict of version -> schema_migrations row, or None on error
+    """
+    existed = db.execute_query(db.dialect.table_exists_query(), ('schema_migrations',),
+                               fetch=True)
+    if existed is None:
+        return None
+    if not existed:
+        has_tables = db.execute_query(db.dialect.table_exists_query(), ('requests',),
+                                      fetch=True)
+        if has_tables is None:
+            return None
+        # Upgraded before schema_migrations exists, so a failed step is
+        # retried (and the database not baselined) on the next run
+        if has_tables and not upgrade_baseline(db):
+            return None
+        if db.execute_query(CREATE_MIGRATIONS_TABLE) is None:
+            return None
+        if has_tables:
+            now = datetime.now().replace(microsecond=0)
+            baseline = [(m.version, m.name, m.checksum(), now)
+                        for m in discover_migrations(db.dialect.name)
+                        if m.version <= BASELINE_VERSION]
+            print(f"📌 Existing schema found, recorded as migration version {BASELINE_VERSION}")
+            db.execute_many(
+                "INSERT INTO schema_migrations (version, name, checksum, applied_at) "
+                "VALUES (%s, %s, %s, %s)", baseline
+            )
+    rows = db.execute_query("SELECT * FROM schema_migrations ORDER BY version", fetch=True)
+    if rows is None:
+        return None
+    return {row['version']: row for row in rows}
+
+
+def apply_migration(db, migration):
+    """
+    Run one migration and record it
+
+    On SQLite the script and its schema_migrations row commit together.
+    MySQL commits each DDL statement implicitly, so a failed migration
+    may be partly applied; its statements are written so each one is
+    atomic on its own.
+
+    Raises:
+        DatabaseError: A statement failed
+    """
+    with db.transaction():
+        if db.dialect.name == 'mysql':
+            # Give up quickly instead of queueing all traffic behind a
+            # DDL statement that is waiting for a long transaction
+            db.execute_query("SET SESSION lock_wait_timeout = %s", (LOCK_WAIT_TIMEOUT,))
+        for statement in migration.statements():
+            db.execute_query(statement)
+        db.execute_query(
+            "INSERT INTO schema_migrations (version, name, checksum, applied_at) "
+            "VALUES (%s, %s, %s, %s)",
+            (migration.version, migration.name, migration.checksum(),
+             datetime.now().replace(microsecond=0))
+        )
+
+
+def apply_migrations(db, target=None, verbose=True):
+    """
+    Apply pending migrations in version order
+
+    Args:
+        db: DatabaseConfig to migrate
+        target: Highest version to apply (all if None)
+        verbose: Print each migration as it runs
+
+    Returns:
+        List of applied versions, or None if a migration failed
+    """
+    with db.use_primary():
+        applied = applied_migrations(db)
+        if applied is None:
+            return None
+        done = []
+        for migration in discover_migrations(db.dialect.name):
+            if migration.version in applied or (target is not None and migration.version > target):
+                continue
+            if verbose:
+                print(f"   Applying {migration.version:04d}_{migration.name}...")
+            try:
+                apply_migration(db, migration)
+            except DatabaseError as e:
+                print(f"❌ Migration {migration.version:04d}_{migration.name} failed: {e}")
+                return None
+            done.append(migration.version)
+        return done
+
+
+def print_status(db):
+    """Print every migration with whether it has been applied"""
+    with db.use_primary():
+        applied = applied_migrations(db)
+    if applied is None:
+        return False
+    print(f"{'Version':<9}{'Name':<36}{'Applied at':<21}")
+    print("-" * 66)
+    for migration in discover_migrations(db.dialect.name):
+        row = applied.get(migration.version)
+        if row is None:
+            state = 'pending'
+        else:
+            state = str(row['applied_at'])
+            if row['checksum'] != migration.checksum():
+                state += '  (script changed since applied)'
+        print(f"{migration.version:<9}{migration.name:<36}{state}")
+    return True
+
+
+def main():
+    """Apply or list migrations from the command line"""
+    from db_config import db
+
+    parser = argparse.ArgumentParser(description='Apply database schema migrations')
+    parser.add_argument('--status', action='store_true', help='List migrations and exit')
+    parser.add_argument('--target', type=int, help='Highest version to apply')
+    args = parser.parse_args()
+
+    if not db.connect():
+        print("❌ Failed to connect to database!")
+        return 1
+    try:
+        if args.status:
+            return 0 if print_status(db) else 1
+        done = apply_migrations(db, args.target)
+        if done is None:
+            return 1
+        print(f"✅ Applied {len(done)} migration(s)" if done else "✅ Database is up to date")
+        return 0
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
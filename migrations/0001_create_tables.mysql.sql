@@ -0,0 +1,59 @@
+-- Base tables (secondary indexes follow in 0002)
+
+CREATE TABLE students (
+    student_id INT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(100) NOT NULL,
+    department VARCHAR(100) NOT NULL,
+    contact VARCHAR(15) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Coordinators and HODs
+CREATE TABLE users (
+    user_id INT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(100) NOT NULL,
+    role ENUM('coordinator', 'hod') NOT NULL,
+    department VARCHAR(100) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE requests (
+    request_id INT PRIMARY KEY AUTO_INCREMENT,
+    student_id INT NOT NULL,
+    subject VARCHAR(200) NOT NULL,
+    description TEXT NOT NULL,
+    start_time DATETIME NOT NULL,
+    end_time DATETIME NOT NULL,
+    contact VARCHAR(15) NOT NULL,
+    attachment_path VARCHAR(255),
+    attachment_name VARCHAR(255),
+    status ENUM('pending', 'approved_by_coordinator', 'approved', 'rejected') DEFAULT 'pending',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+);
+
+CREATE TABLE approvals (
+    approval_id INT PRIMARY KEY AUTO_INCREMENT,
+    request_id INT NOT NULL,
+    approver_role ENUM('coordinator', 'hod') NOT NULL,
+    approver_name VARCHAR(100) NOT NULL,
+    decision ENUM('approved', 'rejected') NOT NULL,
+    remarks TEXT,
+    decision_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (request_id) REFERENCES requests(request_id) ON DELETE CASCADE
+);
+
+-- Materialized per-status counts for the statistics cards
+-- scope is 'global' (scope_key ''), 'department' (department name) or 'student' (student_id)
+CREATE TABLE request_counters (
+    scope ENUM('global', 'department', 'student') NOT NULL,
+    scope_key VARCHAR(100) NOT NULL,
+    status ENUM('pending', 'approved_by_coordinator', 'approved', 'rejected') NOT NULL,
+    request_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, scope_key, status)
+);
@@ -0,0 +1,74 @@
+-- Base tables for the embedded SQLite backend (secondary indexes and
+-- FTS follow in 0002). ENUM columns become TEXT with CHECK constraints.
+
+-- Table: students
+CREATE TABLE IF NOT EXISTS students (
+    student_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    department VARCHAR(100) NOT NULL,
+    contact VARCHAR(15) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Table: users (Coordinators and HODs)
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    role TEXT NOT NULL CHECK (role IN ('coordinator', 'hod')),
+    department VARCHAR(100) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Table: requests
+CREATE TABLE IF NOT EXISTS requests (
+    request_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER NOT NULL,
+    subject VARCHAR(200) NOT NULL,
+    description TEXT NOT NULL,
+    start_time DATETIME NOT NULL,
+    end_time DATETIME NOT NULL,
+    contact VARCHAR(15) NOT NULL,
+    attachment_path VARCHAR(255),
+    attachment_name VARCHAR(255),
+    status TEXT DEFAULT 'pending'
+        CHECK (status IN ('pending', 'approved_by_coordinator', 'approved', 'rejected')),
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+);
+
+-- Table: approvals
+CREATE TABLE IF NOT EXISTS approvals (
+    approval_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id INTEGER NOT NULL,
+    approver_role TEXT NOT NULL CHECK (approver_role IN ('coordinator', 'hod')),
+    approver_name VARCHAR(100) NOT NULL,
+    decision TEXT NOT NULL CHECK (decision IN ('approved', 'rejected')),
+    remarks TEXT,
+    decision_time TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (request_id) REFERENCES requests(request_id) ON DELETE CASCADE
+);
+
+-- Table: request_counters (materialized per-status counts for the statistics cards)
+-- scope is 'global' (scope_key ''), 'department' (department name) or 'student' (student_id)
+CREATE TABLE IF NOT EXISTS request_counters (
+    scope TEXT NOT NULL CHECK (scope IN ('global', 'department', 'student')),
+    scope_key VARCHAR(100) NOT NULL,
+    status TEXT NOT NULL
+        CHECK (status IN ('pending', 'approved_by_coordinator', 'approved', 'rejected')),
+    request_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, scope_key, status)
+) WITHOUT ROWID;
+
+-- updated_at: emulates MySQL's ON UPDATE CURRENT_TIMESTAMP
+CREATE TRIGGER IF NOT EXISTS requests_touch_updated_at
+AFTER UPDATE ON requests
+FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE requests SET updated_at = datetime('now', 'localtime')
+    WHERE request_id = NEW.request_id;
+END;
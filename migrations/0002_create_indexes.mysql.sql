@@ -0,0 +1,12 @@
+-- Secondary and FULLTEXT indexes (kept separate from 0001 so bulk loads
+-- can run before any index exists)
+
+CREATE INDEX idx_requests_status ON requests(status);
+CREATE INDEX idx_requests_student ON requests(student_id);
+CREATE INDEX idx_requests_created ON requests(created_at, request_id);
+CREATE INDEX idx_requests_attachment ON requests(attachment_path);
+CREATE INDEX idx_approvals_request ON approvals(request_id);
+
+-- Full-text search for the All Requests search box
+CREATE FULLTEXT INDEX ft_requests_text ON requests(subject, description);
+CREATE FULLTEXT INDEX ft_students_name ON students(name);
@@ -0,0 +1,47 @@
+-- Secondary indexes and full-text search (kept separate from 0001 so
+-- bulk loads can run before any index or FTS trigger exists)
+
+CREATE INDEX IF NOT EXISTS idx_requests_status ON requests(status);
+CREATE INDEX IF NOT EXISTS idx_requests_student ON requests(student_id);
+CREATE INDEX IF NOT EXISTS idx_requests_created ON requests(created_at, request_id);
+CREATE INDEX IF NOT EXISTS idx_requests_attachment ON requests(attachment_path);
+CREATE INDEX IF NOT EXISTS idx_approvals_request ON approvals(request_id);
+
+-- Full-text search for the All Requests search box (external-content FTS5,
+-- the equivalent of MySQL's FULLTEXT indexes)
+CREATE VIRTUAL TABLE IF NOT EXISTS requests_fts USING fts5(
+    subject, description, content='requests', content_rowid='request_id', prefix='2 3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+    name, content='students', content_rowid='student_id', prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS requests_fts_insert AFTER INSERT ON requests BEGIN
+    INSERT INTO requests_fts(rowid, subject, description)
+    VALUES (NEW.request_id, NEW.subject, NEW.description);
+END;
+CREATE TRIGGER IF NOT EXISTS requests_fts_delete AFTER DELETE ON requests BEGIN
+    INSERT INTO requests_fts(requests_fts, rowid, subject, description)
+    VALUES ('delete', OLD.request_id, OLD.subject, OLD.description);
+END;
+CREATE TRIGGER IF NOT EXISTS requests_fts_update AFTER UPDATE OF subject, description ON requests BEGIN
+    INSERT INTO requests_fts(requests_fts, rowid, subject, description)
+    VALUES ('delete', OLD.request_id, OLD.subject, OLD.description);
+    INSERT INTO requests_fts(rowid, subject, description)
+    VALUES (NEW.request_id, NEW.subject, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+    INSERT INTO students_fts(rowid, name) VALUES (NEW.student_id, NEW.name);
+END;
+CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+    INSERT INTO students_fts(students_fts, rowid, name) VALUES ('delete', OLD.student_id, OLD.name);
+END;
+CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE OF name ON students BEGIN
+    INSERT INTO students_fts(students_fts, rowid, name) VALUES ('delete', OLD.student_id, OLD.name);
+    INSERT INTO students_fts(rowid, name) VALUES (NEW.student_id, NEW.name);
+END;
+
+-- Index rows loaded before the triggers existed
+INSERT INTO requests_fts(requests_fts) VALUES ('rebuild');
+INSERT INTO students_fts(students_fts) VALUES ('rebuild');
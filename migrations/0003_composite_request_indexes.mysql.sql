@@ -0,0 +1,22 @@
+-- Composite indexes matching the hot queries' filter + sort, so
+-- "WHERE status = ? ORDER BY created_at DESC, request_id DESC" and the
+-- per-student list read rows in index order instead of filesorting.
+-- The single-column indexes they replace are dropped in the same
+-- statement (the composites still serve the foreign keys).
+--
+-- Online DDL: ALGORITHM=INPLACE, LOCK=NONE keeps reads and writes
+-- running while the indexes build, and makes MySQL refuse rather than
+-- silently lock the table if it cannot. One ALTER per table keeps each
+-- step atomic.
+
+ALTER TABLE requests
+    ADD INDEX idx_requests_status_created (status, created_at, request_id),
+    ADD INDEX idx_requests_student_created (student_id, created_at, request_id),
+    DROP INDEX idx_requests_status,
+    DROP INDEX idx_requests_student,
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE approvals
+    ADD INDEX idx_approvals_request_time (request_id, decision_time),
+    DROP INDEX idx_approvals_request,
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,12 @@
+-- Composite indexes matching the hot queries' filter + sort, so
+-- "WHERE status = ? ORDER BY created_at DESC, request_id DESC" and the
+-- per-student list read rows in index order instead of sorting. The
+-- single-column indexes they replace are dropped.
+
+CREATE INDEX IF NOT EXISTS idx_requests_status_created ON requests(status, created_at, request_id);
+CREATE INDEX IF NOT EXISTS idx_requests_student_created ON requests(student_id, created_at, request_id);
+CREATE INDEX IF NOT EXISTS idx_approvals_request_time ON approvals(request_id, decision_time);
+
+DROP INDEX IF EXISTS idx_requests_status;
+DROP INDEX IF EXISTS idx_requests_student;
+DROP INDEX IF EXISTS idx_approvals_request;
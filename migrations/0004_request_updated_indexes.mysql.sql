@@ -0,0 +1,11 @@
+-- Indexes for the delta-sync API (/api/requests?since=), which reads
+-- "WHERE (updated_at, request_id) > token ORDER BY updated_at, request_id"
+-- so each sync touches only the rows changed since the token. Students
+-- sync their own requests, so they get a student-prefixed variant.
+--
+-- Online DDL as in 0003: ALGORITHM=INPLACE, LOCK=NONE.
+
+ALTER TABLE requests
+    ADD INDEX idx_requests_updated (updated_at, request_id),
+    ADD INDEX idx_requests_student_updated (student_id, updated_at, request_id),
+    ALGORITHM=INPLACE, LOCK=NONE;
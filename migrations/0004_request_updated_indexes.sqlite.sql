@@ -0,0 +1,6 @@
+-- Indexes for the delta-sync API (/api/requests?since=), which reads
+-- "WHERE (updated_at, request_id) > token ORDER BY updated_at, request_id"
+-- so each sync touches only the rows changed since the token.
+
+CREATE INDEX IF NOT EXISTS idx_requests_updated ON requests(updated_at, request_id);
+CREATE INDEX IF NOT EXISTS idx_requests_student_updated ON requests(student_id, updated_at, request_id);
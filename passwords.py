@@ -0,0 +1,175 @@
+"""
+Password Hashing Module
+Salted adaptive password hashing (scrypt / PBKDF2) with legacy MD5 upgrade
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import base64
+import hashlib
+import hmac
+import os
+import re
+import threading
+
+# Default cost settings: scrypt N=2^14, r=8 uses ~16 MB and ~50 ms per hash
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600000
+SALT_BYTES = 16
+
+_LEGACY_MD5 = re.compile(r'[0-9a-f]{32}')
+
+
+class HasherBusyError(Exception):
+    """Raised when too many password hashes are already queued"""
+
+
+def _b64(raw):
+    """Encode bytes as base64 text"""
+    return base64.b64encode(raw).decode('ascii')
+
+
+def hash_password(password, algorithm='scrypt', n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P,
+                  iterations=PBKDF2_ITERATIONS):
+    """
+    Hash a password with a fresh random salt
+
+    Args:
+        password: Plain text password
+        algorithm: 'scrypt' or 'pbkdf2_sha256'
+        n, r, p: scrypt cost parameters
+        iterations: PBKDF2 iteration count
+
+    Returns:
+        Encoded hash string, e.g. scrypt$16384$8$1$<salt>$<hash>
+    """
+    salt = os.urandom(SALT_BYTES)
+    if algorithm == 'scrypt':
+        digest = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                                maxmem=128 * r * (n + p) + 1024 * 1024, dklen=32)
+        return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(digest)}"
+    if algorithm == 'pbkdf2_sha256':
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+        return f"pbkdf2_sha256${iterations}${_b64(salt)}${_b64(digest)}"
+    raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+
+
+def verify_password(password, stored):
+    """
+    Check a password against a stored hash
+
+    Args:
+        password: Plain text password
+        stored: Value from the password column
+
+    Returns:
+        True if the password matches
+    """
+    if not stored:
+        return False
+    if _LEGACY_MD5.fullmatch(stored):
+        candidate = hashlib.md5(password.encode()).hexdigest()
+        return hmac.compare_digest(candidate, stored)
+
+    parts = stored.split('$')
+    try:
+        if parts[0] == 'scrypt' and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            salt, expected = base64.b64decode(parts[4]), base64.b64decode(parts[5])
+            digest = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                                    maxmem=128 * r * (n + p) + 1024 * 1024,
+                                    dklen=len(expected))
+        elif parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+            iterations = int(parts[1])
+            salt, expected = base64.b64decode(parts[2]), base64.b64decode(parts[3])
+            digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+        else:
+            return False
+    except ValueError:
+        return False
+    return hmac.compare_digest(digest, expected)
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a bounded worker pool
+
+    Slow KDFs would otherwise run on every request thread at once during
+    a login spike, each holding ~16 MB of scrypt memory. The pool caps the
+    number running in parallel, and callers are turned away with
+    HasherBusyError once max_pending hashes are queued instead of piling up.
+    """
+
+    def __init__(self, algorithm='scrypt', n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P,
+                 iterations=PBKDF2_ITERATIONS, max_workers=4, max_pending=64):
+        """
+        Initialize password hasher
+
+        Args:
+            algorithm: 'scrypt' or 'pbkdf2_sha256' for new hashes
+            n, r, p: scrypt cost parameters
+            iterations: PBKDF2 iteration count
+            max_workers: Hashes computed in parallel
+            max_pending: Hashes allowed in flight before rejecting new ones
+        """
+        if algorithm == 'scrypt' and not hasattr(hashlib, 'scrypt'):
+            algorithm = 'pbkdf2_sha256'  # OpenSSL built without scrypt
+        self.params = {'algorithm': algorithm, 'n': n, 'r': r, 'p': p,
+                       'iterations': iterations}
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='password')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._dummy_hash = None
+
+    def _call(self, fn, *args, **kwargs):
+        """Run fn on the pool and wait for its result"""
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusyError(f"More than {self.max_pending} password hashes in flight")
+        try:
+            return self._executor.submit(fn, *args, **kwargs).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """Hash a password with the configured algorithm and cost"""
+        return self._call(hash_password, password, **self.params)
+
+    def needs_rehash(self, stored):
+        """Check whether a stored hash uses an outdated algorithm or cost"""
+        params = self.params
+        if params['algorithm'] == 'scrypt':
+            current = f"scrypt${params['n']}${params['r']}${params['p']}$"
+        else:
+            current = f"pbkdf2_sha256${params['iterations']}$"
+        return not stored.startswith(current)
+
+    def verify(self, password, stored):
+        """
+        Check a password and produce an upgraded hash when needed
+
+        Args:
+            password: Plain text password
+            stored: Value from the password column, or None if no such user
+
+        Returns:
+            (matches, new_hash) where new_hash is a replacement to store for
+            legacy or outdated hashes after a successful match, else None
+        """
+        if not stored:
+            # Burn the same work as a real check so unknown emails are not
+            # distinguishable by response time
+            if self._dummy_hash is None:
+                self._dummy_hash = self.hash('dummy-password')
+            self._call(verify_password, password, self._dummy_hash)
+            return False, None
+        if not self._call(verify_password, password, stored):
+            return False, None
+        if self.needs_rehash(stored):
+            return True, self.hash(password)
+        return True, None
+
+
+# Shared hasher for the web app and management scripts
+hasher = PasswordHasher()
@@ -0,0 +1,123 @@
+"""
+Query Cache Module
+In-process LRU cache for read query results with per-table invalidation
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class QueryCache:
+    """
+    Thread-safe LRU + TTL cache keyed by SQL text and parameters
+
+    Every entry remembers the version of each table it read. Writers call
+    invalidate() with the tables they changed, which bumps those versions
+    so any entry built from an older version is treated as a miss. The TTL
+    (which callers can shorten per entry) bounds staleness for writes made
+    by other processes, which this cache cannot see.
+    """
+
+    def __init__(self, max_entries=256, ttl=30.0):
+        """
+        Initialize query cache
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def snapshot(self, tables):
+        """
+        Capture current table versions
+
+        Take the snapshot before running the query so a write that lands
+        while it runs invalidates the stored result.
+
+        Args:
+            tables: Tables the query reads
+
+        Returns:
+            Tuple of versions to pass to put()
+        """
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def get(self, key, tables):
+        """
+        Look up a cached result
+
+        Args:
+            key: Cache key (query, params)
+            tables: Tables the query reads
+
+        Returns:
+            (True, result) on a hit, (False, None) on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, versions, result = entry
+                current = tuple(self._versions.get(table, 0) for table in tables)
+                if expires_at > time.monotonic() and versions == current:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return True, result
+                del self._entries[key]
+            self._misses += 1
+            return False, None
+
+    def put(self, key, versions, result, ttl=None):
+        """
+        Store a query result
+
+        Args:
+            key: Cache key (query, params)
+            versions: Table versions from snapshot() taken before the query
+            result: Rows to cache
+            ttl: Seconds this entry stays valid (at most the cache's TTL)
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, versions, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, *tables):
+        """Bump table versions so cached results that read them are discarded"""
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+            self._invalidations += 1
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
@@ -4,11 +4,272 @@ This script will drop all tables and recreate them with fresh sample data.
 USE WITH CAUTION - This will delete all existing data!
 """
 
+import argparse
+from datetime import datetime, timedelta
+import os
+import random
 import sys
+import tempfile
+import time
+
 from db_config import db
 
-def reset_database():
-    """Drop all tables and recreate with fresh data"""
+# --scale data generation
+SCALE_LOAD_VERSION = 1  # Migration with the tables only; indexes come after the load
+SAMPLE_PASSWORD_HASH = '5f4dcc3b5aa765d61d8327deb882cf99'  # 'password' (upgraded on first login)
+DEPARTMENTS = ['Computer Science', 'Information Technology', 'Electronics',
+               'Mechanical', 'Civil', 'Electrical']
+FIRST_NAMES = ['Aarav', 'Diya', 'Ishaan', 'Ananya', 'Kabir', 'Meera', 'Rohan', 'Saanvi',
+               'Vihaan', 'Aditi', 'Arjun', 'Kavya', 'Nikhil', 'Priya', 'Rahul', 'Sneha']
+LAST_NAMES = ['Sharma', 'Patel', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Kulkarni', 'Das',
+              'Joshi', 'Menon', 'Singh', 'Rao', 'Mehta', 'Verma', 'Pillai', 'Bose']
+EVENTS = ['Workshop', 'Hackathon', 'Seminar', 'Conference', 'Internship', 'Competition',
+          'Medical Leave', 'Sports Meet', 'Symposium', 'Training', 'Cultural Fest', 'Placement Drive']
+REMARKS = ['Approved, submit the certificate afterwards', 'Ensure lab work is completed',
+           'Clashes with internal assessment', 'Insufficient notice', 'Document missing']
+STUDENT_COLUMNS = ('student_id', 'name', 'department', 'contact', 'email', 'password',
+                   'created_at')
+REQUEST_COLUMNS = ('request_id', 'student_id', 'subject', 'description', 'start_time',
+                   'end_time', 'contact', 'status', 'created_at', 'updated_at')
+APPROVAL_COLUMNS = ('request_id', 'approver_role', 'approver_name', 'decision', 'remarks',
+                    'decision_time')
+PROGRESS_EVERY = 100000  # Rows between progress lines
+
+
+def _student_contact(student_id):
+    """Deterministic 10-digit contact number for a generated student"""
+    return f"9{student_id:09d}"[-10:]
+
+
+def generate_students(count, first_id, rng, now, days):
+    """
+    Yield generated student rows (STUDENT_COLUMNS order)
+
+    Accounts are created before the request window starts and share the
+    sample password hash, so no KDF work is spent while loading.
+    """
+    for student_id in range(first_id, first_id + count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        yield (student_id, name, DEPARTMENTS[student_id % len(DEPARTMENTS)],
+               _student_contact(student_id), f"student{student_id}@scale.local",
+               SAMPLE_PASSWORD_HASH,
+               now - timedelta(days=days + rng.randint(0, 365), seconds=rng.randint(0, 86399)))
+
+
+def _pick_status(rng, age_days):
+    """Status mix by request age: recent requests are mostly still in progress"""
+    r = rng.random()
+    if age_days < 14:
+        return ('pending' if r < 0.45 else 'approved_by_coordinator' if r < 0.70
+                else 'approved' if r < 0.90 else 'rejected')
+    return ('pending' if r < 0.02 else 'approved_by_coordinator' if r < 0.05
+            else 'approved' if r < 0.80 else 'rejected')
+
+
+def generate_requests(count, first_id, student_ids, rng, now, days):
+    """
+    Yield generated (request row, approval rows) pairs
+
+    Requests are spread over the last `days` days with events starting
+    up to a month after submission. Approvals match each status: the
+    coordinator decides first, then the HOD, and rejections happen at
+    either stage.
+
+    Args:
+        count: Requests to generate
+        first_id: request_id of the first one
+        student_ids: (first, last) student_id range requests belong to
+        rng: random.Random
+        now: Latest timestamp generated
+        days: Length of the submission window
+    """
+    window = days * 86400
+    for request_id in range(first_id, first_id + count):
+        student_id = rng.randint(*student_ids)
+        age = rng.randint(0, window)
+        created = now - timedelta(seconds=age)
+        start = (created + timedelta(days=rng.randint(1, 30))).replace(
+            hour=rng.randint(8, 11), minute=0, second=0)
+        end = start + timedelta(hours=rng.choice((4, 8, 9, 24, 48, 72)))
+        event = rng.choice(EVENTS)
+        status = _pick_status(rng, age / 86400)
+
+        approvals = []
+        decided = created
+        if status != 'pending':
+            decided = min(now, created + timedelta(minutes=rng.randint(30, 4320)))
+            coordinator_rejects = status == 'rejected' and rng.random() < 0.7
+            approvals.append((request_id, 'coordinator', 'COORD1',
+                              'rejected' if coordinator_rejects else 'approved',
+                              rng.choice(REMARKS) if rng.random() < 0.3 else None, decided))
+            if status in ('approved', 'rejected') and not coordinator_rejects:
+                decided = min(now, decided + timedelta(minutes=rng.randint(30, 4320)))
+                approvals.append((request_id, 'hod', 'HOD1', status,
+                                  rng.choice(REMARKS) if rng.random() < 0.3 else None, decided))
+
+        request = (request_id, student_id, f"{event} Attendance",
+                   f"Requesting permission to attend the {event.lower()} "
+                   f"({start:%d %b %Y}) organised by the {rng.choice(DEPARTMENTS)} department",
+                   start, end, _student_contact(student_id), status, created, decided)
+        yield request, approvals
+
+
+class BatchInserter:
+    """Loads rows with multi-row INSERTs, one transaction per batch"""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.pending = {}  # table -> (columns, rows), flushed in insertion order
+
+    def add(self, table, columns, row):
+        """Queue a row, flushing every table once this one's batch is full"""
+        rows = self.pending.setdefault(table, (columns, []))[1]
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Insert everything queued (parents before children, so foreign keys hold)"""
+        with db.transaction():
+            if db.dialect.name == 'mysql':
+                db.execute_query("SET SESSION unique_checks = 0")
+            for table, (columns, rows) in self.pending.items():
+                if rows:
+                    db.execute_many(
+                        f"INSERT INTO {table} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join(['%s'] * len(columns))})", rows
+                    )
+                    rows.clear()
+            if db.dialect.name == 'mysql':
+                db.execute_query("SET SESSION unique_checks = 1")
+
+    def close(self):
+        """Insert the final partial batch"""
+        self.flush()
+
+
+def _tsv_value(value):
+    """Encode a value for LOAD DATA's default field format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n'))
+
+
+class InfileLoader:
+    """
+    Loads rows with LOAD DATA LOCAL INFILE (MySQL only)
+
+    Rows are written to one temporary tab-separated file per table and
+    each file is loaded in a single statement on close(). Needs
+    local_infile enabled on the server.
+    """
+
+    def __init__(self, batch_size=None):
+        self.directory = tempfile.mkdtemp(prefix='attendance_seed_')
+        self.files = {}  # table -> (columns, path, file)
+
+    def add(self, table, columns, row):
+        """Append a row to the table's file"""
+        entry = self.files.get(table)
+        if entry is None:
+            path = os.path.join(self.directory, f"{table}.tsv")
+            entry = (columns, path, open(path, 'w', encoding='utf-8', newline='\n'))
+            self.files[table] = entry
+        entry[2].write('\t'.join(_tsv_value(value) for value in row) + '\n')
+
+    def close(self):
+        """Load each file, parents first, then delete the files"""
+        for _, _, f in self.files.values():
+            f.close()
+        conn = db.dialect.connect(allow_local_infile=True)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SET SESSION foreign_key_checks = 0")
+            cursor.execute("SET SESSION unique_checks = 0")
+            for table, (columns, path, _) in self.files.items():
+                print(f"   Loading {table} from {path}...")
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+                    f"({', '.join(columns)})", (path,)
+                )
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+            for _, path, _ in self.files.values():
+                os.remove(path)
+            os.rmdir(self.directory)
+
+
+def _next_id(table, column):
+    """First unused ID in a table"""
+    with db.use_primary():
+        result = db.execute_query(
+            f"SELECT COALESCE(MAX({column}), 0) + 1 AS next_id FROM {table}", fetch=True
+        )
+    return result[0]['next_id']
+
+
+def load_scale_data(students, requests, method='insert', batch_size=5000, days=730, seed=42):
+    """
+    Generate and load a production-sized dataset
+
+    Args:
+        students: Students to generate
+        requests: Requests to generate (approvals follow from their status)
+        method: 'insert' for batched multi-row INSERTs, or 'infile' for
+            LOAD DATA LOCAL INFILE (MySQL only)
+        batch_size: Rows per INSERT batch and commit
+        days: Submission window the requests are spread over
+        seed: Random seed, so runs are reproducible
+
+    Returns:
+        Dict of rows loaded per table
+    """
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    loader = InfileLoader() if method == 'infile' else BatchInserter(batch_size)
+    first_student = _next_id('students', 'student_id')
+    first_request = _next_id('requests', 'request_id')
+    counts = {'students': 0, 'requests': 0, 'approvals': 0}
+    started = time.perf_counter()
+
+    def progress(table):
+        counts[table] += 1
+        if counts[table] % PROGRESS_EVERY == 0:
+            rate = counts[table] / (time.perf_counter() - started)
+            print(f"   {table}: {counts[table]:,} rows ({rate:,.0f} rows/s)")
+
+    for row in generate_students(students, first_student, rng, now, days):
+        loader.add('students', STUDENT_COLUMNS, row)
+        progress('students')
+
+    started = time.perf_counter()
+    student_range = (first_student, first_student + students - 1)
+    for request, approvals in generate_requests(requests, first_request, student_range,
+                                                rng, now, days):
+        loader.add('requests', REQUEST_COLUMNS, request)
+        progress('requests')
+        for approval in approvals:
+            loader.add('approvals', APPROVAL_COLUMNS, approval)
+            counts['approvals'] += 1
+    loader.close()
+    return counts
+
+
+def reset_database(scale=None):
+    """
+    Drop all tables and recreate with fresh data
+    
+    Args:
+        scale: Optional dict of load_scale_data() arguments; the generated
+            dataset is loaded after the sample data, before the migrations
+            that add indexes
+    """
     
     print("=" * 60)
     print("DATABASE RESET SCRIPT")
@@ -19,6 +280,9 @@ def reset_database():
     print("  - All requests")
     print("  - All approvals")
     print("  - All user accounts (except what's in SQL file)")
+    if scale:
+        print(f"\nThen {scale['students']:,} students and {scale['requests']:,} "
+              f"requests will be generated ({scale['method']} method).")
     print("\n")
     
     confirm = input("Are you sure you want to continue? (type 'YES' to confirm): ")
@@ -38,7 +302,10 @@ def reset_database():
         # Drop tables in correct order (due to foreign keys)
         print("\n🗑️  Dropping existing tables...")
         
-        tables = ['approvals', 'requests', 'students', 'users']
+        tables = ['request_counters', 'approvals', 'requests', 'students', 'users',
+                  'schema_migrations']
+        if db.dialect.name == 'sqlite':
+            tables += ['requests_fts', 'students_fts']
         for table in tables:
             print(f"   Dropping table: {table}")
             db.execute_query(f"DROP TABLE IF EXISTS {table}")
@@ -47,74 +314,10 @@ def reset_database():
         
         # Recreate tables
         print("\n🏗️  Creating tables...")
-        
-        # Students table
-        print("   Creating students table...")
-        db.execute_query("""
-            CREATE TABLE students (
-                student_id INT PRIMARY KEY AUTO_INCREMENT,
-                name VARCHAR(100) NOT NULL,
-                department VARCHAR(100) NOT NULL,
-                contact VARCHAR(15) NOT NULL,
-                email VARCHAR(100) UNIQUE NOT NULL,
-                password VARCHAR(255) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Users table
-        print("   Creating users table...")
-        db.execute_query("""
-            CREATE TABLE users (
-                user_id INT PRIMARY KEY AUTO_INCREMENT,
-                name VARCHAR(100) NOT NULL,
-                role ENUM('coordinator', 'hod') NOT NULL,
-                department VARCHAR(100) NOT NULL,
-                email VARCHAR(100) UNIQUE NOT NULL,
-                password VARCHAR(255) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Requests table
-        print("   Creating requests table...")
-        db.execute_query("""
-            CREATE TABLE requests (
-                request_id INT PRIMARY KEY AUTO_INCREMENT,
-                student_id INT NOT NULL,
-                subject VARCHAR(200) NOT NULL,
-                description TEXT NOT NULL,
-                start_time DATETIME NOT NULL,
-                end_time DATETIME NOT NULL,
-                contact VARCHAR(15) NOT NULL,
-                attachment_path VARCHAR(255),
-                status ENUM('pending', 'approved_by_coordinator', 'approved', 'rejected') DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
-            )
-        """)
-        
-        # Approvals table
-        print("   Creating approvals table...")
-        db.execute_query("""
-            CREATE TABLE approvals (
-                approval_id INT PRIMARY KEY AUTO_INCREMENT,
-                request_id INT NOT NULL,
-                approver_role ENUM('coordinator', 'hod') NOT NULL,
-                approver_name VARCHAR(100) NOT NULL,
-                decision ENUM('approved', 'rejected') NOT NULL,
-                remarks TEXT,
-                decision_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (request_id) REFERENCES requests(request_id) ON DELETE CASCADE
-            )
-        """)
-        
-        # Create indexes
-        print("   Creating indexes...")
-        db.execute_query("CREATE INDEX idx_requests_status ON requests(status)")
-        db.execute_query("CREATE INDEX idx_requests_student ON requests(student_id)")
-        db.execute_query("CREATE INDEX idx_approvals_request ON approvals(request_id)")
+        # A bulk load goes in before any secondary index exists
+        if db.migrate(target=SCALE_LOAD_VERSION if scale else None) is None:
+            print("❌ Failed to create tables!")
+            return
         
         print("✅ All tables created")
         
@@ -148,6 +351,24 @@ def reset_database():
         
         print("✅ Sample data inserted")
         
+        if scale:
+            print("\n🏭 Generating scale data...")
+            started = time.perf_counter()
+            counts = load_scale_data(**scale)
+            print(f"✅ Loaded {counts['students']:,} students, {counts['requests']:,} requests "
+                  f"and {counts['approvals']:,} approvals in {time.perf_counter() - started:.1f}s")
+            
+            print("\n📇 Building indexes...")
+            started = time.perf_counter()
+            if db.migrate() is None:
+                print("❌ Failed to build indexes!")
+                return
+            print(f"✅ Indexes built in {time.perf_counter() - started:.1f}s")
+        
+        # Seed status counters from the requests
+        print("\n🔢 Computing status counters...")
+        db.rebuild_status_counters()
+        
         print("\n" + "=" * 60)
         print("✅ DATABASE RESET COMPLETE!")
         print("=" * 60)
@@ -174,5 +395,33 @@ def reset_database():
     finally:
         db.disconnect()
 
+def main():
+    """Parse command line options and reset the database"""
+    parser = argparse.ArgumentParser(description='Reset the database with sample data')
+    parser.add_argument('--scale', action='store_true',
+                        help='Also generate a production-sized synthetic dataset')
+    parser.add_argument('--students', type=int, default=100000,
+                        help='Students generated with --scale')
+    parser.add_argument('--requests', type=int, default=1000000,
+                        help='Requests generated with --scale')
+    parser.add_argument('--method', choices=('insert', 'infile'), default='insert',
+                        help='Batched INSERTs, or LOAD DATA LOCAL INFILE (MySQL only)')
+    parser.add_argument('--batch-size', type=int, default=5000,
+                        help='Rows per INSERT batch with --method insert')
+    parser.add_argument('--days', type=int, default=730,
+                        help='Days of request history generated with --scale')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for --scale')
+    args = parser.parse_args()
+    
+    if args.method == 'infile' and db.dialect.name != 'mysql':
+        parser.error("--method infile needs the MySQL backend")
+    scale = None
+    if args.scale:
+        scale = {'students': args.students, 'requests': args.requests,
+                 'method': args.method, 'batch_size': args.batch_size,
+                 'days': args.days, 'seed': args.seed}
+    reset_database(scale)
+
+
 if __name__ == "__main__":
-    reset_database()
+    main()
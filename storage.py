@@ -0,0 +1,220 @@
+"""
+Attachment Storage Module
+Content-addressed storage for uploaded attachments
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+CHUNK_SIZE = 64 * 1024  # Bytes read/written per chunk
+GC_GRACE_PERIOD = 3600  # Seconds before an unreferenced blob may be collected
+
+
+class AttachmentStore:
+    """
+    Stores uploads under the SHA-256 of their content
+
+    Files live at <root>/<first two hex digits>/<sha256><ext>, so identical
+    uploads share one file. A blob is referenced by every request whose
+    attachment_path points at it and is only deleted once none do.
+    """
+
+    def __init__(self, root):
+        """
+        Initialize attachment store
+
+        Args:
+            root: Directory blobs are stored under
+        """
+        self.root = root
+
+    def path_for(self, digest, ext=''):
+        """Return the storage path for a content digest"""
+        return os.path.join(self.root, digest[:2], f"{digest}{ext}")
+
+    @staticmethod
+    def digest_of(path):
+        """
+        Return the SHA-256 a blob is stored under
+
+        Args:
+            path: Stored attachment path
+
+        Returns:
+            Hex digest, or None for paths not produced by this store
+        """
+        name = os.path.splitext(os.path.basename(path))[0]
+        return name if re.fullmatch(r'[0-9a-f]{64}', name) else None
+
+    def save(self, file, filename):
+        """
+        Store an uploaded file, reusing an existing copy of the same content
+
+        Seekable uploads are hashed first and only written if the content
+        is new, so a duplicate costs no disk space and no write I/O.
+        Other streams are copied to a temporary file while being hashed.
+
+        Args:
+            file: Werkzeug FileStorage (or any object with a .stream)
+            filename: Sanitized original filename, used for the extension
+
+        Returns:
+            (path, created) where created is False for a deduplicated upload
+
+        A deduplicated blob's modification time is refreshed, so garbage
+        collection treats it as new until its request has been saved.
+        """
+        ext = os.path.splitext(filename)[1].lower()
+        stream = file.stream
+
+        if stream.seekable():
+            digest = self._hash_stream(stream)
+            stream.seek(0)
+            path = self.path_for(digest, ext)
+            if self._reuse(path):
+                return path, False
+            self._write_atomic(stream, path)
+            return path, True
+
+        # Non-seekable stream: copy and hash in one pass
+        os.makedirs(self.root, exist_ok=True)
+        hasher = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+                    tmp.write(chunk)
+            path = self.path_for(hasher.hexdigest(), ext)
+            if self._reuse(path):
+                os.remove(tmp_path)
+                return path, False
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            return path, True
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _reuse(path):
+        """Claim an existing blob for a new upload; False if there is none"""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    @staticmethod
+    def _hash_stream(stream):
+        """Compute the SHA-256 hex digest of a stream in chunks"""
+        hasher = hashlib.sha256()
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _write_atomic(stream, path):
+        """Copy a stream to path via a temp file so readers never see partial blobs"""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    tmp.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete_if_unreferenced(self, path, db, grace_period=GC_GRACE_PERIOD):
+        """
+        Delete a blob that no request points at any more
+
+        Blobs written or reused within grace_period are kept even when
+        unreferenced, since the upload using them may not have inserted
+        its request yet.
+
+        Args:
+            path: Stored attachment path
+            db: DatabaseConfig used to count references
+            grace_period: Minimum seconds since the blob was last used
+
+        Returns:
+            True if the file was deleted
+        """
+        try:
+            if os.path.getmtime(path) > time.time() - grace_period:
+                return False
+        except FileNotFoundError:
+            return False
+        references = db.count_attachment_references(path)
+        if references == 0 and os.path.exists(path):
+            os.remove(path)
+            # Derived files (e.g. thumbnails) are named <blob>.<suffix>
+            directory, name = os.path.split(path)
+            for sibling in os.listdir(directory or '.'):
+                if sibling.startswith(f"{name}."):
+                    os.remove(os.path.join(directory, sibling))
+            return True
+        return False
+
+    def collect_garbage(self, db, grace_period=GC_GRACE_PERIOD):
+        """
+        Remove blobs with no referencing request
+
+        Blobs newer than grace_period are kept because their request may
+        still be in the middle of being created.
+
+        Args:
+            db: DatabaseConfig used to count references
+            grace_period: Minimum blob age in seconds
+
+        Returns:
+            Number of files removed
+        """
+        removed = 0
+        cutoff = time.time() - grace_period
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                if not os.path.exists(path) or os.path.getmtime(path) > cutoff:
+                    continue
+                if name.endswith('.part'):
+                    # Abandoned temp file from an interrupted write
+                    os.remove(path)
+                    removed += 1
+                elif self.digest_of(path) is None:
+                    # Derived files are removed together with their blob
+                    continue
+                elif self.delete_if_unreferenced(path, db, grace_period):
+                    removed += 1
+        return removed
+
+
+def main():
+    """Remove unreferenced attachment blobs"""
+    from db_config import db
+
+    print("=" * 60)
+    print("ATTACHMENT GARBAGE COLLECTION")
+    print("=" * 60)
+
+    if not db.connect():
+        print("❌ Failed to connect to database!")
+        return
+
+    store = AttachmentStore(os.path.join('uploads', 'objects'))
+    removed = store.collect_garbage(db)
+    print(f"✅ Removed {removed} unreferenced attachment(s)")
+    db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Tests for the Attendance Request & Approval System
+Run with: python -m unittest discover tests
+"""
@@ -0,0 +1,64 @@
+"""
+Pool Exhaustion Tests
+A write that cannot get a pooled connection must reach the 503 handler
+rather than being swallowed by an `except DatabaseError` and reported as
+a failed action.
+"""
+
+import os
+import tempfile
+import unittest
+
+_tmpdir = tempfile.TemporaryDirectory()
+os.environ['ATTENDANCE_DB_BACKEND'] = 'sqlite'
+os.environ['ATTENDANCE_SQLITE_PATH'] = os.path.join(_tmpdir.name, 'attendance.db')
+
+from app import app  # noqa: E402
+from db_config import db, DatabaseUnavailableError, PoolTimeoutError  # noqa: E402
+from dialects import DATABASE_ERRORS  # noqa: E402
+
+
+class PoolExhaustionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.assertTrue(db.connect())
+        self.pool = db.pool
+        self.saved = (self.pool.max_size, self.pool.timeout)
+        # Hold every connection the pool may open
+        self.pool.max_size = 1
+        self.pool.timeout = 0.05
+        self.held = self.pool.acquire()
+        self.client = app.test_client()
+        with self.client.session_transaction() as sess:
+            sess['user_id'] = 1
+            sess['role'] = 'student'
+            sess['name'] = 'Test Student'
+
+    def tearDown(self):
+        self.pool.release(self.held)
+        self.pool.max_size, self.pool.timeout = self.saved
+        db.disconnect()
+
+    def test_pool_timeout_is_not_a_database_error(self):
+        self.assertTrue(issubclass(PoolTimeoutError, DatabaseUnavailableError))
+        self.assertFalse(issubclass(PoolTimeoutError, DATABASE_ERRORS))
+
+    def test_write_raises_pool_timeout(self):
+        with self.assertRaises(PoolTimeoutError):
+            db.create_request(1, 'Subject', 'Description', '2026-01-01 09:00',
+                              '2026-01-01 10:00', '0000000000')
+
+    def test_write_returns_503(self):
+        response = self.client.post('/student/request', data={
+            'subject': 'Subject',
+            'description': 'Description',
+            'start_time': '2026-01-01 09:00',
+            'end_time': '2026-01-01 10:00',
+            'contact': '0000000000',
+        })
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Thumbnail Module
+Background generation of image thumbnails and PDF first-page previews
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; image renditions are skipped without it
+    Image = None
+
+# Rendition name -> longest edge in pixels
+RENDITIONS = {'thumb': 240, 'preview': 1024}
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
+PDF_EXTENSIONS = {'.pdf'}
+PREVIEW_EXTENSIONS = IMAGE_EXTENSIONS | PDF_EXTENSIONS
+PDF_RENDER_TIMEOUT = 30  # Seconds allowed for pdftoppm per page
+
+
+def rendition_path(path, rendition):
+    """Return where a rendition of an attachment is cached (next to the original)"""
+    return f"{path}.{rendition}.jpg"
+
+
+def can_render(path):
+    """Check whether renditions can be produced for an attachment"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        return Image is not None
+    if ext in PDF_EXTENSIONS:
+        return shutil.which('pdftoppm') is not None
+    return False
+
+
+class ThumbnailWorker:
+    """
+    Bounded background pool that renders attachment renditions
+
+    Uploads are submitted right after they are stored, so by the time a
+    coordinator opens the queue the thumbnails are usually already on
+    disk. Jobs beyond max_pending are dropped rather than queued without
+    limit; a later request for the rendition resubmits them.
+    """
+
+    def __init__(self, max_workers=2, max_pending=100):
+        """
+        Initialize thumbnail worker pool
+
+        Args:
+            max_workers: Renderer threads
+            max_pending: Jobs allowed to wait before new ones are dropped
+        """
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='thumbnail')
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, path):
+        """
+        Queue rendition generation for an attachment
+
+        Args:
+            path: Stored attachment path
+
+        Returns:
+            True if a job was queued, False if it was not needed or dropped
+        """
+        if not can_render(path):
+            return False
+        if all(os.path.exists(rendition_path(path, name)) for name in RENDITIONS):
+            return False
+        with self._lock:
+            if path in self._pending or len(self._pending) >= self.max_pending:
+                return False
+            self._pending.add(path)
+        self._executor.submit(self._run, path)
+        return True
+
+    def _run(self, path):
+        """Render every missing rendition of one attachment"""
+        try:
+            if os.path.splitext(path)[1].lower() in PDF_EXTENSIONS:
+                render_pdf(path)
+            else:
+                render_image(path)
+        except Exception as e:
+            print(f"Error generating thumbnail for {path}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(path)
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs and optionally wait for running ones"""
+        self._executor.shutdown(wait=wait)
+
+
+def _save_atomic(image, target):
+    """Write a JPEG via a temp file so readers never see a partial rendition"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target) or '.', suffix='.part')
+    os.close(fd)
+    try:
+        image.save(tmp_path, 'JPEG', quality=80, optimize=True)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def render_image(path):
+    """Downscale an image attachment to every rendition size"""
+    for name, size in sorted(RENDITIONS.items(), key=lambda item: -item[1]):
+        target = rendition_path(path, name)
+        if os.path.exists(target):
+            continue
+        with Image.open(path) as img:
+            # draft() lets the JPEG decoder skip straight to a reduced scale
+            img.draft('RGB', (size, size))
+            img = img.convert('RGB')
+            img.thumbnail((size, size))
+            _save_atomic(img, target)
+
+
+def render_pdf(path):
+    """Render the first page of a PDF attachment to every rendition size"""
+    for name, size in RENDITIONS.items():
+        target = rendition_path(path, name)
+        if os.path.exists(target):
+            continue
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(path) or '.') as tmp_dir:
+            prefix = os.path.join(tmp_dir, 'page')
+            subprocess.run(
+                ['pdftoppm', '-f', '1', '-l', '1', '-singlefile', '-jpeg',
+                 '-scale-to', str(size), path, prefix],
+                check=True,
+                timeout=PDF_RENDER_TIMEOUT,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            os.replace(f"{prefix}.jpg", target)